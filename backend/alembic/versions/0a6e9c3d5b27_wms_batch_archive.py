@@ -0,0 +1,37 @@
+"""wms_batch archived_at (rows offloaded to Parquet)
+
+Revision ID: 0a6e9c3d5b27
+Revises: f8b2d4c6a013
+Create Date: 2026-10-17 15:02:18.377420
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0a6e9c3d5b27"
+down_revision: Union[str, Sequence[str], None] = "f8b2d4c6a013"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table("wms_batch") as batch:
+        batch.add_column(sa.Column("archived_at", sa.DateTime(), nullable=True))
+
+
+def downgrade() -> None:
+    # 보관된 배치는 행이 DB 에 없음 → 컬럼을 지우기 전에 POST /api/wms/batches/{id}/restore 로 복원
+    archived = op.get_bind().execute(
+        sa.text("SELECT count(*) FROM wms_batch WHERE archived_at IS NOT NULL")
+    ).scalar()
+    if archived:
+        raise RuntimeError(
+            f"{archived} archived wms_batch rows; restore them before downgrading"
+        )
+    with op.batch_alter_table("wms_batch") as batch:
+        batch.drop_column("archived_at")
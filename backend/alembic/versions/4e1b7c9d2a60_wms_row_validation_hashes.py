@@ -0,0 +1,71 @@
+"""wms_row payload hash / incremental validation columns
+
+Revision ID: 4e1b7c9d2a60
+Revises: 0c930f575745
+Create Date: 2026-10-17 09:12:41.318204
+
+"""
+
+import hashlib
+import json
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "4e1b7c9d2a60"
+down_revision: Union[str, Sequence[str], None] = "0c930f575745"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+_BACKFILL_CHUNK = 5000
+
+
+def _payload_hash(payload) -> str:
+    # app.wms.ingest.payload_hash 와 동일 규칙 (마이그레이션은 앱 코드에 의존하지 않음)
+    if isinstance(payload, str):
+        payload = json.loads(payload)
+    canon = json.dumps(payload, sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(canon.encode("utf-8")).hexdigest()
+
+
+def upgrade() -> None:
+    with op.batch_alter_table("wms_row") as batch:
+        batch.add_column(sa.Column("payload_hash", sa.String(length=64), nullable=True))
+        batch.add_column(sa.Column("rules_fp", sa.String(length=16), nullable=True))
+        batch.add_column(sa.Column("validated_hash", sa.String(length=64), nullable=True))
+
+    # ✅ 기존 행 payload_hash 백필 (id 순으로 청크 단위)
+    bind = op.get_bind()
+    wms_row = sa.table(
+        "wms_row",
+        sa.column("id", sa.Integer()),
+        sa.column("payload_json", sa.JSON()),
+        sa.column("payload_hash", sa.String()),
+    )
+    stmt = (
+        sa.update(wms_row)
+        .where(wms_row.c.id == sa.bindparam("row_id"))
+        .values(payload_hash=sa.bindparam("h"))
+    )
+    last_id = 0
+    while True:
+        rows = bind.execute(
+            sa.select(wms_row.c.id, wms_row.c.payload_json)
+            .where(wms_row.c.id > last_id)
+            .order_by(wms_row.c.id)
+            .limit(_BACKFILL_CHUNK)
+        ).all()
+        if not rows:
+            break
+        bind.execute(stmt, [{"row_id": r[0], "h": _payload_hash(r[1])} for r in rows])
+        last_id = rows[-1][0]
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("wms_row") as batch:
+        batch.drop_column("validated_hash")
+        batch.drop_column("rules_fp")
+        batch.drop_column("payload_hash")
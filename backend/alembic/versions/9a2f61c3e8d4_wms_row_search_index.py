@@ -0,0 +1,124 @@
+"""wms_row full-text search index (SQLite FTS5 trigram / Postgres pg_trgm)
+
+Revision ID: 9a2f61c3e8d4
+Revises: 4e1b7c9d2a60
+Create Date: 2026-10-17 10:05:12.540873
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "9a2f61c3e8d4"
+down_revision: Union[str, Sequence[str], None] = "4e1b7c9d2a60"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# 검색 본문 = code, name, _raw 값들을 char(31)(unit separator)로 이어붙인 문자열
+#  → 값 경계를 넘는 부분일치가 생기지 않음 (검색어에 char(31)이 들어갈 일은 없음)
+# 신규 행 색인은 app.wms.search.index_rows 가 적재 청크 단위로 수행 (행별 INSERT 트리거는
+# FTS 갱신을 행마다 일으켜 대량 적재가 수 배 느려짐). 수정/삭제만 트리거로 동기화.
+def _sqlite_body(r: str) -> str:
+    return (
+        f"coalesce(json_extract({r}.payload_json, '$.code'), '') || char(31) || "
+        f"coalesce(json_extract({r}.payload_json, '$.name'), '') || char(31) || "
+        f"coalesce((SELECT group_concat(value, char(31)) FROM json_each({r}.payload_json, '$._raw') "
+        f"WHERE value IS NOT NULL), '')"
+    )
+
+
+SQLITE_UPGRADE = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS wms_row_fts USING fts5(body, tokenize='trigram')",
+    f"""
+    CREATE TRIGGER IF NOT EXISTS wms_row_fts_au AFTER UPDATE OF payload_json ON wms_row BEGIN
+      UPDATE wms_row_fts SET body = {_sqlite_body("NEW")} WHERE rowid = NEW.id;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS wms_row_fts_ad AFTER DELETE ON wms_row BEGIN
+      DELETE FROM wms_row_fts WHERE rowid = OLD.id;
+    END
+    """,
+    # 기존 행 백필
+    f"INSERT INTO wms_row_fts(rowid, body) SELECT wms_row.id, {_sqlite_body('wms_row')} FROM wms_row",
+]
+
+SQLITE_DOWNGRADE = [
+    "DROP TRIGGER IF EXISTS wms_row_fts_ad",
+    "DROP TRIGGER IF EXISTS wms_row_fts_au",
+    "DROP TABLE IF EXISTS wms_row_fts",
+]
+
+PG_UPGRADE = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    """
+    CREATE TABLE IF NOT EXISTS wms_row_search (
+      row_id integer PRIMARY KEY REFERENCES wms_row(id) ON DELETE CASCADE,
+      body text NOT NULL
+    )
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS ix_wms_row_search_trgm
+      ON wms_row_search USING gin (body gin_trgm_ops)
+    """,
+    """
+    CREATE OR REPLACE FUNCTION wms_row_search_body(p json) RETURNS text
+    LANGUAGE sql IMMUTABLE AS $$
+      SELECT concat_ws(chr(31),
+        coalesce(p->>'code', ''),
+        coalesce(p->>'name', ''),
+        (SELECT string_agg(value, chr(31)) FROM json_each_text(
+           CASE WHEN json_typeof(p->'_raw') = 'object' THEN p->'_raw' END)))
+    $$
+    """,
+    """
+    CREATE OR REPLACE FUNCTION wms_row_search_sync() RETURNS trigger
+    LANGUAGE plpgsql AS $$
+    BEGIN
+      INSERT INTO wms_row_search(row_id, body)
+      VALUES (NEW.id, wms_row_search_body(NEW.payload_json))
+      ON CONFLICT (row_id) DO UPDATE SET body = EXCLUDED.body;
+      RETURN NULL;
+    END
+    $$
+    """,
+    "DROP TRIGGER IF EXISTS wms_row_search_au ON wms_row",
+    """
+    CREATE TRIGGER wms_row_search_au
+      AFTER UPDATE OF payload_json ON wms_row
+      FOR EACH ROW EXECUTE FUNCTION wms_row_search_sync()
+    """,
+    # 기존 행 백필 (삭제는 FK CASCADE)
+    """
+    INSERT INTO wms_row_search(row_id, body)
+    SELECT id, wms_row_search_body(payload_json) FROM wms_row
+    ON CONFLICT (row_id) DO NOTHING
+    """,
+]
+
+PG_DOWNGRADE = [
+    "DROP TRIGGER IF EXISTS wms_row_search_au ON wms_row",
+    "DROP FUNCTION IF EXISTS wms_row_search_sync()",
+    "DROP FUNCTION IF EXISTS wms_row_search_body(json)",
+    "DROP TABLE IF EXISTS wms_row_search",
+]
+
+
+def _statements(upgrade: bool) -> list[str]:
+    if op.get_bind().dialect.name == "postgresql":
+        return PG_UPGRADE if upgrade else PG_DOWNGRADE
+    return SQLITE_UPGRADE if upgrade else SQLITE_DOWNGRADE
+
+
+def upgrade() -> None:
+    for sql in _statements(True):
+        op.execute(sql)
+
+
+def downgrade() -> None:
+    for sql in _statements(False):
+        op.execute(sql)
@@ -0,0 +1,46 @@
+"""wms_job table (background ingest progress shared by all API workers)
+
+Revision ID: a4c9f2d7e613
+Revises: d2e8b5f1c734
+Create Date: 2026-10-17 18:12:40.221907
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "a4c9f2d7e613"
+down_revision: Union[str, Sequence[str], None] = "d2e8b5f1c734"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "wms_job",
+        sa.Column("id", sa.String(length=32), nullable=False),
+        sa.Column("batch_id", sa.Integer(), nullable=True),
+        sa.Column("kind", sa.String(length=32), nullable=False),
+        sa.Column("stage", sa.String(length=16), nullable=False),
+        sa.Column("rows_parsed", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("rows_inserted", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("new_payloads", sa.Integer(), nullable=True),
+        sa.Column("rows_per_sec", sa.Float(), nullable=True),
+        sa.Column("error", sa.Text(), nullable=True),
+        sa.Column("created_at", sa.Float(), nullable=False),
+        sa.Column("updated_at", sa.Float(), nullable=False),
+        sa.ForeignKeyConstraint(["batch_id"], ["wms_batch.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_wms_job_created_at", "wms_job", ["created_at"])
+    op.create_index("ix_wms_job_batch", "wms_job", ["batch_id"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_wms_job_batch", table_name="wms_job")
+    op.drop_index("ix_wms_job_created_at", table_name="wms_job")
+    op.drop_table("wms_job")
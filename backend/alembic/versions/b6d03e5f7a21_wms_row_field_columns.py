@@ -0,0 +1,127 @@
+"""wms_row code/name/unit/qty/group_code columns
+
+Revision ID: b6d03e5f7a21
+Revises: 9a2f61c3e8d4
+Create Date: 2026-10-17 11:20:03.914552
+
+"""
+
+import json
+import math
+import numbers
+from datetime import datetime
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "b6d03e5f7a21"
+down_revision: Union[str, Sequence[str], None] = "9a2f61c3e8d4"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+_BACKFILL_CHUNK = 5000
+
+
+# app.wms.ingest.extract_fields 와 동일 규칙 (마이그레이션은 앱 코드에 의존하지 않음)
+def _text(v, size=None):
+    if v is None:
+        return None
+    t = (v if isinstance(v, str) else str(v)).strip()
+    return (t[:size] if size else t) or None
+
+
+def _number(v):
+    if v is None or isinstance(v, datetime):
+        return None
+    if isinstance(v, numbers.Number):
+        f = float(v)
+    elif isinstance(v, str):
+        try:
+            f = float(v.strip())
+        except ValueError:
+            return None
+    else:
+        return None
+    return f if math.isfinite(f) else None
+
+
+def _fields(payload) -> dict:
+    if isinstance(payload, str):
+        payload = json.loads(payload)
+    if not isinstance(payload, dict):
+        payload = {}
+    return {
+        "f_code": _text(payload.get("code"), 255),
+        "f_name": _text(payload.get("name")),
+        "f_unit": _text(payload.get("unit"), 64),
+        "f_qty": _number(payload.get("qty")),
+        "f_group_code": _text(payload.get("group_code"), 255),
+    }
+
+
+def upgrade() -> None:
+    with op.batch_alter_table("wms_row") as batch:
+        batch.add_column(sa.Column("code", sa.String(length=255), nullable=True))
+        batch.add_column(sa.Column("name", sa.Text(), nullable=True))
+        batch.add_column(sa.Column("unit", sa.String(length=64), nullable=True))
+        batch.add_column(sa.Column("qty", sa.Float(), nullable=True))
+        batch.add_column(sa.Column("group_code", sa.String(length=255), nullable=True))
+
+    # ✅ 기존 행 백필 (id 순으로 청크 단위) → 인덱스는 백필 후 생성
+    bind = op.get_bind()
+    wms_row = sa.table(
+        "wms_row",
+        sa.column("id", sa.Integer()),
+        sa.column("payload_json", sa.JSON()),
+        sa.column("code", sa.String()),
+        sa.column("name", sa.Text()),
+        sa.column("unit", sa.String()),
+        sa.column("qty", sa.Float()),
+        sa.column("group_code", sa.String()),
+    )
+    stmt = (
+        sa.update(wms_row)
+        .where(wms_row.c.id == sa.bindparam("row_id"))
+        .values(
+            code=sa.bindparam("f_code"),
+            name=sa.bindparam("f_name"),
+            unit=sa.bindparam("f_unit"),
+            qty=sa.bindparam("f_qty"),
+            group_code=sa.bindparam("f_group_code"),
+        )
+    )
+    last_id = 0
+    while True:
+        rows = bind.execute(
+            sa.select(wms_row.c.id, wms_row.c.payload_json)
+            .where(wms_row.c.id > last_id)
+            .order_by(wms_row.c.id)
+            .limit(_BACKFILL_CHUNK)
+        ).all()
+        if not rows:
+            break
+        bind.execute(stmt, [{"row_id": r[0], **_fields(r[1])} for r in rows])
+        last_id = rows[-1][0]
+
+    op.create_index("ix_wms_row_batch_code", "wms_row", ["batch_id", "code"])
+    op.create_index("ix_wms_row_code", "wms_row", ["code"])
+    op.create_index("ix_wms_row_group_code", "wms_row", ["group_code"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_wms_row_group_code", table_name="wms_row")
+    op.drop_index("ix_wms_row_code", table_name="wms_row")
+    op.drop_index("ix_wms_row_batch_code", table_name="wms_row")
+    cols = ["group_code", "qty", "unit", "name", "code"]
+    if op.get_bind().dialect.name == "sqlite":
+        # 배치 모드는 테이블을 재생성하며 검색 인덱스 트리거(wms_row_fts_*)를 잃음
+        # → SQLite 3.35+ 의 ALTER TABLE DROP COLUMN 사용
+        for c in cols:
+            op.execute(f"ALTER TABLE wms_row DROP COLUMN {c}")
+        return
+    with op.batch_alter_table("wms_row") as batch:
+        for c in cols:
+            batch.drop_column(c)
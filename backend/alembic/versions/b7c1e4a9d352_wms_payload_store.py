@@ -0,0 +1,213 @@
+"""wms_payload content-addressed payload store (rows reference payload_hash)
+
+Revision ID: b7c1e4a9d352
+Revises: 0a6e9c3d5b27
+Create Date: 2026-10-17 16:20:44.905318
+
+"""
+
+import hashlib
+import json
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "b7c1e4a9d352"
+down_revision: Union[str, Sequence[str], None] = "0a6e9c3d5b27"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+_BACKFILL_CHUNK = 5000
+
+
+def _payload_hash(payload) -> str:
+    # app.wms.ingest.payload_hash 와 동일 규칙 (마이그레이션은 앱 코드에 의존하지 않음)
+    if isinstance(payload, str):
+        payload = json.loads(payload)
+    canon = json.dumps(payload, sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(canon.encode("utf-8")).hexdigest()
+
+
+# 검색 본문 규칙은 9a2f61c3e8d4 와 동일, 색인 단위만 wms_row → wms_payload
+def _sqlite_body(r: str) -> str:
+    return (
+        f"coalesce(json_extract({r}.payload_json, '$.code'), '') || char(31) || "
+        f"coalesce(json_extract({r}.payload_json, '$.name'), '') || char(31) || "
+        f"coalesce((SELECT group_concat(value, char(31)) FROM json_each({r}.payload_json, '$._raw') "
+        f"WHERE value IS NOT NULL), '')"
+    )
+
+
+SQLITE_SEARCH_UP = [
+    "DROP TRIGGER IF EXISTS wms_row_fts_ad",
+    "DROP TRIGGER IF EXISTS wms_row_fts_au",
+    "DROP TABLE IF EXISTS wms_row_fts",
+    "CREATE VIRTUAL TABLE IF NOT EXISTS wms_payload_fts USING fts5(body, tokenize='trigram')",
+    # payload 는 수정되지 않음 (내용이 바뀌면 해시가 바뀜) → 삭제(gc)만 동기화
+    """
+    CREATE TRIGGER IF NOT EXISTS wms_payload_fts_ad AFTER DELETE ON wms_payload BEGIN
+      DELETE FROM wms_payload_fts WHERE rowid = OLD.id;
+    END
+    """,
+    f"INSERT INTO wms_payload_fts(rowid, body) "
+    f"SELECT wms_payload.id, {_sqlite_body('wms_payload')} FROM wms_payload",
+]
+
+SQLITE_SEARCH_DOWN = [
+    "DROP TRIGGER IF EXISTS wms_payload_fts_ad",
+    "DROP TABLE IF EXISTS wms_payload_fts",
+    "CREATE VIRTUAL TABLE IF NOT EXISTS wms_row_fts USING fts5(body, tokenize='trigram')",
+    f"""
+    CREATE TRIGGER IF NOT EXISTS wms_row_fts_au AFTER UPDATE OF payload_json ON wms_row BEGIN
+      UPDATE wms_row_fts SET body = {_sqlite_body("NEW")} WHERE rowid = NEW.id;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS wms_row_fts_ad AFTER DELETE ON wms_row BEGIN
+      DELETE FROM wms_row_fts WHERE rowid = OLD.id;
+    END
+    """,
+    f"INSERT INTO wms_row_fts(rowid, body) SELECT wms_row.id, {_sqlite_body('wms_row')} FROM wms_row",
+]
+
+# wms_row_search_body(json) 함수는 그대로 사용
+PG_SEARCH_UP = [
+    "DROP TRIGGER IF EXISTS wms_row_search_au ON wms_row",
+    "DROP FUNCTION IF EXISTS wms_row_search_sync()",
+    "DROP TABLE IF EXISTS wms_row_search",
+    """
+    CREATE TABLE IF NOT EXISTS wms_payload_search (
+      payload_id integer PRIMARY KEY REFERENCES wms_payload(id) ON DELETE CASCADE,
+      body text NOT NULL
+    )
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS ix_wms_payload_search_trgm
+      ON wms_payload_search USING gin (body gin_trgm_ops)
+    """,
+    """
+    INSERT INTO wms_payload_search(payload_id, body)
+    SELECT id, wms_row_search_body(payload_json) FROM wms_payload
+    ON CONFLICT (payload_id) DO NOTHING
+    """,
+]
+
+PG_SEARCH_DOWN = [
+    "DROP TABLE IF EXISTS wms_payload_search",
+    """
+    CREATE TABLE IF NOT EXISTS wms_row_search (
+      row_id integer PRIMARY KEY REFERENCES wms_row(id) ON DELETE CASCADE,
+      body text NOT NULL
+    )
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS ix_wms_row_search_trgm
+      ON wms_row_search USING gin (body gin_trgm_ops)
+    """,
+    """
+    CREATE OR REPLACE FUNCTION wms_row_search_sync() RETURNS trigger
+    LANGUAGE plpgsql AS $$
+    BEGIN
+      INSERT INTO wms_row_search(row_id, body)
+      VALUES (NEW.id, wms_row_search_body(NEW.payload_json))
+      ON CONFLICT (row_id) DO UPDATE SET body = EXCLUDED.body;
+      RETURN NULL;
+    END
+    $$
+    """,
+    """
+    CREATE TRIGGER wms_row_search_au
+      AFTER UPDATE OF payload_json ON wms_row
+      FOR EACH ROW EXECUTE FUNCTION wms_row_search_sync()
+    """,
+    """
+    INSERT INTO wms_row_search(row_id, body)
+    SELECT id, wms_row_search_body(payload_json) FROM wms_row
+    ON CONFLICT (row_id) DO NOTHING
+    """,
+]
+
+
+def _backfill_missing_hashes(bind) -> None:
+    """payload_hash 가 비어 있는 행 (4e1b7c9d2a60 이전 경로로 들어온 행) 채움"""
+    wms_row = sa.table(
+        "wms_row",
+        sa.column("id", sa.Integer()),
+        sa.column("payload_json", sa.JSON()),
+        sa.column("payload_hash", sa.String()),
+    )
+    stmt = (
+        sa.update(wms_row)
+        .where(wms_row.c.id == sa.bindparam("row_id"))
+        .values(payload_hash=sa.bindparam("h"))
+    )
+    last_id = 0
+    while True:
+        rows = bind.execute(
+            sa.select(wms_row.c.id, wms_row.c.payload_json)
+            .where(wms_row.c.id > last_id, wms_row.c.payload_hash.is_(None))
+            .order_by(wms_row.c.id)
+            .limit(_BACKFILL_CHUNK)
+        ).all()
+        if not rows:
+            break
+        bind.execute(stmt, [{"row_id": r[0], "h": _payload_hash(r[1])} for r in rows])
+        last_id = rows[-1][0]
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    pg = bind.dialect.name == "postgresql"
+    op.create_table(
+        "wms_payload",
+        sa.Column("id", sa.Integer(), primary_key=True, autoincrement=True),
+        sa.Column("hash", sa.String(length=64), nullable=False),
+        sa.Column("payload_json", sa.JSON(), nullable=False),
+        sa.UniqueConstraint("hash", name="uq_wms_payload_hash"),
+    )
+
+    # ✅ 같은 해시의 행은 같은 내용 → 해시별 첫 행의 payload 만 옮김
+    _backfill_missing_hashes(bind)
+    if pg:
+        op.execute(
+            "INSERT INTO wms_payload(hash, payload_json) "
+            "SELECT DISTINCT ON (payload_hash) payload_hash, payload_json FROM wms_row "
+            "ORDER BY payload_hash, id ON CONFLICT (hash) DO NOTHING"
+        )
+    else:
+        op.execute(
+            "INSERT OR IGNORE INTO wms_payload(hash, payload_json) "
+            "SELECT payload_hash, payload_json FROM wms_row ORDER BY id"
+        )
+    op.create_index("ix_wms_row_payload_hash", "wms_row", ["payload_hash"])
+
+    for sql in PG_SEARCH_UP if pg else SQLITE_SEARCH_UP:
+        op.execute(sql)
+
+    if pg:
+        op.drop_column("wms_row", "payload_json")
+    else:
+        # batch 모드(테이블 재생성) 대신 SQLite 3.35+ DROP COLUMN (트리거는 위에서 제거)
+        op.execute("ALTER TABLE wms_row DROP COLUMN payload_json")
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    pg = bind.dialect.name == "postgresql"
+    # SQLite ADD COLUMN 은 기본값 없는 NOT NULL 불가 → SQLite 는 nullable 로 되돌림
+    op.add_column("wms_row", sa.Column("payload_json", sa.JSON(), nullable=True))
+    op.execute(
+        "UPDATE wms_row SET payload_json = "
+        "(SELECT payload_json FROM wms_payload WHERE wms_payload.hash = wms_row.payload_hash)"
+    )
+    if pg:
+        op.alter_column("wms_row", "payload_json", nullable=False)
+
+    for sql in PG_SEARCH_DOWN if pg else SQLITE_SEARCH_DOWN:
+        op.execute(sql)
+
+    op.drop_index("ix_wms_row_payload_hash", table_name="wms_row")
+    op.drop_table("wms_payload")
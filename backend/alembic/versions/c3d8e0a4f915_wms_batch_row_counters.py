@@ -0,0 +1,77 @@
+"""wms_batch total_rows/ok_rows/error_rows counters
+
+Revision ID: c3d8e0a4f915
+Revises: b6d03e5f7a21
+Create Date: 2026-10-17 13:02:47.226105
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "c3d8e0a4f915"
+down_revision: Union[str, Sequence[str], None] = "b6d03e5f7a21"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+LEGACY_FP = "legacy"  # 규칙 fingerprint(16자 hex)와 겹치지 않는 값
+
+
+def upgrade() -> None:
+    with op.batch_alter_table("wms_batch") as batch:
+        for name in ("total_rows", "ok_rows", "error_rows"):
+            batch.add_column(sa.Column(name, sa.Integer(), nullable=False, server_default="0"))
+    op.create_index("ix_wms_batch_source_id", "wms_batch", ["source", "id"])
+
+    # ✅ 4e1b7c9d2a60 이전에 검증된 행(ok/error)은 rules_fp 가 없음 → LEGACY_FP 로 표시
+    #    stale_stats 는 rules_fp 없는 행을 "검증된 적 없음"(fresh)으로 세므로, 표시 없이
+    #    ok/error 카운터에 넣으면 재검증 시 이전 ok 가 이중으로 빠짐. 어떤 규칙과도 달라 재검증 대상은 유지
+    wms_row = sa.table(
+        "wms_row",
+        sa.column("batch_id", sa.Integer()),
+        sa.column("status", sa.String()),
+        sa.column("rules_fp", sa.String()),
+    )
+    op.execute(
+        sa.update(wms_row)
+        .where(wms_row.c.rules_fp.is_(None), wms_row.c.status.in_(("ok", "error")))
+        .values(rules_fp=LEGACY_FP)
+    )
+
+    # ✅ 기존 배치 카운터 백필 (이후로는 적재/검증이 증감만 반영)
+    wms_batch = sa.table(
+        "wms_batch",
+        sa.column("id", sa.Integer()),
+        sa.column("total_rows", sa.Integer()),
+        sa.column("ok_rows", sa.Integer()),
+        sa.column("error_rows", sa.Integer()),
+    )
+
+    def count(*where):
+        return (
+            sa.select(sa.func.count())
+            .select_from(wms_row)
+            .where(wms_row.c.batch_id == wms_batch.c.id, *where)
+            .scalar_subquery()
+        )
+
+    op.execute(
+        sa.update(wms_batch).values(
+            total_rows=count(),
+            ok_rows=count(wms_row.c.status == "ok"),
+            error_rows=count(wms_row.c.status == "error"),
+        )
+    )
+
+
+def downgrade() -> None:
+    op.execute(f"UPDATE wms_row SET rules_fp = NULL WHERE rules_fp = '{LEGACY_FP}'")
+    op.drop_index("ix_wms_batch_source_id", table_name="wms_batch")
+    with op.batch_alter_table("wms_batch") as batch:
+        batch.drop_column("error_rows")
+        batch.drop_column("ok_rows")
+        batch.drop_column("total_rows")
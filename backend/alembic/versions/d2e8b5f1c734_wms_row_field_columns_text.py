@@ -0,0 +1,95 @@
+"""wms_row code/unit/group_code as unbounded text (no truncation)
+
+Revision ID: d2e8b5f1c734
+Revises: b7c1e4a9d352
+Create Date: 2026-10-17 19:05:12.318406
+
+"""
+
+import json
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "d2e8b5f1c734"
+down_revision: Union[str, Sequence[str], None] = "b7c1e4a9d352"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+_BACKFILL_CHUNK = 5000
+# b6d03e5f7a21 이 자르던 길이 (이 길이인 값은 잘렸을 수 있음 → payload 에서 다시 추출)
+_LIMITS = {"code": 255, "unit": 64, "group_code": 255}
+
+
+# app.wms.ingest._text 와 동일 규칙 (마이그레이션은 앱 코드에 의존하지 않음)
+def _text(v):
+    if v is None:
+        return None
+    return (v if isinstance(v, str) else str(v)).strip() or None
+
+
+def _reextract(bind) -> None:
+    wms_row = sa.table(
+        "wms_row",
+        sa.column("id", sa.Integer()),
+        sa.column("payload_hash", sa.String()),
+        sa.column("code", sa.Text()),
+        sa.column("unit", sa.Text()),
+        sa.column("group_code", sa.Text()),
+    )
+    wms_payload = sa.table(
+        "wms_payload", sa.column("hash", sa.String()), sa.column("payload_json", sa.JSON())
+    )
+    stmt = (
+        sa.update(wms_row)
+        .where(wms_row.c.id == sa.bindparam("row_id"))
+        .values(
+            code=sa.bindparam("f_code"),
+            unit=sa.bindparam("f_unit"),
+            group_code=sa.bindparam("f_group_code"),
+        )
+    )
+    maybe_cut = sa.or_(*(sa.func.length(wms_row.c[k]) >= n for k, n in _LIMITS.items()))
+    last_id = 0
+    while True:
+        rows = bind.execute(
+            sa.select(wms_row.c.id, wms_payload.c.payload_json)
+            .join(wms_payload, wms_payload.c.hash == wms_row.c.payload_hash)
+            .where(wms_row.c.id > last_id, maybe_cut)
+            .order_by(wms_row.c.id)
+            .limit(_BACKFILL_CHUNK)
+        ).all()
+        if not rows:
+            break
+        params = []
+        for row_id, p in rows:
+            p = json.loads(p) if isinstance(p, str) else p
+            p = p if isinstance(p, dict) else {}
+            params.append({"row_id": row_id, **{f"f_{k}": _text(p.get(k)) for k in _LIMITS}})
+        bind.execute(stmt, params)
+        last_id = rows[-1][0]
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name == "postgresql":
+        for col, n in _LIMITS.items():
+            op.alter_column("wms_row", col, type_=sa.Text(), existing_type=sa.String(length=n))
+    # SQLite 는 VARCHAR(n) 길이를 강제하지 않음 → 타입 변경 없이 잘린 값만 다시 채움
+    _reextract(bind)
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != "postgresql":
+        return
+    for col, n in _LIMITS.items():
+        op.alter_column(
+            "wms_row",
+            col,
+            type_=sa.String(length=n),
+            existing_type=sa.Text(),
+            postgresql_using=f"left({col}, {n})",
+        )
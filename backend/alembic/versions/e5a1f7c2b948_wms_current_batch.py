@@ -0,0 +1,94 @@
+"""wms_current_batch pointer table (replaces meta_json.is_current)
+
+Revision ID: e5a1f7c2b948
+Revises: c3d8e0a4f915
+Create Date: 2026-10-17 13:41:09.518377
+
+"""
+
+import json
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "e5a1f7c2b948"
+down_revision: Union[str, Sequence[str], None] = "c3d8e0a4f915"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+_wms_batch = sa.table(
+    "wms_batch",
+    sa.column("id", sa.Integer()),
+    sa.column("source", sa.String()),
+    sa.column("meta_json", sa.JSON()),
+)
+_current = sa.table(
+    "wms_current_batch",
+    sa.column("source", sa.String()),
+    sa.column("project_id", sa.Integer()),
+    sa.column("batch_id", sa.Integer()),
+)
+
+
+def _meta(v) -> dict:
+    if isinstance(v, str):
+        v = json.loads(v)
+    return v if isinstance(v, dict) else {}
+
+
+def _set_meta(bind, batch_id: int, meta: dict) -> None:
+    bind.execute(sa.update(_wms_batch).where(_wms_batch.c.id == batch_id).values(meta_json=meta))
+
+
+def upgrade() -> None:
+    op.create_table(
+        "wms_current_batch",
+        sa.Column("source", sa.String(length=64), nullable=False),
+        sa.Column("project_id", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("batch_id", sa.Integer(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), server_default=sa.text("(CURRENT_TIMESTAMP)")),
+        sa.ForeignKeyConstraint(["batch_id"], ["wms_batch.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("source", "project_id", name="pk_wms_current_batch"),
+    )
+    op.create_index("ix_wms_current_batch_batch", "wms_current_batch", ["batch_id"])
+
+    # ✅ meta_json.is_current → 포인터 (source 별로 가장 최신 1건), 플래그는 메타에서 제거
+    bind = op.get_bind()
+    rows = bind.execute(
+        sa.select(_wms_batch.c.id, _wms_batch.c.source, _wms_batch.c.meta_json).order_by(
+            _wms_batch.c.id.desc()
+        )
+    ).all()
+    pointers: dict[str, int] = {}
+    for bid, source, meta in rows:
+        meta = _meta(meta)
+        if "is_current" not in meta:
+            continue
+        if meta.pop("is_current") is True:
+            pointers.setdefault(source or "", bid)
+        _set_meta(bind, bid, meta)
+    if pointers:
+        bind.execute(
+            sa.insert(_current),
+            [{"source": s, "project_id": 0, "batch_id": b} for s, b in pointers.items()],
+        )
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    ids = bind.execute(
+        sa.select(_current.c.batch_id).where(_current.c.project_id == 0)
+    ).scalars().all()
+    for bid in ids:
+        meta = _meta(
+            bind.execute(
+                sa.select(_wms_batch.c.meta_json).where(_wms_batch.c.id == bid)
+            ).scalar_one_or_none()
+        )
+        _set_meta(bind, bid, {**meta, "is_current": True})
+
+    op.drop_index("ix_wms_current_batch_batch", table_name="wms_current_batch")
+    op.drop_table("wms_current_batch")
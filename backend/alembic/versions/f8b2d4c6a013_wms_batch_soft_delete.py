@@ -0,0 +1,41 @@
+"""wms_batch soft delete (deleted_at)
+
+Revision ID: f8b2d4c6a013
+Revises: e5a1f7c2b948
+Create Date: 2026-10-17 14:10:32.604187
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "f8b2d4c6a013"
+down_revision: Union[str, Sequence[str], None] = "e5a1f7c2b948"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table("wms_batch") as batch:
+        batch.add_column(sa.Column("deleted_at", sa.DateTime(), nullable=True))
+    op.create_index("ix_wms_batch_deleted_at", "wms_batch", ["deleted_at"])
+
+
+def downgrade() -> None:
+    # 아직 purge 되지 않은 소프트 삭제 배치는 컬럼이 사라지면 다시 보이므로 여기서 실제 삭제
+    deleted = "SELECT id FROM wms_batch WHERE deleted_at IS NOT NULL"
+    op.execute(
+        f"DELETE FROM std_wms_link WHERE wms_row_id IN "
+        f"(SELECT id FROM wms_row WHERE batch_id IN ({deleted}))"
+    )
+    op.execute(f"DELETE FROM wms_row WHERE batch_id IN ({deleted})")
+    op.execute(f"DELETE FROM wms_current_batch WHERE batch_id IN ({deleted})")
+    op.execute("DELETE FROM wms_batch WHERE deleted_at IS NOT NULL")
+
+    op.drop_index("ix_wms_batch_deleted_at", table_name="wms_batch")
+    with op.batch_alter_table("wms_batch") as batch:
+        batch.drop_column("deleted_at")
@@ -1,11 +1,44 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from .shared.config import settings
+from .shared.responses import CompressionMiddleware, NegotiationMiddleware
 from .standards.router import router as std_router
+from .wms.jobs import recover_orphans
 from .wms.router import router as wms_router
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # ✅ 재시작/크래시로 중단된 업로드 배치(queued/parsing/ingesting) → failed, 스풀 정리 (wms/jobs.py)
+    try:
+        recover_orphans()
+    except Exception:
+        import traceback
+
+        traceback.print_exc()  # 마이그레이션 전 DB 등 → 서버 시작은 계속
+    yield
+
+
 app = FastAPI(
-    title="Bnote:Sync API", version="0.1.0", openapi_url=f"{settings.API_PREFIX}/openapi.json"
+    title="Bnote:Sync API",
+    version="0.1.0",
+    openapi_url=f"{settings.API_PREFIX}/openapi.json",
+    lifespan=lifespan,
+)
+
+# ✅ 응답 인코딩 (shared/responses.py, scripts/bench_responses.py 로 측정)
+#   - response_model 엔드포인트: FastAPI 기본 = pydantic(Rust) dump_json → orjson 보다 빠름, 유지
+#   - 큰 목록(/wms/items 등): NegotiatedResponse 로 직접 반환 → jsonable_encoder 생략 + orjson
+#   - Accept: application/msgpack → msgpack (NegotiationMiddleware 가 JSON 응답도 변환)
+#   - 임계값 이상 본문은 br(brotli 설치 시) / gzip 압축
+# 미들웨어는 나중에 추가한 것이 바깥 → 압축은 msgpack 변환이 끝난 본문에 적용
+app.add_middleware(NegotiationMiddleware)
+app.add_middleware(
+    CompressionMiddleware,
+    minimum_size=settings.RESPONSE_COMPRESS_MIN_BYTES,
+    gzip_level=settings.RESPONSE_GZIP_LEVEL,
+    brotli_quality=settings.RESPONSE_BROTLI_QUALITY,
 )
 
 app.add_middleware(
@@ -14,6 +47,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "X-Total-Count"],  # ✅ WMS 목록 keyset 페이지네이션
 )
 
 
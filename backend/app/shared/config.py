@@ -15,6 +15,37 @@ class Settings(BaseSettings):
     JWT_SECRET: str = "change-me"
     JWT_ALG: str = "HS256"
 
+    # WMS 인제스트: executemany 청크 크기 (Postgres는 COPY 사용)
+    WMS_INGEST_CHUNK_SIZE: int = 5000
+    # WMS 백그라운드 업로드 잡 워커 수
+    WMS_JOB_WORKERS: int = 2
+    # 진행 중(queued/parsing/ingesting) 배치가 이 시간(분) 넘게 단계 전환이 없으면 중단된 것으로 간주
+    WMS_STALE_JOB_MINUTES: int = 720
+    # pandas 엑셀 파싱 프로세스 풀: 워커 수 / 대기 큐 길이 (초과 시 503)
+    WMS_PARSE_WORKERS: int = 2
+    WMS_PARSE_QUEUE: int = 4
+    # dry-run 결과 보관(staging, _data/staging/ → 워커 프로세스 간 공유): TTL(초) / 전체 보관 행 수 상한
+    WMS_STAGING_TTL_SEC: int = 1800
+    WMS_STAGING_MAX_ROWS: int = 300_000
+    # 분할 업로드: 세션 보관 기간(초) / 청크 최대 크기
+    WMS_CHUNKED_TTL_SEC: int = 86400
+    WMS_CHUNK_MAX_BYTES: int = 64 * 1024 * 1024
+    # 스트리밍 응답(NDJSON/Arrow): 서버측 커서에서 한 번에 읽는 행 수
+    WMS_STREAM_CHUNK_SIZE: int = 2000
+    # 배치 삭제(백그라운드 purge): 트랜잭션당 삭제 행 수 / 청크 사이 대기(초, 다른 쓰기에 락 양보)
+    WMS_PURGE_CHUNK_SIZE: int = 2000
+    WMS_PURGE_PAUSE_SEC: float = 0.05
+    # purge 후 SQLite 빈 페이지 비율이 이 값 이상이면 VACUUM (0 이면 ANALYZE 만)
+    WMS_VACUUM_FREE_RATIO: float = 0.25
+    # 대체된 배치 보관(Parquet): 압축 코덱 / row group 행 수
+    WMS_ARCHIVE_COMPRESSION: str = "zstd"
+    WMS_ARCHIVE_ROW_GROUP_SIZE: int = 50_000
+
+    # 응답 압축: 이 크기(바이트) 이상이면 br(brotli 설치 시) / gzip
+    RESPONSE_COMPRESS_MIN_BYTES: int = 1024
+    RESPONSE_GZIP_LEVEL: int = 6
+    RESPONSE_BROTLI_QUALITY: int = 5
+
     @property
     def cors_origins_list(self) -> List[str]:
         return [o.strip() for o in self.CORS_ORIGINS.split(",") if o.strip()]
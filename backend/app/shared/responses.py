@@ -0,0 +1,189 @@
+# backend/app/shared/responses.py
+"""
+응답 인코더 / 압축 (미들웨어는 main.py 에서 앱 전체에 적용)
+
+- NegotiatedResponse: 큰 목록 엔드포인트가 직접 반환하는 응답 (jsonable_encoder 생략)
+    Accept 에 msgpack 이 있고 msgpack 이 설치돼 있으면 MessagePack, 아니면 JSON (orjson → 없으면 표준 json)
+- NegotiationMiddleware: Accept 보관 + response_model 엔드포인트(pydantic 직렬화) 응답의 msgpack 변환
+- CompressionMiddleware: 본문이 임계값 이상이면 br(brotli 설치 시) 또는 gzip 으로 압축 (스트리밍 응답 포함)
+
+msgpack / brotli 는 선택 의존성 (pyproject 의 speedups extra) → 없으면 JSON / gzip 으로 동작
+orjson 은 기본 의존성이지만 없어도 표준 json 으로 동작
+"""
+
+import json
+from contextvars import ContextVar
+from datetime import date, datetime, time
+from decimal import Decimal
+from enum import Enum
+from typing import Any
+from uuid import UUID
+
+from fastapi.responses import JSONResponse
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.middleware.gzip import GZipMiddleware, IdentityResponder
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - 선택 의존성
+    orjson = None
+try:
+    import msgpack
+except ImportError:  # pragma: no cover - 선택 의존성
+    msgpack = None
+try:
+    import brotli
+except ImportError:  # pragma: no cover - 선택 의존성
+    brotli = None
+
+
+MSGPACK_MEDIA_TYPE = "application/msgpack"
+_MSGPACK_ACCEPT = ("application/msgpack", "application/x-msgpack", "application/vnd.msgpack")
+
+# 요청의 Accept 헤더 (NegotiationMiddleware 가 요청마다 설정 → 응답 클래스가 참조)
+_accept: ContextVar[str] = ContextVar("accept", default="")
+
+
+def _default(o: Any):
+    """jsonable_encoder 를 거치지 않고 직접 반환한 값 중 JSON 비기본 타입 처리"""
+    if isinstance(o, (datetime, date, time)):
+        return o.isoformat()
+    if isinstance(o, (Decimal, UUID)):
+        return str(o)
+    if isinstance(o, Enum):
+        return o.value
+    if isinstance(o, (set, frozenset, tuple)):
+        return list(o)
+    raise TypeError(f"Object of type {type(o).__name__} is not serializable")
+
+
+def dumps_json(content: Any) -> bytes:
+    if orjson is not None:
+        # orjson 은 NaN/Infinity 를 null 로 씀 (표준 json 경로는 starlette 와 같이 allow_nan=False)
+        return orjson.dumps(content, default=_default, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(
+        content, default=_default, ensure_ascii=False, allow_nan=False, separators=(",", ":")
+    ).encode("utf-8")
+
+
+def dumps_msgpack(content: Any) -> bytes:
+    return msgpack.packb(content, default=_default, use_bin_type=True)
+
+
+def wants_msgpack(accept: str) -> bool:
+    return msgpack is not None and any(t in accept for t in _MSGPACK_ACCEPT)
+
+
+class NegotiatedResponse(JSONResponse):
+    """JSON(orjson) 기본, 클라이언트가 원하면 MessagePack"""
+
+    def __init__(self, content: Any = None, *args, **kwargs):
+        self._msgpack = wants_msgpack(_accept.get())
+        super().__init__(content, *args, **kwargs)
+        self.headers.add_vary_header("Accept")
+
+    def render(self, content: Any) -> bytes:
+        if self._msgpack:
+            self.media_type = MSGPACK_MEDIA_TYPE  # init_headers 가 render 뒤에 호출됨
+            return dumps_msgpack(content)
+        return dumps_json(content)
+
+
+class NegotiationMiddleware:
+    """
+    요청의 Accept 헤더를 컨텍스트에 보관 (엔드포인트와 같은 태스크 안에서 응답 생성).
+    response_model 엔드포인트는 FastAPI가 pydantic 으로 바로 JSON 바이트를 만들므로
+    (응답 클래스를 거치지 않음) msgpack 을 원하면 여기서 JSON → msgpack 으로 변환.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        accept = Headers(scope=scope).get("accept", "")
+        token = _accept.set(accept)
+        try:
+            if wants_msgpack(accept):
+                await self.app(scope, receive, _MsgpackTranscoder(send))
+            else:
+                await self.app(scope, receive, send)
+        finally:
+            _accept.reset(token)
+
+
+class _MsgpackTranscoder:
+    """application/json 단일 본문 응답만 변환 (스트리밍/기타 타입은 그대로 통과)"""
+
+    def __init__(self, send: Send) -> None:
+        self.send = send
+        self.start: Message | None = None
+
+    async def __call__(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            headers = Headers(raw=message["headers"])
+            ctype = headers.get("content-type", "").partition(";")[0].strip()
+            if ctype == "application/json" and "content-encoding" not in headers:
+                self.start = message  # 본문을 보고 결정
+                return
+            await self.send(message)
+            return
+        if self.start is None or message["type"] != "http.response.body":
+            await self.send(message)
+            return
+
+        start, self.start = self.start, None
+        body = message.get("body", b"")
+        if message.get("more_body", False) or not body:
+            await self.send(start)
+            await self.send(message)
+            return
+        body = dumps_msgpack(orjson.loads(body) if orjson is not None else json.loads(body))
+        headers = MutableHeaders(raw=start["headers"])
+        headers["content-type"] = MSGPACK_MEDIA_TYPE
+        headers["content-length"] = str(len(body))
+        headers.add_vary_header("Accept")
+        await self.send(start)
+        await self.send({**message, "body": body})
+
+
+class BrotliResponder(IdentityResponder):
+    content_encoding = "br"
+
+    def __init__(self, app: ASGIApp, minimum_size: int, quality: int) -> None:
+        super().__init__(app, minimum_size)
+        self.compressor = brotli.Compressor(quality=quality)
+
+    async def apply_compression(self, body: bytes, *, more_body: bool) -> bytes:
+        out = self.compressor.process(body)
+        # 스트리밍 중에는 청크마다 flush → 클라이언트가 바로 풀어 쓸 수 있음
+        return out + (self.compressor.flush() if more_body else self.compressor.finish())
+
+
+def _accepts(accept_encoding: str, coding: str) -> bool:
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        if name.strip().lower() == coding:
+            return params.replace(" ", "") not in ("q=0", "q=0.0")
+    return False
+
+
+class CompressionMiddleware(GZipMiddleware):
+    """starlette GZipMiddleware + brotli (br 우선, 설치돼 있을 때만)"""
+
+    def __init__(
+        self, app: ASGIApp, minimum_size: int = 1024, gzip_level: int = 6, brotli_quality: int = 5
+    ) -> None:
+        super().__init__(app, minimum_size=minimum_size, compresslevel=gzip_level)
+        self.brotli_quality = brotli_quality
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] == "http" and brotli is not None:
+            if _accepts(Headers(scope=scope).get("accept-encoding", ""), "br"):
+                responder = BrotliResponder(self.app, self.minimum_size, self.brotli_quality)
+                await responder(scope, receive, send)
+                return
+        await super().__call__(scope, receive, send)  # gzip 또는 무압축
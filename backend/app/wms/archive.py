@@ -0,0 +1,530 @@
+# backend/app/wms/archive.py
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Iterator
+from fastapi import HTTPException
+from sqlalchemy import exists, func, insert, select
+from sqlalchemy.orm import Session, aliased
+from ..shared.config import BASE_DIR, settings
+from ..shared.db import SessionLocal
+from ..standards.models import ReleaseStatus, StdNode, StdRelease
+from . import models as m
+from .current import FALLBACK_STATUSES, current_ids
+from . import payloads
+from .ingest import payload_hash
+from .purge import delete_rows, maintain
+
+
+# 대체된(superseded) 배치 보관: wms_row → _data/archive/batch_<id>.parquet (압축, id 순)
+#   대상: 삭제/보관/적재 중이 아니고, 같은 source·project 에 더 새 received/validated 배치가 있으며,
+#         현재 배치(포인터 또는 대체 규칙)가 아니고, ACTIVE/DRAFT 릴리즈 링크가 없는 배치
+#         (DRAFT 는 편집 중인 릴리즈 → 보관으로 링크가 사라지지 않게 제외)
+#   보관: Parquet 작성 → archived_at 설정(이후 조회는 파일에서) → 행/링크는 purge 와 같은 청크 삭제
+#         링크는 batch_<id>.links.parquet 에 함께 보관 (ARCHIVED 릴리즈 링크)
+#         archived_at 을 설정하는 트랜잭션에서 배치 행을 잠그고(FOR UPDATE) 대상 여부/링크를 다시 확인
+#         → 작성 도중 할당된 링크가 있으면 중단. 링크 할당(check_linkable)은 같은 행을 FOR SHARE 로 잠금
+#   조회: preview / errors / items(batch_id·batch_ids 지정 시) 가 memory-map 으로 읽고 pyarrow 로 필터
+#   복원: 같은 row id 로 다시 적재 (없어진 payload 는 다시 저장/색인) + 링크 복원 → archived_at 해제, 파일 삭제
+#         SQLite 가 그 사이 id 를 재사용했으면 새 id 로 적재하고 링크도 새 id 로 옮김
+# 배치 카운터(total/ok/error_rows)는 보관 중에도 그대로 유지
+ARCHIVE_DIR = BASE_DIR / "_data" / "archive"
+_ACTIVE = ("queued", "parsing", "ingesting")  # jobs.py 진행 단계
+_IN_USE = (ReleaseStatus.ACTIVE, ReleaseStatus.DRAFT)  # 링크가 있으면 보관하지 않는 릴리즈
+_ROW_COLUMNS = (
+    m.WmsRow.id,
+    m.WmsRow.row_index,
+    m.WmsRow.status,
+    m.WmsRow.code,
+    m.WmsRow.name,
+    m.WmsRow.unit,
+    m.WmsRow.qty,
+    m.WmsRow.group_code,
+    m.WmsRow.payload_json,
+    m.WmsRow.errors_json,
+    m.WmsRow.payload_hash,
+    m.WmsRow.rules_fp,
+    m.WmsRow.validated_hash,
+)
+_INT_KEYS = frozenset({"id", "row_index"})
+_JSON_KEYS = ("payload_json", "errors_json")
+
+_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="wms-archive")
+_lock = threading.Lock()
+_state: dict = {
+    "running": False,
+    "batch_id": None,  # 지금 보관 중인 배치
+    "archived_batches": 0,
+    "archived_rows": 0,
+    "last_run_at": None,
+    "last_maintenance": None,
+    "errors": [],
+}
+
+
+def _pyarrow():
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        raise HTTPException(501, "pyarrow is required for batch archive")
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.parquet as pq
+
+    return pa, pc, pq
+
+
+def path_for(batch_id: int) -> Path:
+    return ARCHIVE_DIR / f"batch_{batch_id}.parquet"
+
+
+def _links_path(batch_id: int) -> Path:
+    return ARCHIVE_DIR / f"batch_{batch_id}.links.parquet"
+
+
+def remove_files(batch_id: int) -> None:
+    for p in (path_for(batch_id), _links_path(batch_id)):
+        for q in (p, p.with_name(p.name + ".tmp")):
+            try:
+                q.unlink()
+            except FileNotFoundError:
+                pass
+
+
+def archived(db: Session, batch_ids) -> dict[int, str | None]:
+    """batch_ids 중 보관된(삭제되지 않은) 배치 → source"""
+    ids = list(set(batch_ids))
+    if not ids:
+        return {}
+    rows = db.execute(
+        select(m.WmsBatch.id, m.WmsBatch.source).where(
+            m.WmsBatch.id.in_(ids),
+            m.WmsBatch.archived_at.is_not(None),
+            m.WmsBatch.deleted_at.is_(None),
+        )
+    )
+    return {int(bid): src for bid, src in rows}
+
+
+# === 보관 대상 ===
+def candidates(db: Session, batch_ids: list[int] | None = None) -> list[int]:
+    b = m.WmsBatch
+    newer = aliased(m.WmsBatch)
+    in_use_rids = select(StdRelease.id).where(StdRelease.status.in_(_IN_USE))
+    q = select(b.id, b.source).where(
+        b.deleted_at.is_(None),
+        b.archived_at.is_(None),
+        b.status.not_in(_ACTIVE),
+        exists().where(
+            newer.source == b.source,
+            newer.project_id.is_not_distinct_from(b.project_id),
+            newer.id > b.id,
+            newer.deleted_at.is_(None),
+            func.lower(newer.status).in_(FALLBACK_STATUSES),  # current.py 대체 규칙과 같음
+        ),
+        ~exists().where(m.WmsCurrentBatch.batch_id == b.id),
+        ~exists()
+        .where(m.StdWmsLink.wms_row_id == m.WmsRow.id)
+        .where(m.WmsRow.batch_id == b.id, m.StdWmsLink.std_release_id.in_(in_use_rids)),
+    )
+    if batch_ids is not None:
+        q = q.where(b.id.in_(batch_ids))
+    rows = db.execute(q.order_by(b.id)).all()
+    if not rows:
+        return []
+
+    # 포인터가 없는 source 는 대체 규칙(validated 최신 → 최신)으로 정해지는 현재 배치도 제외
+    sources = sorted({s for _, s in rows if s is not None})
+    keep = set(current_ids(db, sources).values())
+    projects = db.execute(
+        select(b.project_id).where(b.source.in_(sources), b.project_id.is_not(None)).distinct()
+    ).scalars()
+    for pid in projects:
+        keep.update(current_ids(db, sources, pid).values())
+    return [bid for bid, _ in rows if bid not in keep]
+
+
+# === 보관 / 복원 ===
+def _search_body(payload) -> str:
+    """검색 인덱스 본문과 같은 규칙: code / name / _raw 값들을 char(31)로 연결"""
+    p = payload if isinstance(payload, dict) else {}
+    raw = p.get("_raw") if isinstance(p.get("_raw"), dict) else {}
+    parts = [p.get("code"), p.get("name"), *(v for v in raw.values() if v is not None)]
+    return "\x1f".join("" if v is None else str(v) for v in parts)
+
+
+def _schema(pa):
+    fields = []
+    for c in _ROW_COLUMNS:
+        t = pa.int64() if c.key in _INT_KEYS else pa.float64() if c.key == "qty" else pa.string()
+        fields.append((c.key, t))
+    return pa.schema(fields + [("search_body", pa.string())])
+
+
+def _write_rows(db: Session, batch_id: int, path: Path) -> int:
+    pa, _, pq = _pyarrow()
+    schema = _schema(pa)
+    keys = [c.key for c in _ROW_COLUMNS]
+    stmt = select(*_ROW_COLUMNS).where(m.WmsRow.batch_id == batch_id).order_by(m.WmsRow.id)
+    group = max(settings.WMS_ARCHIVE_ROW_GROUP_SIZE, 1)
+    n = 0
+    buf: dict[str, list] = {f.name: [] for f in schema}
+
+    def flush(writer):
+        writer.write_table(pa.table(buf, schema=schema), row_group_size=group)
+        for v in buf.values():
+            v.clear()
+
+    with pq.ParquetWriter(path, schema, compression=settings.WMS_ARCHIVE_COMPRESSION) as writer:
+        result = db.execute(stmt, execution_options={"yield_per": settings.WMS_STREAM_CHUNK_SIZE})
+        for r in result:
+            for k, v in zip(keys, r):
+                if k in _JSON_KEYS and v is not None:
+                    v = json.dumps(v, ensure_ascii=False, separators=(",", ":"))
+                buf[k].append(v)
+            buf["search_body"].append(_search_body(r.payload_json))
+            n += 1
+            if len(buf["id"]) >= group:
+                flush(writer)
+        if buf["id"] or n == 0:
+            flush(writer)
+    return n
+
+
+def _batch_links(db: Session, batch_id: int) -> list[tuple]:
+    return db.execute(
+        select(m.StdWmsLink.std_release_id, m.StdWmsLink.std_node_uid, m.StdWmsLink.wms_row_id)
+        .join(m.WmsRow, m.WmsRow.id == m.StdWmsLink.wms_row_id)
+        .where(m.WmsRow.batch_id == batch_id)
+    ).all()
+
+
+def _write_links(db: Session, batch_id: int, path: Path) -> list[tuple]:
+    pa, _, pq = _pyarrow()
+    links = _batch_links(db, batch_id)
+    schema = pa.schema(
+        [("std_release_id", pa.int64()), ("std_node_uid", pa.string()), ("wms_row_id", pa.int64())]
+    )
+    cols = list(zip(*links)) if links else [[], [], []]
+    pq.write_table(pa.table([list(c) for c in cols], schema=schema), path)
+    return links
+
+
+def archive_batch(db: Session, batch_id: int) -> dict:
+    """보관 대상 배치 1건 보관 (Parquet 작성 후 행은 청크 삭제)"""
+    _pyarrow()
+    if batch_id not in candidates(db, [batch_id]):
+        raise HTTPException(
+            409,
+            "batch is not archivable "
+            "(current, not superseded, linked from an ACTIVE/DRAFT release, or busy)",
+        )
+    batch = db.get(m.WmsBatch, batch_id)
+    snapshot = (batch.total_rows, batch.ok_rows, batch.error_rows)
+    t0 = time.perf_counter()
+
+    ARCHIVE_DIR.mkdir(parents=True, exist_ok=True)
+    path, links_path = path_for(batch_id), _links_path(batch_id)
+    tmp, links_tmp = path.with_name(path.name + ".tmp"), links_path.with_name(links_path.name + ".tmp")
+    try:
+        rows = _write_rows(db, batch_id, tmp)
+        written = _write_links(db, batch_id, links_tmp)
+        links = len(written)
+        db.rollback()  # 읽기 트랜잭션 종료
+        os.replace(tmp, path)
+        os.replace(links_tmp, links_path)
+
+        # 작성하는 동안 검증/삭제/현재 지정/링크 할당 등으로 바뀌었으면 중단 (파일은 버림)
+        #   배치 행 잠금 → 이 트랜잭션이 끝날 때까지 check_linkable(FOR SHARE) 이 기다림
+        batch = db.execute(
+            select(m.WmsBatch).where(m.WmsBatch.id == batch_id).with_for_update()
+        ).scalar_one_or_none()
+        if (
+            batch is None
+            or (batch.total_rows, batch.ok_rows, batch.error_rows) != snapshot
+            or batch_id not in candidates(db, [batch_id])
+            or set(_batch_links(db, batch_id)) != set(written)
+        ):
+            raise HTTPException(409, "batch changed while archiving; retry")
+        size = path.stat().st_size + links_path.stat().st_size
+        batch.archived_at = datetime.utcnow()
+        batch.meta_json = {
+            **(batch.meta_json or {}),
+            "archive": {
+                "rows": rows,
+                "links": links,
+                "bytes": size,
+                "compression": settings.WMS_ARCHIVE_COMPRESSION,
+            },
+        }
+        db.commit()
+    except Exception:
+        db.rollback()
+        remove_files(batch_id)
+        raise
+
+    # 여기부터 조회는 Parquet → DB 행은 청크 단위로 정리
+    delete_rows(db, batch_id)
+    return {
+        "batch_id": batch_id,
+        "rows": rows,
+        "links": links,
+        "bytes": size,
+        "elapsed_sec": round(time.perf_counter() - t0, 3),
+    }
+
+
+def restore_batch(db: Session, batch_id: int) -> dict:
+    """보관된 배치를 같은 row id 로 wms_row 에 되돌림 (id 가 재사용됐으면 새 id 로)"""
+    pa, _, pq = _pyarrow()
+    batch = db.get(m.WmsBatch, batch_id)
+    if batch is None or batch.deleted_at is not None:
+        raise HTTPException(404, "batch not found")
+    if batch.archived_at is None:
+        raise HTTPException(409, "batch is not archived")
+    t0 = time.perf_counter()
+    table = _open(batch_id, [c.key for c in _ROW_COLUMNS])
+    chunk = max(settings.WMS_INGEST_CHUNK_SIZE, 1)
+
+    # SQLite 는 삭제된 최대 id 를 다시 쓸 수 있음 (wms_row 에 AUTOINCREMENT 없음)
+    # → 같은 id 가 하나라도 있으면 배치 전체를 새 id 로 적재 (row_index 로 보관 당시 id 와 대응)
+    remap = _ids_reused(db, table, chunk)
+    new_ids: dict[int, int] = {}  # 보관 당시 id → 새 id (remap 일 때만)
+
+    try:
+        for rows in _iter_dicts(table, chunk):
+            bodies = {}
+            for r in rows:
+                r["batch_id"] = batch_id
+                body = r.pop("payload_json")
+                r["payload_hash"] = r["payload_hash"] or payload_hash(body)
+                bodies[r["payload_hash"]] = body
+            payloads.store(db, bodies)  # 보관 중 gc 된 payload 만 다시 저장 + 색인
+            if remap:
+                old_ids = {r["row_index"]: r.pop("id") for r in rows}
+                inserted = db.execute(
+                    insert(m.WmsRow).returning(m.WmsRow.row_index, m.WmsRow.id), rows
+                )
+                new_ids.update((old_ids[ri], rid) for ri, rid in inserted)
+            else:
+                db.execute(insert(m.WmsRow), rows)
+            db.commit()  # 청크마다 커밋 (조회는 archived_at 해제 전까지 계속 Parquet)
+        links = _restore_links(db, batch_id, new_ids)
+        batch = db.get(m.WmsBatch, batch_id)
+        batch.archived_at = None
+        batch.meta_json = {k: v for k, v in (batch.meta_json or {}).items() if k != "archive"}
+        db.commit()
+    except Exception:
+        db.rollback()
+        delete_rows(db, batch_id)  # 일부만 들어간 행 정리 (보관본은 그대로)
+        raise
+    remove_files(batch_id)
+    return {
+        "batch_id": batch_id,
+        "rows": table.num_rows,
+        "links": links,
+        "remapped": remap,
+        "elapsed_sec": round(time.perf_counter() - t0, 3),
+    }
+
+
+def _ids_reused(db: Session, table, chunk: int) -> bool:
+    for part in table.column("id").chunks:
+        ids = part.to_pylist()
+        for i in range(0, len(ids), chunk):
+            used = db.execute(
+                select(func.count()).where(m.WmsRow.id.in_(ids[i : i + chunk]))
+            ).scalar_one()
+            if used:
+                return True
+    return False
+
+
+def _restore_links(db: Session, batch_id: int, new_ids: dict[int, int]) -> int:
+    """보관한 링크 중 표준 노드가 아직 있는 것만 복원"""
+    _, _, pq = _pyarrow()
+    path = _links_path(batch_id)
+    if not path.exists():
+        return 0
+    links = pq.read_table(path, memory_map=True).to_pylist()
+    by_release: dict[int, set[str]] = {}
+    for x in links:
+        by_release.setdefault(x["std_release_id"], set()).add(x["std_node_uid"])
+    alive: set[tuple[int, str]] = set()
+    for rid, uids in by_release.items():
+        found = db.execute(
+            select(StdNode.std_node_uid).where(
+                StdNode.std_release_id == rid, StdNode.std_node_uid.in_(uids)
+            )
+        ).scalars()
+        alive.update((rid, u) for u in found)
+    keep = [x for x in links if (x["std_release_id"], x["std_node_uid"]) in alive]
+    for x in keep:
+        x["wms_row_id"] = new_ids.get(x["wms_row_id"], x["wms_row_id"])
+    if keep:
+        db.execute(insert(m.StdWmsLink), keep)
+    return len(keep)
+
+
+# === 링크 할당 확인 ===
+def check_linkable(db: Session, row_ids) -> None:
+    """
+    링크 할당 전: 대상 행의 배치를 FOR SHARE 로 잠그고 보관(중)인 배치면 409
+    (archive_batch 의 마지막 확인과 직렬화). 보관 후 지워진 행도 409, 어디에도 없는 행은 404
+    """
+    ids = list(set(row_ids))
+    chunk = max(settings.WMS_INGEST_CHUNK_SIZE, 1)
+    found: set[int] = set()
+    bids: set[int] = set()
+    for i in range(0, len(ids), chunk):
+        for rid, bid in db.execute(
+            select(m.WmsRow.id, m.WmsRow.batch_id).where(m.WmsRow.id.in_(ids[i : i + chunk]))
+        ):
+            found.add(rid)
+            bids.add(bid)
+    held = []
+    if bids:
+        locked = db.execute(
+            select(m.WmsBatch.id, m.WmsBatch.archived_at)
+            .where(m.WmsBatch.id.in_(bids))
+            .with_for_update(read=True)
+        )
+        held = [bid for bid, archived_at in locked if archived_at is not None]
+    missing = [i for i in ids if i not in found]
+    if missing:
+        held = [*held, *_archived_owners(db, missing)]
+    if held:
+        raise HTTPException(
+            409, f"rows belong to archived batch {sorted(set(held))}; restore it first"
+        )
+    if missing:
+        raise HTTPException(404, f"rows not found: {sorted(missing)[:20]}")
+
+
+def _archived_owners(db: Session, row_ids: list[int]) -> list[int]:
+    """DB 에 없는 행 id → 그 행을 보관한 배치들 (id 통계로 row group 을 건너뜀)"""
+    owners = db.execute(
+        select(m.WmsBatch.id).where(
+            m.WmsBatch.archived_at.is_not(None), m.WmsBatch.deleted_at.is_(None)
+        )
+    ).scalars().all()
+    return [bid for bid in owners if _open(bid, ["id"], [("id", "in", row_ids)]).num_rows]
+
+
+# === 조회 (memory-map) ===
+def _open(batch_id: int, columns: list[str], filters: list | None = None):
+    _, _, pq = _pyarrow()
+    path = path_for(batch_id)
+    if not path.exists():
+        raise HTTPException(500, f"archive file for batch {batch_id} is missing")
+    # memory_map: 필요한 열의 페이지만 읽음, filters: row group 통계로 건너뜀 (id / 동등 조건)
+    return pq.read_table(path, columns=columns, memory_map=True, filters=filters or None)
+
+
+def scan(
+    batch_id: int,
+    columns: list[str],
+    *,
+    order: str = "asc",
+    cursor: int | None = None,
+    equals: dict | None = None,
+    search: str | None = None,
+    with_total: bool = False,
+):
+    """
+    보관된 배치 행을 조건으로 걸러 id 순으로 → (pyarrow Table, 전체 건수 | None)
+    전체 건수는 DB 경로(_count_rows)와 같이 cursor 이전 행도 포함
+    """
+    pa, pc, _ = _pyarrow()
+    desc = order == "desc"
+    filters = [(k, "==", v) for k, v in (equals or {}).items()]
+    if cursor is not None and not with_total:
+        filters.append(("id", "<" if desc else ">", cursor))
+    need = list(dict.fromkeys(["id", *columns] + (["search_body"] if search else [])))
+    t = _open(batch_id, need, filters)
+    if search:
+        # /items search= 와 같은 대소문자 무시 부분일치 (code / name / _raw 값)
+        t = t.filter(pc.match_substring(t["search_body"], search, ignore_case=True))
+    total = t.num_rows if with_total else None
+    if cursor is not None and with_total:
+        cmp = pc.less if desc else pc.greater
+        t = t.filter(cmp(t["id"], pa.scalar(cursor, pa.int64())))
+    t = t.sort_by([("id", "descending" if desc else "ascending")])
+    return t.select(list(dict.fromkeys(["id", *columns]))), total
+
+
+def _decode(rows: list[dict]) -> list[dict]:
+    for r in rows:
+        for k in _JSON_KEYS:
+            if r.get(k) is not None:
+                r[k] = json.loads(r[k])
+    return rows
+
+
+def page(table, offset: int = 0, limit: int | None = None) -> list[dict]:
+    n = table.num_rows - offset if limit is None else limit
+    return _decode(table.slice(offset, max(n, 0)).to_pylist())
+
+
+def _iter_dicts(table, chunk: int) -> Iterator[list[dict]]:
+    for rb in table.to_batches(max_chunksize=chunk):
+        yield _decode(rb.to_pylist())
+
+
+def iter_rows(table, chunk: int | None = None) -> Iterator[dict]:
+    """스트리밍 응답용: 레코드 배치 단위로 디코드 (전체를 파이썬 객체로 만들지 않음)"""
+    for rows in _iter_dicts(table, chunk or max(settings.WMS_STREAM_CHUNK_SIZE, 1)):
+        yield from rows
+
+
+# === 일괄 보관 (백그라운드) ===
+def status() -> dict:
+    with _lock:
+        return {**_state, "errors": list(_state["errors"])}
+
+
+def schedule() -> dict:
+    """현재 보관 대상 전체를 백그라운드로 보관 (이미 실행 중이면 상태만 반환)"""
+    _pyarrow()
+    with _lock:
+        if not _state["running"]:
+            _state.update(running=True, errors=[], archived_batches=0, archived_rows=0)
+            _executor.submit(_run)
+    return status()
+
+
+def _run() -> None:
+    db = SessionLocal()
+    try:
+        batch_ids = candidates(db)
+        db.rollback()
+        for bid in batch_ids:
+            with _lock:
+                _state["batch_id"] = bid
+            try:
+                res = archive_batch(db, bid)
+                with _lock:
+                    _state["archived_batches"] += 1
+                    _state["archived_rows"] += res["rows"]
+            except Exception as e:
+                detail = e.detail if isinstance(e, HTTPException) else f"{type(e).__name__}: {e}"
+                with _lock:
+                    _state["errors"].append({"batch_id": bid, "error": detail})
+        if batch_ids:
+            result = maintain()
+            with _lock:
+                _state["last_maintenance"] = result
+    except Exception as e:
+        import traceback
+
+        traceback.print_exc()
+        with _lock:
+            _state["errors"].append({"batch_id": None, "error": f"{type(e).__name__}: {e}"})
+    finally:
+        db.close()
+        with _lock:
+            _state.update(running=False, batch_id=None, last_run_at=datetime.utcnow().isoformat())
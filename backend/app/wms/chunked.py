@@ -0,0 +1,153 @@
+# backend/app/wms/chunked.py
+import hashlib
+import json
+import os
+import re
+import shutil
+import time
+import uuid
+from pathlib import Path
+from typing import AsyncIterator
+from fastapi import HTTPException
+from fastapi.concurrency import run_in_threadpool
+from ..shared.config import BASE_DIR, settings
+
+
+# 분할(재개 가능) 업로드 세션: _data/chunked/<upload_id>/
+#   meta.json       세션 정보 (filename, total_chunks, created_at)
+#   <index>.part    수신 완료된 청크 (.tmp로 받은 뒤 rename → 부분 수신 청크는 남지 않음)
+#   upload.<ext>    finalize 가 이어붙인 파일. 처리에 성공해야 세션 삭제 → 실패(503/파싱/DB 오류) 시
+#                   같은 upload_id 로 finalize 재시도 가능 (청크 재전송 없음, TTL 까지 보관)
+CHUNK_ROOT = BASE_DIR / "_data" / "chunked"
+_ID_RE = re.compile(r"^[0-9a-f]{32}$")
+_WRITE_BUF = 1024 * 1024  # 스레드로 넘기는 쓰기 단위
+
+
+def _dir(upload_id: str) -> Path:
+    if not _ID_RE.match(upload_id or ""):
+        raise HTTPException(404, "upload session not found")
+    return CHUNK_ROOT / upload_id
+
+
+def _prune_stale(now: float) -> None:
+    if not CHUNK_ROOT.exists():
+        return
+    for d in CHUNK_ROOT.iterdir():
+        try:
+            if now - d.stat().st_mtime > settings.WMS_CHUNKED_TTL_SEC:
+                shutil.rmtree(d, ignore_errors=True)
+        except OSError:
+            pass
+
+
+def create_session(filename: str | None, total_chunks: int | None) -> dict:
+    now = time.time()
+    _prune_stale(now)
+    upload_id = uuid.uuid4().hex
+    d = CHUNK_ROOT / upload_id
+    d.mkdir(parents=True)
+    meta = {
+        "upload_id": upload_id,
+        "filename": filename,
+        "total_chunks": total_chunks,
+        "created_at": now,
+    }
+    (d / "meta.json").write_text(json.dumps(meta), encoding="utf-8")
+    return meta
+
+
+def load_session(upload_id: str) -> dict:
+    d = _dir(upload_id)
+    try:
+        meta = json.loads((d / "meta.json").read_text(encoding="utf-8"))
+    except FileNotFoundError:
+        raise HTTPException(404, "upload session not found")
+    meta["received"] = received_chunks(upload_id)
+    meta["assembled"] = _assembled(d) is not None
+    return meta
+
+
+def _assembled(d: Path) -> Path | None:
+    return next((p for p in d.glob("upload.*") if p.suffix != ".tmp"), None)
+
+
+def received_chunks(upload_id: str) -> list[int]:
+    d = _dir(upload_id)
+    return sorted(int(p.stem) for p in d.glob("*.part"))
+
+
+async def write_chunk(
+    upload_id: str, index: int, stream: AsyncIterator[bytes], expected_sha256: str | None
+) -> dict:
+    """요청 본문을 그대로 디스크에 기록 (같은 index 재전송 시 덮어씀). 파일 쓰기는 스레드에서"""
+    meta = await run_in_threadpool(load_session, upload_id)
+    total = meta.get("total_chunks")
+    if index < 0 or (total is not None and index >= total):
+        raise HTTPException(400, f"chunk index out of range: {index}")
+    if meta["assembled"]:
+        raise HTTPException(409, "upload already assembled; finalize again or delete the session")
+
+    d = _dir(upload_id)
+    tmp = d / f"{index}.tmp"
+    h = hashlib.sha256()
+    size = 0
+    buf = bytearray()
+    try:
+        out = await run_in_threadpool(open, tmp, "wb")
+        try:
+            async for chunk in stream:
+                size += len(chunk)
+                if size > settings.WMS_CHUNK_MAX_BYTES:
+                    raise HTTPException(413, "chunk too large")
+                h.update(chunk)
+                buf += chunk
+                if len(buf) >= _WRITE_BUF:
+                    await run_in_threadpool(out.write, bytes(buf))
+                    buf.clear()
+            if buf:
+                await run_in_threadpool(out.write, bytes(buf))
+        finally:
+            await run_in_threadpool(out.close)
+        digest = h.hexdigest()
+        if expected_sha256 and expected_sha256.lower() != digest:
+            raise HTTPException(400, "chunk checksum mismatch")
+        await run_in_threadpool(os.replace, tmp, d / f"{index}.part")
+    finally:
+        await run_in_threadpool(tmp.unlink, missing_ok=True)
+    return {"upload_id": upload_id, "index": index, "size": size, "sha256": digest}
+
+
+def assemble(upload_id: str, total_chunks: int | None) -> tuple[Path, dict]:
+    """
+    청크들을 순서대로 하나의 파일로 이어붙임 (스트리밍 복사). 반환: (파일 경로, 세션 meta)
+    이미 이어붙인 파일이 있으면(이전 finalize 실패 후 재시도) 그대로 사용.
+    """
+    meta = load_session(upload_id)
+    d = _dir(upload_id)
+    done = _assembled(d)
+    if done is not None:
+        return done, meta
+    total = total_chunks or meta.get("total_chunks")
+    if not total:
+        raise HTTPException(400, "total_chunks is required")
+    missing = sorted(set(range(total)) - set(meta["received"]))
+    if missing:
+        raise HTTPException(
+            409, {"message": "upload incomplete", "missing": missing[:100], "total": total}
+        )
+
+    suffix = Path(meta.get("filename") or "").suffix.lower()
+    out_path = d / f"upload{suffix if suffix and suffix != '.tmp' else '.bin'}"
+    tmp = d / "upload.tmp"
+    with open(tmp, "wb") as out:
+        for i in range(total):
+            with open(d / f"{i}.part", "rb") as f:
+                shutil.copyfileobj(f, out, length=1024 * 1024)
+    os.replace(tmp, out_path)  # 완성된 뒤에만 보임 → 그 다음 청크 삭제 (디스크 2배 사용 구간 최소화)
+    for i in range(total):
+        (d / f"{i}.part").unlink(missing_ok=True)
+    return out_path, meta
+
+
+def discard(upload_id: str) -> None:
+    shutil.rmtree(_dir(upload_id), ignore_errors=True)
@@ -0,0 +1,168 @@
+# backend/app/wms/columnar.py
+from datetime import date, datetime, time as dtime
+from pathlib import Path
+from typing import IO, Iterator
+from fastapi import HTTPException
+from .excel import _clean_cell, _dedup_columns, _field_indexes
+from .values import to_number
+
+
+# CSV / Parquet / Arrow IPC 업로드 → Work Master와 같은 item 형태
+#   { code, name, qty, unit, group_code, _raw: {<컬럼>: 값, ...} }
+# pyarrow 레코드 배치 단위로 읽고 열 단위(pyarrow.compute)로 정규화 → 메모리는 배치 크기에 비례
+FORMATS = ("xlsx", "csv", "parquet", "arrow")
+BATCH_ROWS = 64_000
+_FIELDS = ("code", "name", "qty", "unit", "group_code")
+
+
+def detect_format(fileobj: IO[bytes], filename: str | None = None) -> str:
+    """매직 바이트 우선, 없으면 확장자, 그래도 모르면 csv"""
+    head = fileobj.read(8)
+    fileobj.seek(0)
+    if head[:4] == b"PAR1":
+        return "parquet"
+    if head[:6] == b"ARROW1" or head[:4] == b"\xff\xff\xff\xff":
+        return "arrow"
+    if head[:4] == b"PK\x03\x04":
+        return "xlsx"
+    ext = Path(filename or "").suffix.lower()
+    if ext in (".parquet", ".pq"):
+        return "parquet"
+    if ext in (".arrow", ".feather", ".ipc", ".arrows"):
+        return "arrow"
+    if ext in (".xlsx", ".xlsm"):
+        return "xlsx"
+    return "csv"
+
+
+def _pyarrow():
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        raise HTTPException(501, "pyarrow is required for csv/parquet/arrow uploads")
+    import pyarrow as pa
+    import pyarrow.compute as pc
+
+    return pa, pc
+
+
+def _field_map(cols: list[str]) -> dict[str, int | None]:
+    """정확한 필드명(code/name/...)이 있으면 우선, 없으면 Work Master 헤더 토큰 매칭"""
+    lower = [c.strip().lower() for c in cols]
+    idx = _field_indexes(cols)
+    for f in _FIELDS:
+        if f in lower:
+            idx[f] = lower.index(f)
+    return idx
+
+
+def _clean_array(arr) -> list:
+    """엑셀 경로의 셀 정규화와 동일 규칙 (strip, ''/'nan' → None, 숫자 → float, 날짜 → ISO)"""
+    pa, pc = _pyarrow()
+    t = arr.type
+    if pa.types.is_dictionary(t):
+        arr = arr.dictionary_decode()
+        t = arr.type
+    if pa.types.is_string(t) or pa.types.is_large_string(t):
+        s = pc.utf8_trim_whitespace(arr)
+        blank = pc.or_(pc.equal(s, ""), pc.equal(pc.utf8_lower(s), "nan"))
+        return pc.if_else(blank, pa.scalar(None, s.type), s).to_pylist()
+    if pa.types.is_floating(t):
+        f = pc.cast(arr, pa.float64())
+        # NaN/±inf → None (JSON 으로 저장할 수 없는 값, _qty_array 와 같은 규칙)
+        return pc.if_else(pc.is_finite(f), f, pa.scalar(None, pa.float64())).to_pylist()
+    if pa.types.is_integer(t) or pa.types.is_boolean(t) or pa.types.is_decimal(t):
+        return pc.cast(arr, pa.float64()).to_pylist()
+    if pa.types.is_null(t):
+        return [None] * len(arr)
+    return [
+        v.isoformat() if isinstance(v, (datetime, date, dtime)) else _clean_cell(v)
+        for v in arr.to_pylist()
+    ]
+
+
+def _qty_array(arr) -> list:
+    pa, pc = _pyarrow()
+    t = arr.type
+    if pa.types.is_integer(t) or pa.types.is_floating(t) or pa.types.is_decimal(t):
+        f = pc.cast(arr, pa.float64())
+        return pc.if_else(pc.is_finite(f), f, pa.scalar(None, pa.float64())).to_pylist()
+    return [to_number(v) for v in arr.to_pylist()]  # 문자열 등: to_numeric(coerce) 대응
+
+
+def _record_batches(src, fmt: str):
+    pa, _ = _pyarrow()
+    if fmt == "parquet":
+        import pyarrow.parquet as pq
+
+        pf = pq.ParquetFile(src)
+        return pf.schema_arrow.names, pf.iter_batches(batch_size=BATCH_ROWS)
+    if fmt == "arrow":
+        try:
+            reader = pa.ipc.open_file(src)
+            batches = (reader.get_batch(i) for i in range(reader.num_record_batches))
+        except pa.ArrowInvalid:
+            if hasattr(src, "seek"):
+                src.seek(0)
+            reader = pa.ipc.open_stream(src)
+            batches = iter(reader)
+        return reader.schema.names, batches
+    if fmt == "csv":
+        import pyarrow.csv as pacsv
+
+        # 타입 추론은 첫 블록만 보고 정해짐 → 뒤쪽 블록의 다른 형태 값(숫자 열의 'N/A' 등)에서 실패
+        # → 헤더만 먼저 읽어 모든 열을 문자열로 고정, 변환은 정규화(_clean_array / _qty_array)에 맡김
+        names = pacsv.open_csv(src, read_options=pacsv.ReadOptions(block_size=1 << 16)).schema.names
+        if hasattr(src, "seek"):
+            src.seek(0)
+        reader = pacsv.open_csv(
+            src,
+            read_options=pacsv.ReadOptions(block_size=16 << 20),
+            convert_options=pacsv.ConvertOptions(
+                column_types={n: pa.string() for n in names}, strings_can_be_null=True
+            ),
+        )
+        return reader.schema.names, iter(reader)
+    raise HTTPException(400, f"unsupported format: {fmt}")
+
+
+def open_columnar(src: IO[bytes] | str, fmt: str) -> tuple[list[str], Iterator[dict]]:
+    """
+    반환: (raw_columns, items_iter)
+      - raw_columns: 디듀프된 원본 컬럼명 (빈 이름은 'unnamed')
+      - items_iter: 레코드 배치를 열 단위로 정규화해 item dict를 한 행씩 yield
+    """
+    names, batches = _record_batches(src, fmt)
+    cols_flat = [(n or "").strip() or "unnamed" for n in names]
+    raw_columns = _dedup_columns(cols_flat)
+    idx = _field_map(cols_flat)
+
+    def gen() -> Iterator[dict]:
+        for rb in batches:
+            n = rb.num_rows
+            if not n:
+                continue
+            cleaned = [_clean_array(rb.column(j)) for j in range(len(raw_columns))]
+            none_col = [None] * n
+
+            def field(key: str) -> list:
+                j = idx[key]
+                return cleaned[j] if j is not None else none_col
+
+            qty = _qty_array(rb.column(idx["qty"])) if idx["qty"] is not None else none_col
+            for c, nm, q, u, g, vals in zip(
+                field("code"), field("name"), qty, field("unit"), field("group_code"),
+                zip(*cleaned),
+            ):  # fmt: skip
+                if all(v is None for v in vals):
+                    continue  # 빈 행
+                yield {
+                    "code": c or "",
+                    "name": nm,
+                    "qty": q,
+                    "unit": u,
+                    "group_code": g,
+                    "_raw": dict(zip(raw_columns, vals)),
+                }
+
+    return raw_columns, gen()
@@ -0,0 +1,38 @@
+# backend/app/wms/counters.py
+from sqlalchemy import update
+from sqlalchemy.orm import Session
+from . import models as m
+
+
+# wms_batch.total_rows / ok_rows / error_rows 유지
+#   적재(insert_rows), 검증(validate_required / rules_pandas)이 행을 바꾸는 같은 트랜잭션에서
+#   증감만 반영 → /batches 목록은 wms_row 를 GROUP BY 하지 않고 카운터를 그대로 읽음
+#   (UPDATE ... SET x = x + :d 이므로 동시에 갱신돼도 값이 덮어써지지 않음)
+def bump(db: Session, batch_id: int, *, total: int = 0, ok: int = 0, error: int = 0) -> None:
+    if not (total or ok or error):
+        return
+    t = m.WmsBatch.__table__
+    db.execute(
+        update(t)
+        .where(t.c.id == batch_id)
+        .values(
+            total_rows=t.c.total_rows + total,
+            ok_rows=t.c.ok_rows + ok,
+            error_rows=t.c.error_rows + error,
+        )
+    )
+
+
+def apply_validation(db: Session, batch_id: int, stats: dict, errors: int) -> None:
+    """
+    재검증 결과를 카운터에 반영.
+    stats = validation.stale_stats (대상 행의 갱신 전 상태), errors = 대상 행 중 새 error 수
+    검증된 적 있는 행(rules_fp 있음)은 ok 또는 error → 이전 ok = checked - fresh - prev_errors
+    """
+    prev_ok = stats["checked"] - stats["fresh"] - stats["prev_errors"]
+    bump(
+        db,
+        batch_id,
+        ok=(stats["checked"] - errors) - prev_ok,
+        error=errors - stats["prev_errors"],
+    )
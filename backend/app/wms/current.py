@@ -0,0 +1,66 @@
+# backend/app/wms/current.py
+from sqlalchemy import case, delete, exists, func, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+from . import models as m
+
+
+# source(+프로젝트)별 현재 배치 (wms_current_batch 포인터 테이블)
+#   우선순위: 지정된 포인터 → 없으면 validated 최신 → 없으면 가장 최신  (이전 meta_json.is_current 규칙과 동일)
+#   대체 후보는 적재가 끝난 배치(received / validated)만 — 실패/적재 중/invalid 배치는 대체 대상이 아님
+#   포인터 조회는 PK (source, project_id) 인덱스 1회, 지정은 upsert 1회
+#   project_id=0 은 프로젝트 구분 없는 source 전체 포인터
+FALLBACK_STATUSES = ("received", "validated")
+
+
+def set_current(db: Session, source: str, batch_id: int, project_id: int = 0) -> None:
+    """커밋은 호출 측"""
+    dialect = postgresql if db.get_bind().dialect.name == "postgresql" else sqlite
+    stmt = dialect.insert(m.WmsCurrentBatch).values(
+        source=source, project_id=project_id, batch_id=batch_id
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["source", "project_id"],
+        set_={"batch_id": stmt.excluded.batch_id, "updated_at": func.now()},
+    )
+    db.execute(stmt)
+
+
+def clear_batch(db: Session, batch_id: int) -> None:
+    """배치 삭제 시 포인터 제거 (SQLite 는 FK CASCADE 가 꺼져 있을 수 있음)"""
+    db.execute(delete(m.WmsCurrentBatch).where(m.WmsCurrentBatch.batch_id == batch_id))
+
+
+def pointer_ids(db: Session, sources: list[str], project_id: int = 0) -> dict[str, int]:
+    """지정된 포인터만 (전체 source 를 쿼리 1회로)"""
+    if not sources:
+        return {}
+    t = m.WmsCurrentBatch
+    rows = db.execute(
+        select(t.source, t.batch_id).where(t.source.in_(sources), t.project_id == project_id)
+    )
+    return {s: int(b) for s, b in rows}
+
+
+def current_ids(db: Session, sources: list[str], project_id: int = 0) -> dict[str, int]:
+    """포인터 우선, 포인터가 없는 source 만 최신 배치로 대체 (쿼리 최대 2회)"""
+    out = pointer_ids(db, sources, project_id)
+    missing = [s for s in dict.fromkeys(sources) if s not in out]
+    if missing:
+        b = m.WmsBatch
+        validated = case((func.lower(b.status) == "validated", b.id))
+        q = select(b.source, func.max(validated), func.max(b.id)).where(
+            b.source.in_(missing),
+            b.deleted_at.is_(None),  # 소프트 삭제된 배치 제외
+            func.lower(b.status).in_(FALLBACK_STATUSES),
+        )
+        if project_id:
+            q = q.where(b.project_id == project_id)
+        rows = db.execute(q.group_by(b.source))
+        out.update({s: int(v if v is not None else latest) for s, v, latest in rows})
+    return out
+
+
+def is_current_expr():
+    """목록 SELECT 용: 이 배치를 가리키는 포인터가 있는지 (batch_id 인덱스)"""
+    return exists().where(m.WmsCurrentBatch.batch_id == m.WmsBatch.id)
@@ -0,0 +1,194 @@
+# backend/app/wms/excel.py
+import math
+import numbers
+from datetime import datetime
+from itertools import chain
+from typing import IO, Iterator
+from .values import to_number
+
+
+# pandas.read_excel 기본 na_values (스트리밍 파서도 동일하게 결측 처리)
+_PANDAS_NA = {
+    "", "#N/A", "#N/A N/A", "#NA", "-1.#IND", "-1.#QNAN", "-NaN", "-nan", "1.#IND",
+    "1.#QNAN", "<NA>", "N/A", "NA", "NULL", "NaN", "None", "n/a", "nan", "null",
+}  # fmt: skip
+
+
+# === 헤더 처리 (pandas/스트리밍 공용) ===
+def _flatten_header(top: list[str], sub: list[str]) -> list[str]:
+    cols_flat = []
+    for a, b in zip(top, sub):
+        a = a.strip()
+        b = b.strip()
+        name = f"{a} {b}".strip()
+        cols_flat.append(name if name else "unnamed")
+    return cols_flat
+
+
+def _dedup_columns(cols_flat: list[str]) -> list[str]:
+    """열 이름 디듀프 (중복 시 __2, __3 ... 접미사)"""
+    counts = {}
+    dedup_cols = []
+    for name in cols_flat:
+        key = name or "unnamed"
+        counts[key] = counts.get(key, 0) + 1
+        dedup_cols.append(key if counts[key] == 1 else f"{key}__{counts[key]}")
+    return dedup_cols
+
+
+def _field_indexes(cols_flat: list[str]) -> dict[str, int | None]:
+    """토큰 매칭을 "원본(flat) 컬럼명" 기준으로 정규화 필드 → 열 인덱스"""
+
+    def find_idx(cands: list[str]) -> int | None:
+        for i, c in enumerate(cols_flat):
+            for cand in cands:
+                if cand.lower() in c.lower():
+                    return i
+        return None
+
+    return {
+        "name": find_idx(["Category(Middle) Description"]) or find_idx(["Description"]),
+        "code": find_idx(["Work Master", "Work Master Code"]),
+        "qty": find_idx(["Qty", "Quantity"]),
+        "unit": find_idx(["UoM1", "UoM 1", "UoM"]),
+        "group_code": find_idx(["Work Group Code"]),
+    }
+
+
+# === 스트리밍 파서 (openpyxl read-only) ===
+def _cell(v):
+    """read_excel과 동일하게 na_values 문자열/NaN을 결측(None)으로"""
+    if isinstance(v, str) and v in _PANDAS_NA:
+        return None
+    if isinstance(v, float) and math.isnan(v):
+        return None
+    return v
+
+
+def _clean_cell(v):
+    if v is None:
+        return None
+    if isinstance(v, str):
+        s = v.strip()
+        return s if s != "" and s.lower() != "nan" else None
+    if isinstance(v, datetime):
+        return v.isoformat()
+    if isinstance(v, numbers.Number):
+        return float(v)
+    return v
+
+
+def _header_text(row: tuple, width: int) -> list[str]:
+    out = []
+    for j in range(width):
+        v = _cell(row[j]) if j < len(row) else None
+        out.append("" if v is None else str(v))
+    return out
+
+
+def _trimmed_len(row: tuple) -> int:
+    """뒤쪽 빈 셀(None / '') 을 뺀 길이 (pandas openpyxl 리더의 행 trim 과 같은 기준, 'N/A' 등은 셀로 셈)"""
+    n = len(row)
+    while n and (row[n - 1] is None or row[n - 1] == ""):
+        n -= 1
+    return n
+
+
+def _sheet_width(ws, header_width: int) -> int:
+    """
+    pandas.read_excel(header=None) 의 열 수 = 모든 행의 (뒤쪽 빈 셀 제외) 최대 길이.
+    헤더 범위를 넘는 열도 'unnamed' 열로 유지 (openpyxl 은 시트 dimension 까지만 읽음).
+    dimension 이 헤더 범위 안이면 헤더 폭 그대로, 넘거나 없으면 시트를 한 번 훑어 실제 폭 계산
+    """
+    dim = ws.max_column
+    if dim is not None and dim <= header_width:
+        return header_width
+    width = header_width
+    for row in ws.iter_rows(values_only=True):
+        width = max(width, _trimmed_len(row))
+    return width
+
+
+def open_work_master_excel(
+    fileobj: IO[bytes] | str, sheet_name: str | None = None
+) -> tuple[list[str], str, Iterator[dict]]:
+    """
+    Work Master 엑셀을 openpyxl read-only 모드로 스트리밍 파싱.
+    반환: (raw_columns, sheet_used, items_iter)
+      - items_iter: normalize_work_master_excel과 같은 item dict를 한 행씩 yield
+    헤더 2행(Discipline 행 + 다음 행)만 먼저 읽고, 본문은 소비하는 만큼만 읽으므로
+    시트 크기와 무관하게 메모리가 일정합니다. 열 범위는 pandas 경로와 같습니다(_sheet_width).
+    """
+    from openpyxl import load_workbook  # 지연 로드 (openpyxl이 numpy를 끌어옴)
+
+    wb = load_workbook(fileobj, read_only=True, data_only=True)
+    try:
+        sheet = sheet_name or wb.sheetnames[0]
+        ws = wb[sheet]
+
+        # 헤더 2행 탐지 (Discipline가 포함된 행 + 다음 행), 없으면 첫 행
+        rows = ws.iter_rows(values_only=True)
+        h1_row = None
+        for row in rows:
+            first = _cell(row[0]) if row else None
+            if first is not None and "Discipline" in str(first):
+                h1_row = row
+                break
+        if h1_row is None:
+            rows = ws.iter_rows(values_only=True)
+            h1_row = next(rows, ())
+        h2_row = next(rows, ())
+        width = _sheet_width(ws, max(_trimmed_len(h1_row), _trimmed_len(h2_row)))
+    except Exception:
+        wb.close()
+        raise
+
+    cols_flat = _flatten_header(_header_text(h1_row, width), _header_text(h2_row, width))
+    raw_columns = _dedup_columns(cols_flat)
+    idx = _field_indexes(cols_flat)
+
+    def pick(vals: list, key: str):
+        j = idx[key]
+        return vals[j] if j is not None and 0 <= j < width else None
+
+    def gen() -> Iterator[dict]:
+        try:
+            for row in rows:
+                vals = [_cell(row[j]) if j < len(row) else None for j in range(width)]
+                if all(v is None for v in vals):
+                    continue  # dropna(how="all")
+
+                name = pick(vals, "name")
+                if str(name).strip().lower() == "description":
+                    continue  # 'Description' 헤더 잔재 행
+
+                yield {
+                    "code": _clean_cell(pick(vals, "code")) or "",
+                    "name": _clean_cell(name),
+                    "qty": to_number(pick(vals, "qty")),
+                    "unit": _clean_cell(pick(vals, "unit")),
+                    "group_code": _clean_cell(pick(vals, "group_code")),
+                    "_raw": dict(zip(raw_columns, map(_clean_cell, vals))),
+                }
+        finally:
+            wb.close()
+
+    return raw_columns, sheet, gen()
+
+
+def sheet_names(fileobj: IO[bytes] | str) -> list[str]:
+    from openpyxl import load_workbook
+
+    wb = load_workbook(fileobj, read_only=True)
+    try:
+        return list(wb.sheetnames)
+    finally:
+        wb.close()
+
+
+def peek(items: Iterator[dict]) -> tuple[dict | None, Iterator[dict]]:
+    """첫 item을 꺼내 보고, 원래 순서를 유지한 이터레이터를 돌려줌"""
+    first = next(items, None)
+    if first is None:
+        return None, iter(())
+    return first, chain([first], items)
@@ -0,0 +1,148 @@
+# backend/app/wms/excel_pandas.py
+# pandas 기반 Work Master 정규화. API 프로세스에서는 import 하지 않고
+# parse_pool의 워커 프로세스에서만 로드됩니다.
+from io import BytesIO
+import pandas as pd
+import numpy as np
+from .excel import _dedup_columns, _field_indexes, _flatten_header
+
+
+# pandas.api.types.infer_dtype 결과 분류
+_NUMERIC_KINDS = {"integer", "floating", "mixed-integer-float", "boolean"}
+_MIXED_KINDS = {"mixed", "mixed-integer"}  # str 과 다른 타입(숫자/불리언/날짜)이 섞인 object 열
+
+
+def _str_mask(s: pd.Series, na: np.ndarray) -> np.ndarray:
+    """str 원소 위치 (bool ndarray). 섞인 열은 원소 단위 isinstance 로 판정"""
+    kind = pd.api.types.infer_dtype(s, skipna=True)
+    if kind == "string":
+        return ~na
+    if kind not in _MIXED_KINDS:
+        return np.zeros(len(s), dtype=bool)
+    return np.fromiter((isinstance(v, str) for v in s.to_numpy()), dtype=bool, count=len(s))
+
+
+def _clean_scalar(v):
+    # 위치 기반으로 가져오기 때문에 v는 스칼라
+    if v is None:
+        return None
+    try:
+        if pd.isna(v):
+            return None
+    except Exception:
+        pass
+    if isinstance(v, str):
+        s = v.strip()
+        return s if s != "" and s.lower() != "nan" else None
+    if isinstance(v, (pd.Timestamp,)):
+        return v.isoformat()
+    if isinstance(v, (int, float, np.number)):
+        return float(v)
+    return v
+
+
+def _clean_column(col: pd.Series) -> np.ndarray:
+    """
+    _clean_scalar를 열 단위로 적용 (결과: object ndarray, 결측은 None).
+      - 문자열: strip, ""/"nan" → None
+      - 숫자/불리언: float
+      - 그 외(Timestamp 등) 소수 셀만 _clean_scalar로 개별 처리
+    """
+    out = np.full(len(col), None, dtype=object)
+    na = col.isna().to_numpy()
+
+    if col.dtype != object:
+        if pd.api.types.is_numeric_dtype(col.dtype):
+            vals = col.to_numpy(dtype=float, na_value=np.nan)
+            out[~na] = vals[~na].tolist()
+        else:  # datetime64 등
+            out[~na] = [_clean_scalar(v) for v in col[~na]]
+        return out
+
+    rest = ~na
+    is_str = _str_mask(col, na)
+    if is_str.any():
+        # ✅ str 원소만 .str 처리 ([1, True, 2] / [1, datetime] 같은 섞인 열은 .str 접근 불가)
+        stripped = pd.Series(col.to_numpy()[is_str], dtype=object).str.strip()
+        blank = (stripped.eq("") | stripped.str.lower().eq("nan")).to_numpy()
+        pos = np.flatnonzero(is_str)
+        out[pos[~blank]] = stripped.to_numpy()[~blank]
+        rest &= ~is_str
+
+    if rest.any():
+        others = col[rest]
+        if pd.api.types.infer_dtype(others, skipna=False) in _NUMERIC_KINDS:
+            out[rest] = others.to_numpy(dtype=float).tolist()
+        else:
+            out[rest] = [_clean_scalar(v) for v in others]
+    return out
+
+
+def _normalize_raw_frame(raw: pd.DataFrame) -> tuple[list[dict], list[str]]:
+    """header=None으로 읽은 시트 프레임 → (items, raw_columns)"""
+    # 헤더 2행 탐지 (Discipline가 포함된 행 + 다음 행)
+    h1_candidates = raw.index[raw.iloc[:, 0].astype(str).str.contains("Discipline", na=False)]
+    h1 = int(h1_candidates.min()) if len(h1_candidates) else 0
+    h2 = h1 + 1
+
+    top = raw.iloc[h1].fillna("").astype(str).tolist()
+    sub = raw.iloc[h2].fillna("").astype(str).tolist()
+    cols_flat = _flatten_header(top, sub)
+
+    # 본문 + 인덱스 리셋
+    df = raw.iloc[h2 + 1 :]
+    df = df.dropna(how="all").reset_index(drop=True)
+
+    raw_columns = _dedup_columns(cols_flat)  # UI/메타로 반환할 원본 열 목록
+    idx = _field_indexes(cols_flat)
+
+    # 'Description' 헤더 잔재 행 제거
+    if idx["name"] is not None:
+        name_raw = df.iloc[:, idx["name"]]
+        df = df[~name_raw.astype(str).str.strip().str.lower().eq("description")]
+
+    # ✅ 열 단위 정규화 (행×열 clean_scalar 호출 제거)
+    cleaned = [_clean_column(df.iloc[:, j]) for j in range(len(raw_columns))]
+    none_col = [None] * len(df)
+
+    def field(key: str) -> list:
+        j = idx[key]
+        return cleaned[j].tolist() if j is not None and 0 <= j < len(cleaned) else none_col
+
+    if idx["qty"] is not None:
+        qty_arr = pd.to_numeric(df.iloc[:, idx["qty"]], errors="coerce").to_numpy(dtype=float)
+        qty_arr = np.where(np.isfinite(qty_arr), qty_arr, np.nan)  # ±inf → 결측 (values.to_number)
+        qty = [None if q != q else q for q in qty_arr.tolist()]  # NaN → None
+    else:
+        qty = none_col
+
+    # 열 배열 → 행 튜플 (열이 하나도 없으면 빈 _raw)
+    raw_rows = zip(*cleaned) if cleaned else (() for _ in range(len(df)))
+
+    items = [
+        {
+            "code": c or "",
+            "name": n,
+            "qty": q,
+            "unit": u,
+            "group_code": g,
+            "_raw": dict(zip(raw_columns, vals)),  # 원본 전체 보존
+        }
+        for c, n, q, u, g, vals in zip(
+            field("code"), field("name"), qty, field("unit"), field("group_code"), raw_rows
+        )
+    ]
+    return items, raw_columns
+
+
+def normalize_work_master_excel(src: bytes | str, sheet_name: str | None = None):
+    """
+    src: 엑셀 bytes 또는 파일 경로
+    반환: (items, raw_columns)
+      - items: 각 행 dict: { code, name, qty, unit, group_code, _raw: {<원본헤더(디듀프)>: 값, ...} }
+      - raw_columns: 디듀프된 원본 컬럼명 리스트(표시 순서)
+    """
+    xls = pd.ExcelFile(BytesIO(src) if isinstance(src, bytes) else src)
+    sheet = sheet_name or xls.sheet_names[0]
+    raw = pd.read_excel(xls, sheet_name=sheet, header=None)
+    return _normalize_raw_frame(raw)
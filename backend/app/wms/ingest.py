@@ -0,0 +1,172 @@
+# backend/app/wms/ingest.py
+import hashlib
+import json
+import time
+from itertools import islice
+from typing import AsyncIterator, Callable, Iterable, Iterator
+from sqlalchemy.orm import Session
+from ..shared.config import settings
+from . import counters
+from . import models as m
+from . import payloads
+from .values import to_number
+
+
+def payload_hash(item: dict) -> str:
+    """키 정렬 JSON의 sha256 (키 순서와 무관하게 같은 내용이면 같은 값)"""
+    canon = json.dumps(item, sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(canon.encode("utf-8")).hexdigest()
+
+
+def _text(v) -> str | None:
+    if v is None:
+        return None
+    return (v if isinstance(v, str) else str(v)).strip() or None
+
+
+def extract_fields(item: dict) -> dict:
+    """
+    정규화 item → wms_row 인덱스 컬럼 값 (code/name/unit/qty/group_code)
+    필터·조인용 키: 문자열은 strip(빈값 NULL, 길이 제한 없음), qty 는 숫자 변환.
+    응답은 payload 원본 값을 그대로 씀 (router._item_out)
+    """
+    return {
+        "code": _text(item.get("code")),
+        "name": _text(item.get("name")),
+        "unit": _text(item.get("unit")),
+        "qty": to_number(item.get("qty")),
+        "group_code": _text(item.get("group_code")),
+    }
+
+
+def _chunks(items: Iterable[dict], size: int) -> Iterator[list[dict]]:
+    it = iter(items)
+    while True:
+        chunk = list(islice(it, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _copy_rows(
+    db: Session,
+    batch_id: int,
+    chunk: list[dict],
+    hashes: list[str],
+    start_index: int,
+) -> None:
+    """Postgres(psycopg3): COPY ... FROM STDIN 으로 청크 적재"""
+    raw = db.connection().connection.driver_connection
+    with raw.cursor() as cur:
+        with cur.copy(
+            "COPY wms_row (batch_id, row_index, status, payload_hash,"
+            " code, name, unit, qty, group_code) FROM STDIN"
+        ) as cp:
+            for k, (it, h) in enumerate(zip(chunk, hashes)):
+                f = extract_fields(it)
+                cp.write_row(
+                    (
+                        batch_id,
+                        start_index + k,
+                        "received",
+                        h,
+                        f["code"],
+                        f["name"],
+                        f["unit"],
+                        f["qty"],
+                        f["group_code"],
+                    )
+                )
+
+
+def insert_rows(
+    db: Session,
+    batch_id: int,
+    items: Iterable[dict],
+    chunk_size: int | None = None,
+    start_index: int = 0,
+    on_progress: Callable[[int], None] | None = None,
+) -> dict:
+    """
+    WmsRow 대량 적재 (ORM unit-of-work 우회), chunk_size 단위.
+      - payload: wms_payload 에 없는 내용만 저장 + 색인 (payloads.py)
+      - 행: Postgres 는 COPY, 그 외(SQLite 등)는 Core insert() executemany
+    row_index는 start_index부터 items 순서대로 부여, status='received'.
+    wms_batch.total_rows(counters.py)도 같은 트랜잭션에서 함께 갱신.
+    커밋은 호출측 책임 (배치 생성과 같은 트랜잭션).
+    on_progress: 청크마다 누적 적재 행 수로 호출 (잡 진행률 표시용)
+    반환: { count, new_payloads, elapsed_sec, rows_per_sec }
+    """
+    size = max(int(chunk_size or settings.WMS_INGEST_CHUNK_SIZE), 1)
+    t0 = time.perf_counter()
+    pg = db.get_bind().dialect.name == "postgresql"
+    stmt = m.WmsRow.__table__.insert()
+    count = new_payloads = 0
+    for chunk in _chunks(items, size):
+        hashes = [payload_hash(it) for it in chunk]
+        new_payloads += payloads.store(db, dict(zip(hashes, chunk)))
+        lo = start_index + count
+        if pg:
+            _copy_rows(db, batch_id, chunk, hashes, lo)
+        else:
+            db.execute(
+                stmt,
+                [
+                    {
+                        "batch_id": batch_id,
+                        "row_index": lo + k,
+                        "status": "received",
+                        "errors_json": None,
+                        "payload_hash": h,
+                        **extract_fields(it),
+                    }
+                    for k, (it, h) in enumerate(zip(chunk, hashes))
+                ],
+            )
+        counters.bump(db, batch_id, total=len(chunk))  # 중간 커밋(ndjson)에도 행 수와 일치
+        count += len(chunk)
+        if on_progress:
+            on_progress(count)
+
+    elapsed = time.perf_counter() - t0
+    return {
+        "count": count,
+        "new_payloads": new_payloads,
+        "elapsed_sec": round(elapsed, 4),
+        "rows_per_sec": round(count / elapsed, 1) if elapsed > 0 else None,
+    }
+
+
+async def aiter_ndjson(stream: AsyncIterator[bytes]) -> AsyncIterator[tuple[int, dict]]:
+    """
+    NDJSON 본문을 줄 단위로 파싱해 (줄 번호, item) yield. 빈 줄은 건너뜀.
+    JSON 객체가 아닌 줄은 ValueError (줄 번호 포함).
+    """
+    buf = b""
+    lineno = 0
+
+    def parse(line: bytes) -> dict | None:
+        line = line.strip()
+        if not line:
+            return None
+        try:
+            obj = json.loads(line)
+        except ValueError as e:
+            raise ValueError(f"line {lineno}: invalid JSON ({e})")
+        if not isinstance(obj, dict):
+            raise ValueError(f"line {lineno}: expected a JSON object")
+        return obj
+
+    async for chunk in stream:
+        buf += chunk
+        *lines, buf = buf.split(b"\n")
+        for line in lines:
+            lineno += 1
+            obj = parse(line)
+            if obj is not None:
+                yield lineno, obj
+    if buf:
+        lineno += 1
+        obj = parse(buf)
+        if obj is not None:
+            yield lineno, obj
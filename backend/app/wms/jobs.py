@@ -0,0 +1,369 @@
+# backend/app/wms/jobs.py
+import os
+import shutil
+import socket
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import UTC, datetime, timedelta
+from pathlib import Path
+from typing import IO, Iterator
+from sqlalchemy import select, update
+from sqlalchemy.orm import Session, object_session
+from ..shared.config import BASE_DIR, settings
+from ..shared.db import SessionLocal, engine
+from . import models as m
+from .columnar import open_columnar
+from .excel import open_work_master_excel
+from .ingest import insert_rows
+from .parse_pool import normalize_excel
+from .purge import schedule, schedule_if_deleted
+
+
+# 배치 status 진행 단계: queued → parsing → ingesting → received (실패 시 failed)
+BATCH_QUEUED = "queued"
+BATCH_PARSING = "parsing"
+BATCH_INGESTING = "ingesting"
+BATCH_RECEIVED = "received"
+BATCH_FAILED = "failed"
+ACTIVE = (BATCH_QUEUED, BATCH_PARSING, BATCH_INGESTING)
+
+SPOOL_DIR = BASE_DIR / "_data" / "uploads"
+_LIST_LIMIT = 200
+_PROGRESS_INTERVAL = 1.0  # 적재 중 행 수를 DB 에 기록하는 간격 (초)
+
+_executor = ThreadPoolExecutor(
+    max_workers=max(settings.WMS_JOB_WORKERS, 1), thread_name_prefix="wms-job"
+)
+_live: dict[str, dict] = {}  # 이 프로세스가 실행 중인 잡 → 최신 행 수 (DB 기록 전 값 포함)
+_saved_at: dict[str, float] = {}
+_lock = threading.Lock()
+_boot_ids: dict[int, str] = {}  # pid → 프로세스 실행마다 새 값 (fork 된 워커도 각자)
+
+
+# === 잡 진행 상황 (wms_job) ===
+# 진행 상황은 DB 에 기록 → 어느 API 워커(프로세스)에서도 /jobs 로 조회 가능.
+# 단계 전환/완료/실패는 배치 status 와 같은 트랜잭션에서 기록.
+# 적재 중 행 수는 별도의 짧은 트랜잭션으로 _PROGRESS_INTERVAL 마다 기록. 단 SQLite 는 쓰기 연결이
+# 하나라 적재 트랜잭션 도중 기록할 수 없음 → 담당 프로세스 메모리에만 두고 다음 단계 전환 때 기록.
+_FIELDS = (
+    "kind",
+    "batch_id",
+    "stage",
+    "rows_parsed",
+    "rows_inserted",
+    "new_payloads",
+    "rows_per_sec",
+    "error",
+    "created_at",
+    "updated_at",
+)
+
+
+def _as_dict(job: m.WmsJob) -> dict:
+    out = {"job_id": job.id, **{f: getattr(job, f) for f in _FIELDS}}
+    with _lock:
+        live = dict(_live.get(job.id) or {})
+    if out["stage"] not in ("done", "failed"):
+        out.update(live)  # 담당 프로세스에서 조회하면 DB 보다 최신 행 수
+    return out
+
+
+def _set(db: Session, job_id: str, **fields) -> None:
+    """단계 전환 기록 (커밋은 호출 측 → 배치 status 와 같은 트랜잭션)"""
+    with _lock:
+        live = dict(_live.get(job_id) or {})
+    values = {**live, **fields, "updated_at": time.time()}
+    db.execute(update(m.WmsJob).where(m.WmsJob.id == job_id).values(**values))
+
+
+def _progress(job_id: str, **counts) -> None:
+    """파싱/적재 행 수: 메모리는 매번, DB 는 _PROGRESS_INTERVAL 마다 (SQLite 제외)"""
+    now = time.time()
+    with _lock:
+        _live.setdefault(job_id, {}).update(counts, updated_at=now)
+        due = now - _saved_at.get(job_id, 0.0) >= _PROGRESS_INTERVAL
+        if due:
+            _saved_at[job_id] = now
+    if not due or engine.dialect.name == "sqlite":
+        return
+    s = SessionLocal()
+    try:
+        s.execute(update(m.WmsJob).where(m.WmsJob.id == job_id).values(**counts, updated_at=now))
+        s.commit()
+    except Exception:
+        s.rollback()  # 진행률 기록 실패는 적재에 영향 없음 (다음 단계 전환 때 다시 기록)
+    finally:
+        s.close()
+
+
+def running() -> int:
+    """이 프로세스에서 대기/실행 중인 잡 수"""
+    with _lock:
+        return len(_live)
+
+
+def get_job(db: Session, job_id: str) -> dict | None:
+    job = db.get(m.WmsJob, job_id)
+    return _as_dict(job) if job else None
+
+
+def list_jobs(db: Session) -> list[dict]:
+    """최근 잡 (최신순, _LIST_LIMIT 건)"""
+    q = select(m.WmsJob).order_by(m.WmsJob.created_at.desc()).limit(_LIST_LIMIT)
+    return [_as_dict(j) for j in db.execute(q).scalars()]
+
+
+# === 업로드 스풀 ===
+def spool_upload(fileobj: IO[bytes], suffix: str = ".xlsx") -> Path:
+    """요청 종료 후에도 잡이 읽을 수 있도록 업로드를 _data/uploads/ 에 복사 (청크 복사)"""
+    SPOOL_DIR.mkdir(parents=True, exist_ok=True)
+    path = SPOOL_DIR / f"{uuid.uuid4().hex}{suffix}"
+    with open(path, "wb") as out:
+        shutil.copyfileobj(fileobj, out, length=1024 * 1024)
+    return path
+
+
+def spool_file(path: Path) -> Path:
+    """이미 디스크에 있는 파일을 스풀 디렉터리로 이동 (복사 없음)"""
+    SPOOL_DIR.mkdir(parents=True, exist_ok=True)
+    dest = SPOOL_DIR / f"{uuid.uuid4().hex}{path.suffix or '.xlsx'}"
+    shutil.move(str(path), dest)
+    return dest
+
+
+# === 담당 프로세스 표시 / 재시작 복구 ===
+# 실행기는 프로세스 메모리에만 있음 → 재시작/크래시 시 진행 중 배치(와 잡)가
+# queued/parsing/ingesting 에 남음.
+# 진행 중 배치는 meta_json["worker"] 에 담당 프로세스(host/pid/boot)와 마지막 단계 전환 시각을 기록하고,
+# 서버 시작 시 recover_orphans() 가 담당 프로세스가 없는(또는 오래된) 배치를 failed 로 정리.
+# 다른 호스트의 배치는 확인할 수 없으므로 WMS_STALE_JOB_MINUTES 기준만 적용.
+def worker_tag() -> dict:
+    pid = os.getpid()
+    return {
+        "host": socket.gethostname(),
+        "pid": pid,
+        "boot": _boot_ids.setdefault(pid, uuid.uuid4().hex),
+        "at": datetime.now(UTC).isoformat(),
+    }
+
+
+def _pid_alive(pid: int) -> bool:
+    if os.name == "nt":  # Windows: os.kill(pid, 0) 은 프로세스를 종료시킴
+        import ctypes
+
+        handle = ctypes.windll.kernel32.OpenProcess(0x1000, False, pid)  # QUERY_LIMITED_INFORMATION
+        if not handle:
+            return False
+        ctypes.windll.kernel32.CloseHandle(handle)
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def is_orphan(batch: m.WmsBatch) -> bool:
+    """진행 중 상태인데 담당 프로세스가 없거나 오래 멈춘 배치"""
+    if batch.status not in ACTIVE:
+        return False
+    w = (batch.meta_json or {}).get("worker") or {}
+    try:
+        at = datetime.fromisoformat(w["at"])
+    except (KeyError, TypeError, ValueError):
+        return True  # 표시 없음 (이전 버전에서 시작된 배치)
+    if at.tzinfo is None:  # 이전 버전은 UTC 를 시간대 없이 기록
+        at = at.replace(tzinfo=UTC)
+    if datetime.now(UTC) - at > timedelta(minutes=settings.WMS_STALE_JOB_MINUTES):
+        return True
+    if w.get("host") != socket.gethostname():
+        return False
+    pid = w.get("pid")
+    if pid == os.getpid():  # 컨테이너 등에서 같은 pid 로 재시작한 경우 boot 로 구분
+        return w.get("boot") != _boot_ids.get(pid)
+    return not isinstance(pid, int) or not _pid_alive(pid)
+
+
+def mark(batch: m.WmsBatch, status_: str, **meta) -> None:
+    """진행 중 단계로 전환 (담당 프로세스/시각 갱신)"""
+    batch.status = status_
+    batch.meta_json = {**(batch.meta_json or {}), **meta, "worker": worker_tag()}
+
+
+def settle(batch: m.WmsBatch, status_: str, **meta) -> None:
+    """완료/실패로 전환 (진행 중 표시 제거)"""
+    batch.status = status_
+    rest = {k: v for k, v in (batch.meta_json or {}).items() if k not in ("worker", "spool")}
+    batch.meta_json = {**rest, **meta}
+
+
+def fail_orphan(batch: m.WmsBatch) -> None:
+    """중단된 진행 중 배치(와 잡) → failed (meta_json.error) + 스풀 파일 삭제. 커밋은 호출 측"""
+    spool = (batch.meta_json or {}).get("spool")
+    if spool:
+        (SPOOL_DIR / spool).unlink(missing_ok=True)
+    err = f"interrupted: server stopped while {batch.status}"
+    settle(batch, BATCH_FAILED, error=err, interrupted_at=datetime.now(UTC).isoformat())
+    db = object_session(batch)
+    if db is not None:  # 배치의 잡도 failed
+        db.execute(
+            update(m.WmsJob)
+            .where(m.WmsJob.batch_id == batch.id, m.WmsJob.stage.not_in(("done", "failed")))
+            .values(stage="failed", error=err, updated_at=time.time())
+        )
+
+
+def recover_orphans() -> dict:
+    """서버 시작 시: 중단된 진행 중 배치 → failed (meta_json.error), 스풀 파일 정리"""
+    db = SessionLocal()
+    failed: list[int] = []
+    try:
+        batches = db.execute(select(m.WmsBatch).where(m.WmsBatch.status.in_(ACTIVE))).scalars()
+        keep: set[str] = set()
+        for batch in batches:
+            meta = dict(batch.meta_json or {})
+            if not is_orphan(batch):
+                if meta.get("spool"):
+                    keep.add(meta["spool"])
+                continue
+            fail_orphan(batch)
+            failed.append(batch.id)
+        db.commit()
+    finally:
+        db.close()
+    removed = _sweep_spool(keep)
+    if failed:
+        schedule()  # 진행 중이라 purge 를 미뤄 둔 삭제 배치가 있으면 이제 정리
+    return {"failed_batches": failed, "spool_removed": removed}
+
+
+def _sweep_spool(keep: set[str]) -> int:
+    """진행 중 배치가 쓰지 않는, 오래된 스풀 파일 삭제 (요청 처리 중인 임시 파일은 최근 것)"""
+    if not SPOOL_DIR.exists():
+        return 0
+    cutoff = time.time() - settings.WMS_STALE_JOB_MINUTES * 60
+    n = 0
+    for p in SPOOL_DIR.iterdir():
+        try:
+            if p.is_file() and p.name not in keep and p.stat().st_mtime < cutoff:
+                p.unlink()
+                n += 1
+        except OSError:
+            pass
+    return n
+
+
+# === 엑셀 인제스트 잡 ===
+def submit_excel_ingest(
+    path: Path,
+    *,
+    batch_id: int,
+    sheet: str | None,
+    parser: str,
+    fmt: str = "xlsx",
+) -> dict:
+    job = m.WmsJob(
+        id=uuid.uuid4().hex,
+        kind="excel_ingest" if fmt == "xlsx" else f"{fmt}_ingest",
+        batch_id=batch_id,
+        stage="queued",
+        rows_parsed=0,
+        rows_inserted=0,
+        new_payloads=None,  # 적재 후: 기존 payload 와 중복되지 않은 행 내용 수
+        created_at=time.time(),
+    )
+    job.updated_at = job.created_at
+    db = SessionLocal()
+    try:
+        db.add(job)
+        db.commit()
+        out = _as_dict(job)
+    finally:
+        db.close()
+    with _lock:
+        _live[job.id] = {}
+    _executor.submit(_run_excel_ingest, job.id, path, batch_id, sheet, parser, fmt)
+    return out
+
+
+def _counted(job_id: str, items: Iterator[dict], every: int = 1000) -> Iterator[dict]:
+    n = 0
+    for it in items:
+        n += 1
+        if n % every == 0:
+            _progress(job_id, rows_parsed=n)
+        yield it
+    _progress(job_id, rows_parsed=n)
+
+
+def _run_excel_ingest(
+    job_id: str, path: Path, batch_id: int, sheet: str | None, parser: str, fmt: str
+) -> None:
+    db = SessionLocal()
+    fobj = None
+    try:
+        batch = db.get(m.WmsBatch, batch_id)
+        if batch is None:
+            raise RuntimeError(f"batch {batch_id} not found")
+
+        mark(batch, BATCH_PARSING)
+        _set(db, job_id, stage="parsing")
+        db.commit()
+
+        if fmt != "xlsx":
+            raw_cols, items_iter = open_columnar(str(path), fmt)
+            items_iter = _counted(job_id, items_iter)
+        elif parser == "pandas":
+            items, raw_cols = normalize_excel(path, sheet, block=True)  # 파싱 프로세스 풀
+            _progress(job_id, rows_parsed=len(items))
+            items_iter = iter(items)
+        else:
+            fobj = open(path, "rb")  # 파일 객체로 전달 (경로는 확장자 검사를 받음)
+            raw_cols, _, items_iter = open_work_master_excel(fobj, sheet_name=sheet)
+            items_iter = _counted(job_id, items_iter)  # 스트리밍: 파싱/적재가 교차 진행
+
+        # 진행 단계는 먼저 커밋 (행 적재는 이후 단일 트랜잭션)
+        mark(batch, BATCH_INGESTING, raw_columns=raw_cols)
+        _set(db, job_id, stage="ingesting")
+        db.commit()
+
+        stats = insert_rows(
+            db, batch_id, items_iter, on_progress=lambda n: _progress(job_id, rows_inserted=n)
+        )
+        settle(batch, BATCH_RECEIVED)
+        _set(
+            db,
+            job_id,
+            stage="done",
+            rows_inserted=stats["count"],
+            new_payloads=stats["new_payloads"],
+            rows_per_sec=stats["rows_per_sec"],
+        )
+        db.commit()
+    except Exception as e:
+        import traceback
+
+        traceback.print_exc()
+        db.rollback()
+        err = f"{type(e).__name__}: {e}"
+        batch = db.get(m.WmsBatch, batch_id)
+        if batch is not None:
+            settle(batch, BATCH_FAILED, error=err)
+        _set(db, job_id, stage="failed", error=err)
+        db.commit()
+    finally:
+        db.close()
+        with _lock:
+            _live.pop(job_id, None)
+            _saved_at.pop(job_id, None)
+        if fobj is not None:
+            fobj.close()
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+        schedule_if_deleted(batch_id)  # 적재 중 삭제된 배치면 이제 purge
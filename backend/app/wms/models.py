@@ -1,11 +1,13 @@
 from __future__ import annotations
 from datetime import datetime
-from sqlalchemy.orm import Mapped, mapped_column, relationship
+from sqlalchemy.orm import Mapped, column_property, mapped_column, relationship
 from sqlalchemy import (
+    select,
     ForeignKeyConstraint,
     PrimaryKeyConstraint,
     String,
     Integer,
+    Float,
     DateTime,
     ForeignKey,
     JSON,
@@ -26,11 +28,82 @@ class WmsBatch(Base):
     status: Mapped[str] = mapped_column(String(32), nullable=False, default="received")
     meta_json: Mapped[dict | None] = mapped_column(JSON, nullable=True)
     received_at: Mapped[datetime | None] = mapped_column(DateTime, server_default=func.now())
+    # 행 카운터: 적재/검증이 같은 트랜잭션에서 증감 (counters.py) → 목록은 GROUP BY 없이 읽음
+    total_rows: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
+    ok_rows: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
+    error_rows: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
+    # 소프트 삭제 시각: 설정되면 모든 조회에서 제외, 행/링크는 purge.py 가 백그라운드로 청크 삭제
+    deleted_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
+    # 보관 시각: 설정되면 행은 _data/archive/ 의 Parquet 에만 있음 (archive.py, 복원 시 해제)
+    archived_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
 
     rows: Mapped[list["WmsRow"]] = relationship(
         back_populates="batch", cascade="all, delete-orphan"
     )
 
+    __table_args__ = (
+        Index("ix_wms_batch_source_id", "source", "id"),  # /batches keyset
+        Index("ix_wms_batch_deleted_at", "deleted_at"),  # purge 대상 조회
+    )
+
+
+class WmsCurrentBatch(Base):
+    """source(+프로젝트)별 현재 배치 포인터. 지정 시 upsert 1회, 조회는 PK 인덱스 1회"""
+
+    __tablename__ = "wms_current_batch"
+    source: Mapped[str] = mapped_column(String(64), nullable=False)
+    # 0 = 프로젝트 구분 없음 (source 전체의 현재 배치)
+    project_id: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
+    batch_id: Mapped[int] = mapped_column(
+        ForeignKey("wms_batch.id", ondelete="CASCADE"), nullable=False
+    )
+    updated_at: Mapped[datetime | None] = mapped_column(
+        DateTime, server_default=func.now(), onupdate=func.now()
+    )
+
+    __table_args__ = (
+        PrimaryKeyConstraint("source", "project_id", name="pk_wms_current_batch"),
+        Index("ix_wms_current_batch_batch", "batch_id"),
+    )
+
+
+class WmsJob(Base):
+    """백그라운드 적재 잡 진행 상황 (jobs.py). DB 에 두어 어느 API 워커에서도 /jobs 조회 가능"""
+
+    __tablename__ = "wms_job"
+    id: Mapped[str] = mapped_column(String(32), primary_key=True)
+    batch_id: Mapped[int | None] = mapped_column(
+        ForeignKey("wms_batch.id", ondelete="CASCADE"), nullable=True
+    )
+    kind: Mapped[str] = mapped_column(String(32), nullable=False)
+    stage: Mapped[str] = mapped_column(String(16), nullable=False, default="queued")
+    rows_parsed: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
+    rows_inserted: Mapped[int] = mapped_column(
+        Integer, nullable=False, default=0, server_default="0"
+    )
+    new_payloads: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    rows_per_sec: Mapped[float | None] = mapped_column(Float, nullable=True)
+    error: Mapped[str | None] = mapped_column(Text, nullable=True)
+    # epoch 초 (time.time(), 응답 형식 유지)
+    created_at: Mapped[float] = mapped_column(Float, nullable=False)
+    updated_at: Mapped[float] = mapped_column(Float, nullable=False)
+
+    __table_args__ = (
+        Index("ix_wms_job_created_at", "created_at"),  # /jobs 최신순
+        Index("ix_wms_job_batch", "batch_id"),
+    )
+
+
+class WmsPayload(Base):
+    """정규화 item JSON 원본 (내용 주소: hash = payload_hash, 같은 내용은 1번만 저장 → payloads.py)"""
+
+    __tablename__ = "wms_payload"
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)  # 검색 인덱스 rowid
+    hash: Mapped[str] = mapped_column(String(64), nullable=False)
+    payload_json: Mapped[dict] = mapped_column(JSON, nullable=False)
+
+    __table_args__ = (UniqueConstraint("hash", name="uq_wms_payload_hash"),)
+
 
 class WmsRow(Base):
     __tablename__ = "wms_row"
@@ -39,17 +112,38 @@ class WmsRow(Base):
         ForeignKey("wms_batch.id", ondelete="CASCADE"), nullable=False
     )
     row_index: Mapped[int] = mapped_column(Integer, nullable=False)
-    payload_json: Mapped[dict] = mapped_column(JSON, nullable=False)
     status: Mapped[str] = mapped_column(
         String(16), nullable=False, default="received"
     )  # received|ok|error
     errors_json: Mapped[dict | None] = mapped_column(JSON, nullable=True)
+    # payload에서 적재 시 추출한 정규화 필드 (필터/정렬/조인용 인덱스 컬럼, 길이 제한 없음)
+    code: Mapped[str | None] = mapped_column(Text, nullable=True)
+    name: Mapped[str | None] = mapped_column(Text, nullable=True)
+    unit: Mapped[str | None] = mapped_column(Text, nullable=True)
+    qty: Mapped[float | None] = mapped_column(Float, nullable=True)
+    group_code: Mapped[str | None] = mapped_column(Text, nullable=True)
+    # payload 정규화 JSON의 sha256 (= wms_payload.hash 참조),
+    # 증분 검증: 마지막 검증 당시의 규칙 fingerprint / payload_hash
+    payload_hash: Mapped[str | None] = mapped_column(String(64), nullable=True)
+    rules_fp: Mapped[str | None] = mapped_column(String(16), nullable=True)
+    validated_hash: Mapped[str | None] = mapped_column(String(64), nullable=True)
+    # payload 본문은 wms_payload 에 (읽기 전용, 행별 PK 조회 서브쿼리)
+    payload_json: Mapped[dict] = column_property(
+        select(WmsPayload.payload_json)
+        .where(WmsPayload.hash == payload_hash)
+        .correlate_except(WmsPayload)
+        .scalar_subquery()
+    )
 
     batch: Mapped["WmsBatch"] = relationship(back_populates="rows")
 
     __table_args__ = (
         UniqueConstraint("batch_id", "row_index", name="uq_wms_row_batch_index"),
         Index("ix_wms_row_batch", "batch_id"),
+        Index("ix_wms_row_batch_code", "batch_id", "code"),
+        Index("ix_wms_row_code", "code"),
+        Index("ix_wms_row_group_code", "group_code"),
+        Index("ix_wms_row_payload_hash", "payload_hash"),
     )
 
 
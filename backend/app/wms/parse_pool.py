@@ -0,0 +1,148 @@
+# backend/app/wms/parse_pool.py
+import multiprocessing as mp
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from contextlib import contextmanager
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+from fastapi import HTTPException
+from ..shared.config import settings
+
+
+# 엑셀 파싱/규칙 검증용 프로세스 풀 (API 워커의 GIL과 분리)
+#  - 최초 사용 시 생성 (API 프로세스는 pandas를 import 하지 않음)
+#  - 동시 수용량 = 워커 수 + 대기 큐; 초과 요청은 503
+#  - 여러 시트를 파싱하는 요청(/upload-excel/multi)은 reserve() 로 최대 워커 수만큼만 슬롯을 잡고
+#    그 안에서 차례로 제출 → 한 요청이 큐를 모두 차지해 단일 업로드를 503 으로 밀어내지 않음
+_pool: ProcessPoolExecutor | None = None
+_pool_lock = threading.Lock()
+_slots = threading.BoundedSemaphore(
+    max(settings.WMS_PARSE_WORKERS, 1) + max(settings.WMS_PARSE_QUEUE, 0)
+)
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(
+                max_workers=max(settings.WMS_PARSE_WORKERS, 1),
+                mp_context=mp.get_context("spawn"),  # 부모의 DB 커넥션/스레드 상속 방지
+            )
+        return _pool
+
+
+def _reset_pool() -> None:
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
+
+
+def _normalize_in_worker(path: str, sheet: str | None):
+    # 워커 프로세스에서만 pandas 로드
+    from .excel_pandas import normalize_work_master_excel
+
+    return normalize_work_master_excel(path, sheet_name=sheet)
+
+
+def _validate_in_worker(batch_id: int, spec: dict, force: bool):
+    from .rules_pandas import validate_batch_rows
+
+    return validate_batch_rows(batch_id, spec, force)
+
+
+def _submit(fn, *args, block: bool, busy: str) -> Future:
+    if not _slots.acquire(blocking=block):
+        raise HTTPException(status_code=503, detail=busy)
+    try:
+        fut = _get_pool().submit(fn, *args)
+    except Exception:
+        _slots.release()
+        raise
+    fut.add_done_callback(lambda _: _slots.release())
+    return fut
+
+
+def _result(fut: Future):
+    """워커가 죽어 풀이 깨지면 다음 요청을 위해 재생성"""
+    try:
+        return fut.result()
+    except BrokenProcessPool:
+        _reset_pool()
+        raise
+
+
+def submit_normalize(path: Path | str, sheet: str | None = None, block: bool = False) -> Future:
+    """
+    파일 경로를 워커로 넘겨 (items, raw_columns) Future 반환.
+    block=False: 큐가 가득 차면 즉시 503, True: 슬롯이 날 때까지 대기(백그라운드 잡용)
+    """
+    return _submit(
+        _normalize_in_worker, str(path), sheet,
+        block=block, busy="Excel parser pool is busy; retry later",
+    )  # fmt: skip
+
+
+def normalize_excel(path: Path | str, sheet: str | None = None, block: bool = False):
+    """submit_normalize + 결과 대기"""
+    return _result(submit_normalize(path, sheet, block=block))
+
+
+def submit_validate(
+    batch_id: int, spec: dict, force: bool = False, block: bool = False
+) -> Future:
+    """배치 규칙 검증(rules_pandas)을 워커에서 실행 → 집계 dict Future"""
+    return _submit(
+        _validate_in_worker, batch_id, spec, force,
+        block=block, busy="Validation pool is busy; retry later",
+    )  # fmt: skip
+
+
+def validate_rows(batch_id: int, spec: dict, force: bool = False, block: bool = False) -> dict:
+    return _result(submit_validate(batch_id, spec, force, block=block))
+
+
+class Reservation:
+    """reserve() 가 확보한 슬롯 n개 안에서만 제출 (다른 요청과 슬롯을 다투며 기다리지 않음)"""
+
+    def __init__(self, n: int) -> None:
+        self.n = n
+        self._free = threading.Semaphore(n)
+
+    def submit_normalize(self, path: Path | str, sheet: str | None = None) -> Future:
+        self._free.acquire()  # 이 요청의 앞선 작업이 끝나 슬롯이 돌아올 때까지
+        try:
+            fut = _get_pool().submit(_normalize_in_worker, str(path), sheet)
+        except Exception:
+            self._free.release()
+            raise
+        fut.add_done_callback(lambda _: self._free.release())
+        return fut
+
+    def _drain(self) -> None:
+        """실행 중인 작업이 끝날 때까지 대기 (취소된 작업은 바로 반환)"""
+        for _ in range(self.n):
+            self._free.acquire()
+
+
+@contextmanager
+def reserve(tasks: int, busy: str = "Excel parser pool is busy; retry later"):
+    """
+    전역 슬롯을 min(tasks, WMS_PARSE_WORKERS)개까지 즉시 확보 (하나도 없으면 503).
+    with 블록을 나갈 때 이 요청의 작업이 모두 끝난 뒤 슬롯 반환.
+    """
+    want = min(max(tasks, 0), max(settings.WMS_PARSE_WORKERS, 1))
+    got = 0
+    while got < want and _slots.acquire(blocking=False):
+        got += 1
+    if want and not got:
+        raise HTTPException(status_code=503, detail=busy)
+    r = Reservation(got)
+    try:
+        yield r
+    finally:
+        r._drain()
+        for _ in range(got):
+            _slots.release()
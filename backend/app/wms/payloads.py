@@ -0,0 +1,52 @@
+# backend/app/wms/payloads.py
+from sqlalchemy import delete, exists, select, text
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+from . import models as m
+from .search import index_payloads
+
+
+# 내용 주소(content-addressed) payload 저장소
+#   wms_payload(hash = ingest.payload_hash(item), payload_json) 에 같은 내용은 1번만 저장
+#   wms_row 는 payload_hash 로 참조 → 월별 재업로드처럼 대부분 그대로인 배치는
+#   바뀐 item 만 payload/검색 인덱스가 늘어나고, 나머지 행은 인덱스 컬럼 + 해시만 추가
+#   참조하는 행이 없어진 payload(purge / archive 이관 후)는 gc() 가 정리 (purge.maintain)
+def store(db: Session, payloads: dict[str, dict]) -> int:
+    """{hash: item} 중 없는 것만 INSERT + 색인. 반환: 새로 저장한 수 (커밋은 호출 측)"""
+    if not payloads:
+        return 0
+    hashes = list(payloads)
+    pg = db.get_bind().dialect.name == "postgresql"
+    if pg:
+        # 이미 있는 payload 만 참조하는 청크도 gc 와 겹치지 않게 (트랜잭션 끝까지 유지, gc 참고)
+        db.execute(text("LOCK TABLE wms_payload IN ROW EXCLUSIVE MODE"))
+    have = set(
+        db.execute(select(m.WmsPayload.hash).where(m.WmsPayload.hash.in_(hashes))).scalars()
+    )
+    new = [h for h in hashes if h not in have]
+    if not new:
+        return 0
+    dialect = postgresql if pg else sqlite
+    # 동시 적재가 같은 내용을 먼저 넣었을 수 있음 → 충돌은 무시 (색인도 DO NOTHING)
+    db.execute(
+        dialect.insert(m.WmsPayload).on_conflict_do_nothing(index_elements=["hash"]),
+        [{"hash": h, "payload_json": payloads[h]} for h in new],
+    )
+    index_payloads(db, new)
+    return len(new)
+
+
+def gc(conn: Connection) -> int:
+    """참조하는 행이 없는 payload 삭제 (검색 인덱스는 트리거/FK CASCADE). 트랜잭션 안에서 호출"""
+    if conn.dialect.name == "postgresql":
+        # 진행 중인 적재(store → 행 INSERT, 아직 미커밋)의 참조는 보이지 않음
+        # → store 의 ROW EXCLUSIVE 와 충돌하는 잠금으로 적재 커밋을 기다린 뒤 삭제
+        #   (SQLite 는 쓰기 트랜잭션이 하나뿐이라 필요 없음)
+        conn.exec_driver_sql("LOCK TABLE wms_payload IN SHARE ROW EXCLUSIVE MODE")
+    res = conn.execute(
+        delete(m.WmsPayload).where(
+            ~exists().where(m.WmsRow.payload_hash == m.WmsPayload.hash)
+        )
+    )
+    return res.rowcount or 0
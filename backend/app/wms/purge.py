@@ -0,0 +1,216 @@
+# backend/app/wms/purge.py
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Callable
+from sqlalchemy import delete, inspect, select
+from sqlalchemy.orm import Session
+from ..shared.config import settings
+from ..shared.db import SessionLocal, engine
+from . import models as m
+from . import payloads
+from .current import clear_batch
+
+
+# 배치 삭제 = 소프트 삭제 + 백그라운드 purge
+#   1) 요청: wms_batch.deleted_at 설정 + 현재 배치 포인터 제거 (UPDATE 1건 → 즉시 반환)
+#      이후 모든 조회는 is_live() / live_batch() 로 삭제된 배치를 제외
+#   2) 워커 1개: 삭제된 배치의 링크/행을 WMS_PURGE_CHUNK_SIZE 행씩 짧은 트랜잭션으로 삭제
+#      (SQLite 쓰기 락을 청크마다 놓음 → 다른 요청이 사이사이 진행) → 마지막에 wms_batch 행 삭제
+#   3) 정리: 참조 없는 payload 삭제(payloads.gc) → SQLite ANALYZE (+ 빈 페이지가 많으면 VACUUM),
+#      Postgres VACUUM (ANALYZE)
+# 적재 잡이 진행 중인 배치는 잡이 끝날 때까지 건너뜀 (jobs.py 가 잡 종료 시 schedule_if_deleted)
+#   단, 담당 프로세스가 죽었거나 WMS_STALE_JOB_MINUTES 넘게 멈춘 배치(jobs.is_orphan)는
+#   failed 로 정리한 뒤 purge (서버 시작 시 recover_orphans 도 같은 처리 후 schedule)
+_ACTIVE = ("queued", "parsing", "ingesting")  # jobs.py 진행 단계
+
+_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="wms-purge")
+_lock = threading.Lock()
+_state: dict = {
+    "running": False,
+    "rerun": False,
+    "batch_id": None,  # 지금 purge 중인 배치
+    "rows_deleted": 0,
+    "purged_batches": 0,
+    "last_run_at": None,
+    "last_maintenance": None,
+    "error": None,
+}
+
+
+# === 조회 필터 ===
+def is_live():
+    """WmsBatch 를 조인/조회하는 SELECT 의 WHERE 절 (삭제되지 않은 배치만)"""
+    return m.WmsBatch.deleted_at.is_(None)
+
+
+def live_batch(db: Session, batch_id: int) -> m.WmsBatch | None:
+    batch = db.get(m.WmsBatch, batch_id)
+    return batch if batch is not None and batch.deleted_at is None else None
+
+
+def live_batch_id(batch_id: int):
+    """WmsRow.batch_id == live_batch_id(x): 배치가 삭제됐으면 NULL → 행 없음 (비상관 서브쿼리 1회)"""
+    return select(m.WmsBatch.id).where(m.WmsBatch.id == batch_id, is_live()).scalar_subquery()
+
+
+def soft_delete(db: Session, batch: m.WmsBatch) -> None:
+    """커밋 후 schedule() 은 호출 측"""
+    batch.deleted_at = datetime.utcnow()
+    clear_batch(db, batch.id)
+
+
+# === 백그라운드 purge ===
+def status() -> dict:
+    with _lock:
+        return {k: v for k, v in _state.items() if k != "rerun"}
+
+
+def schedule() -> dict:
+    """대기 중인 삭제 배치 purge 를 예약 (실행 중이면 끝난 뒤 한 번 더 훑음)"""
+    with _lock:
+        if _state["running"]:
+            _state["rerun"] = True
+        else:
+            _state.update(running=True, rerun=False, error=None)
+            _executor.submit(_run)
+    return status()
+
+
+def schedule_if_deleted(batch_id: int) -> None:
+    """적재 잡 종료 시: 잡 도중 삭제된 배치면 purge 예약"""
+    db = SessionLocal()
+    try:
+        batch = db.get(m.WmsBatch, batch_id)
+        deleted = batch is not None and batch.deleted_at is not None
+    finally:
+        db.close()
+    if deleted:
+        schedule()
+
+
+def _run() -> None:
+    while True:
+        try:
+            _purge_pending()
+        except Exception as e:
+            import traceback
+
+            traceback.print_exc()
+            with _lock:
+                _state["error"] = f"{type(e).__name__}: {e}"
+        with _lock:
+            if not _state["rerun"]:
+                _state.update(running=False, batch_id=None)
+                return
+            _state["rerun"] = False
+
+
+def _purge_pending() -> None:
+    from . import jobs  # jobs → purge import 순환 회피
+
+    db = SessionLocal()
+    try:
+        stuck = db.execute(
+            select(m.WmsBatch).where(
+                m.WmsBatch.deleted_at.is_not(None), m.WmsBatch.status.in_(_ACTIVE)
+            )
+        ).scalars().all()
+        for batch in stuck:
+            if jobs.is_orphan(batch):
+                jobs.fail_orphan(batch)
+        db.commit()
+        batch_ids = (
+            db.execute(
+                select(m.WmsBatch.id)
+                .where(m.WmsBatch.deleted_at.is_not(None), m.WmsBatch.status.not_in(_ACTIVE))
+                .order_by(m.WmsBatch.id)
+            )
+            .scalars()
+            .all()
+        )
+        db.rollback()
+        for bid in batch_ids:
+            _purge_batch(db, bid)
+    finally:
+        db.close()
+    with _lock:
+        _state["last_run_at"] = datetime.utcnow().isoformat()
+    if batch_ids:
+        result = maintain()
+        with _lock:
+            _state["last_maintenance"] = result
+
+
+def delete_rows(db: Session, batch_id: int, on_chunk: Callable[[int], None] | None = None) -> int:
+    """배치의 링크/행을 청크마다 커밋하며 삭제 (purge, archive.py 의 행 이관 공용)"""
+    chunk = max(settings.WMS_PURGE_CHUNK_SIZE, 1)
+    n = 0
+    while True:
+        ids = (
+            db.execute(select(m.WmsRow.id).where(m.WmsRow.batch_id == batch_id).limit(chunk))
+            .scalars()
+            .all()
+        )
+        if not ids:
+            return n
+        # 링크 먼저 (SQLite 는 FK CASCADE 가 꺼져 있을 수 있음), payload/검색 인덱스는 maintain 의 gc
+        db.execute(delete(m.StdWmsLink).where(m.StdWmsLink.wms_row_id.in_(ids)))
+        db.execute(delete(m.WmsRow).where(m.WmsRow.id.in_(ids)))
+        db.commit()
+        n += len(ids)
+        if on_chunk is not None:
+            on_chunk(len(ids))
+        if settings.WMS_PURGE_PAUSE_SEC > 0:
+            time.sleep(settings.WMS_PURGE_PAUSE_SEC)
+
+
+def _count_deleted(n: int) -> None:
+    with _lock:
+        _state["rows_deleted"] += n
+
+
+def _purge_batch(db: Session, batch_id: int) -> None:
+    from .archive import remove_files  # archive.py 가 이 모듈을 import
+
+    with _lock:
+        _state.update(batch_id=batch_id, rows_deleted=0)
+    delete_rows(db, batch_id, _count_deleted)
+    clear_batch(db, batch_id)
+    db.execute(delete(m.WmsJob).where(m.WmsJob.batch_id == batch_id))  # FK CASCADE 대비 (SQLite)
+    db.execute(
+        delete(m.WmsBatch).where(m.WmsBatch.id == batch_id, m.WmsBatch.deleted_at.is_not(None))
+    )
+    db.commit()
+    remove_files(batch_id)  # 보관(archive)된 배치였으면 Parquet 파일도 삭제
+    with _lock:
+        _state["purged_batches"] += 1
+
+
+# === 공간 회수 / 통계 갱신 ===
+def maintain() -> dict:
+    """purge 후 정리. VACUUM 은 트랜잭션 밖에서만 가능 → AUTOCOMMIT 연결"""
+    t0 = time.perf_counter()
+    with engine.begin() as conn:
+        payloads_deleted = payloads.gc(conn)  # VACUUM 전에 → 빈 페이지에 포함
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        if conn.dialect.name == "postgresql":
+            tables = ["wms_row", "wms_payload", "std_wms_link", "wms_batch"]
+            if "wms_payload_search" in inspect(conn).get_table_names():
+                tables.append("wms_payload_search")
+            conn.exec_driver_sql(f"VACUUM (ANALYZE) {', '.join(tables)}")
+            out = {"vacuum": True, "analyze": True}
+        else:
+            pages = conn.exec_driver_sql("PRAGMA page_count").scalar() or 0
+            free = conn.exec_driver_sql("PRAGMA freelist_count").scalar() or 0
+            ratio = free / pages if pages else 0.0
+            conn.exec_driver_sql("ANALYZE wms_row")
+            conn.exec_driver_sql("ANALYZE wms_payload")
+            conn.exec_driver_sql("ANALYZE std_wms_link")
+            # VACUUM 은 DB 전체를 다시 쓰며 그동안 쓰기를 막음 → 빈 페이지가 충분히 많을 때만
+            vacuum = 0 < settings.WMS_VACUUM_FREE_RATIO <= ratio
+            if vacuum:
+                conn.exec_driver_sql("VACUUM")
+            out = {"vacuum": vacuum, "analyze": True, "free_ratio": round(ratio, 3)}
+    return {**out, "payloads_deleted": payloads_deleted, "elapsed_sec": round(time.perf_counter() - t0, 3)}
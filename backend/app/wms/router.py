@@ -1,54 +1,148 @@
-from typing import Iterable, Optional
+import heapq
+import time
+from itertools import islice
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Iterable, Iterator, Optional
 from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.orm import Session
-from sqlalchemy import select, func, case
+from sqlalchemy import select, func
 from sqlalchemy import delete as sa_delete
 from sqlalchemy import select as sa_select, and_ as sa_and_
 import sqlalchemy as sa  # ✅ 추가
 from ..deps import get_db
 from . import models as m
 from . import schemas as s
-from fastapi import UploadFile, File, Form
-from io import BytesIO
-import pandas as pd
-import numpy as np
+from .ingest import aiter_ndjson, insert_rows
+from .search import search_clause
+from .streaming import check_format, iter_query, stream_items, stream_response
+from .validation import validate_required
+from . import archive, chunked, jobs, purge, staging
+from .current import current_ids, is_current_expr, pointer_ids, set_current
+from .purge import is_live, live_batch, live_batch_id
+from ..shared.config import settings
+from ..shared.responses import NegotiatedResponse
+from .excel import open_work_master_excel, peek, sheet_names
+from .parse_pool import normalize_excel, reserve, submit_validate, validate_rows
+from .rules import compile_rules, fingerprint
+from .columnar import FORMATS, detect_format, open_columnar
+from fastapi import UploadFile, File, Form, Header, Request, Response
+from fastapi.concurrency import run_in_threadpool
+import json
 
 
 router = APIRouter(prefix="/api/wms", tags=["wms"])
 
 
-# === helpers: current batch selection ===
-def _pick_current_batch_for_source(db: Session, source: str) -> Optional[m.WmsBatch]:
-    """is_current=true 우선, 없으면 validated 최신 → 없으면 가장 최신."""
-    rows = (
-        db.execute(
-            select(m.WmsBatch).where(m.WmsBatch.source == source).order_by(m.WmsBatch.id.desc())
-        )
-        .scalars()
-        .all()
-    )
-    if not rows:
-        return None
-    # 1) meta_json.is_current == True
-    for b in rows:
-        mj = b.meta_json or {}
-        if mj.get("is_current") is True:
-            return b
-    # 2) validated 최신
-    for b in rows:
-        if (b.status or "").lower() == "validated":
-            return b
-    # 3) 최신 아무거나
-    return rows[0]
-
-
-def _pick_current_batch_ids(db: Session, sources: list[str]) -> dict[str, int]:
-    out: dict[str, int] = {}
-    for s in sources:
-        b = _pick_current_batch_for_source(db, s)
-        if b:
-            out[s] = int(b.id)
-    return out
+# === helpers: keyset 페이지네이션 (WmsRow.id 기준, SQL에서 적용) ===
+#   cursor = 이전 페이지 마지막 row id → 다음 페이지는 id > cursor (desc면 id < cursor)
+#   응답 헤더: X-Next-Cursor (다음 페이지가 있을 수 있을 때), X-Total-Count (with_total=true)
+def _paginate(q, order: str, cursor: int | None, limit: int | None, offset: int = 0):
+    desc = order == "desc"
+    q = q.order_by(m.WmsRow.id.desc() if desc else m.WmsRow.id.asc())
+    if cursor is not None:
+        q = q.where(m.WmsRow.id < cursor if desc else m.WmsRow.id > cursor)
+    elif offset:
+        q = q.offset(offset)  # 이전 방식 호환 (깊은 페이지일수록 느림)
+    if limit is not None:
+        q = q.limit(limit)
+    return q
+
+
+def _count_rows(db: Session, q) -> int:
+    """같은 필터의 행 수 (payload 없이 id만 세므로 본 조회보다 가벼움)"""
+    sub = q.with_only_columns(m.WmsRow.id).order_by(None).limit(None).offset(None).subquery()
+    return db.execute(select(func.count()).select_from(sub)).scalar_one()
+
+
+def _page_headers(
+    response: Response, last_id: int | None, n: int, limit: int | None, total: int | None
+) -> None:
+    if limit is not None and n == limit and last_id is not None:
+        response.headers["X-Next-Cursor"] = str(last_id)
+    if total is not None:
+        response.headers["X-Total-Count"] = str(total)
+
+
+def _total_header(total: int | None) -> dict | None:
+    """스트리밍 응답용: 다음 커서는 끝까지 보내야 알 수 있으므로 X-Total-Count 만"""
+    return {"X-Total-Count": str(total)} if total is not None else None
+
+
+# === helpers: 열 지향(columnar) 응답 ===
+# shape=columns: 열 이름은 1회만, 행은 배열로 → 행마다 반복되던 _raw 키 이름이 빠짐
+#   {"columns": ["row_id", "source", "code", ...], "raw_columns": ["품명", "규격", ...],
+#    "rows": [[1, "AR", "C-1", ..., "값1", "값2", ...], ...]}
+#   각 행 = columns 순서의 값 + raw_columns 순서의 _raw 값 (없는 키는 null)
+_SHAPES = ("rows", "columns")
+
+
+def _check_shape(shape: str) -> None:
+    if shape not in _SHAPES:
+        raise HTTPException(400, "shape must be 'rows' or 'columns'")
+
+
+def _batch_raw_columns(db: Session, batch_ids: Iterable[int]) -> list[str]:
+    """배치 meta_json.raw_columns 의 합집합 (배치 id 순, 원본 열 순서 유지)"""
+    ids = sorted(set(batch_ids))
+    if not ids:
+        return []
+    metas = db.execute(
+        select(m.WmsBatch.meta_json).where(m.WmsBatch.id.in_(ids)).order_by(m.WmsBatch.id)
+    ).scalars()
+    order: dict[str, None] = {}
+    for mj in metas:
+        cols = (mj or {}).get("raw_columns") if isinstance(mj, dict) else None
+        if isinstance(cols, list):
+            order.update(dict.fromkeys(str(c) for c in cols))
+    return list(order)
+
+
+def _columnar(items: list[dict], raw_order: list[str] = ()) -> dict:
+    """행 dict 목록 → columns/raw_columns/rows (raw_order = 배치 메타의 열 순서)"""
+    columns = list(dict.fromkeys(k for d in items for k in d if k != "_raw"))
+    seen = dict.fromkeys(k for d in items for k in (d.get("_raw") or ()))
+    # 메타 순서 우선, 메타에 없는 키(API 적재 등)는 처음 나온 순서로 뒤에
+    raw_columns = [k for k in raw_order if k in seen]
+    listed = set(raw_columns)
+    raw_columns += [k for k in seen if k not in listed]
+    rows = []
+    for d in items:
+        raw = d.get("_raw") or {}
+        rows.append([d.get(c) for c in columns] + [raw.get(k) for k in raw_columns])
+    return {"columns": columns, "raw_columns": raw_columns, "rows": rows}
+
+
+def _direct_response(response: Response, content):
+    """
+    값이 이미 JSON 기본 타입뿐일 때: jsonable_encoder 를 건너뛰고 바로 인코딩
+    (앞서 설정한 X-* 페이지 헤더 유지, 인코딩/msgpack 협상은 NegotiatedResponse)
+    """
+    headers = {k: v for k, v in response.headers.items() if k.startswith("x-")}
+    return NegotiatedResponse(content, headers=headers)
+
+
+def _columnar_response(response: Response, items: list[dict], raw_order: list[str] = ()):
+    return _direct_response(response, _columnar(items, raw_order))
+
+
+# === helpers: current batch selection (wms_current_batch 포인터, current.py) ===
+def _pick_current_batch_for_source(
+    db: Session, source: str, project_id: int = 0
+) -> Optional[m.WmsBatch]:
+    """포인터 우선, 없으면 validated 최신 → 없으면 가장 최신."""
+    bid = current_ids(db, [source], project_id).get(source)
+    return db.get(m.WmsBatch, bid) if bid is not None else None
+
+
+def _pick_current_batch_ids(db: Session, sources: list[str], project_id: int = 0) -> dict[str, int]:
+    return current_ids(db, sources, project_id)
+
+
+def _check_not_archived(batch: m.WmsBatch) -> None:
+    """행을 고치거나 새로 참조하는 작업은 보관된 배치에 불가 (읽기만 Parquet 에서 제공)"""
+    if batch.archived_at is not None:
+        raise HTTPException(409, f"batch {batch.id} is archived; restore it first")
 
 
 @router.post("/ingest")
@@ -64,10 +158,14 @@ def ingest(payload: s.WmsIngestRequest, db: Session = Depends(get_db)):
         db.add(batch)
         db.flush()  # get batch.id
 
-        for i, item in enumerate(payload.items):
-            db.add(m.WmsRow(batch_id=batch.id, row_index=i, payload_json=item, status="received"))
+        stats = insert_rows(db, batch.id, payload.items)
         db.commit()
-        return {"batch_id": batch.id, "count": len(payload.items)}
+        return {
+            "batch_id": batch.id,
+            "count": stats["count"],
+            "new_payloads": stats["new_payloads"],  # 이전 배치와 내용이 다른 행 수 (중복 제외)
+            "rows_per_sec": stats["rows_per_sec"],
+        }
     except Exception as e:
         import traceback
 
@@ -76,120 +174,324 @@ def ingest(payload: s.WmsIngestRequest, db: Session = Depends(get_db)):
         raise HTTPException(status_code=500, detail=f"{type(e).__name__}: {e}")
 
 
+@router.post("/ingest/ndjson")
+async def ingest_ndjson(
+    request: Request,
+    source: str | None = Query(None),
+    project_id: int | None = Query(None),
+    uploader: str | None = Query(None),
+    meta: str | None = Query(None, description="meta_json (JSON 문자열)"),
+    chunk_size: int | None = Query(None, ge=1, description="INSERT 단위 (기본 WMS_INGEST_CHUNK_SIZE)"),
+    commit_every: int = Query(10, ge=1, description="N개 청크마다 커밋"),
+    db: Session = Depends(get_db),
+):
+    """
+    /ingest 스트리밍판: 본문은 NDJSON (한 줄 = item 1개).
+    줄 단위로 읽어 chunk_size 단위로 적재하고 commit_every 청크마다 커밋하므로
+    메모리는 본문 크기가 아니라 청크 크기에 비례합니다.
+    진행 중 배치 status='ingesting', 완료 시 'received', 실패 시 'failed'(커밋된 행은 유지).
+    """
+    try:
+        meta_json = json.loads(meta) if meta else None
+    except ValueError:
+        raise HTTPException(400, "meta must be a JSON object string")
+    size = chunk_size or settings.WMS_INGEST_CHUNK_SIZE
+
+    def _begin() -> int:
+        batch = m.WmsBatch(
+            source=source,
+            project_id=project_id,
+            uploader=uploader,
+            meta_json=meta_json,
+            status=jobs.BATCH_INGESTING,
+        )
+        jobs.mark(batch, jobs.BATCH_INGESTING)  # 담당 프로세스 표시 (재시작 복구)
+        db.add(batch)
+        db.commit()
+        return batch.id
+
+    def _write(batch_id: int, chunk: list[dict], start: int, commit: bool) -> None:
+        insert_rows(db, batch_id, chunk, chunk_size=size, start_index=start)
+        if commit:
+            db.commit()
+
+    def _finish(batch_id: int, status_: str, extra: dict | None = None) -> None:
+        if status_ == jobs.BATCH_FAILED:
+            db.rollback()
+        batch = db.get(m.WmsBatch, batch_id)
+        jobs.settle(batch, status_, **(extra or {}))
+        db.commit()
+        if batch.deleted_at is not None:  # 적재 중 삭제됨 → 이제 purge 가능
+            purge.schedule()
+
+    batch_id = await run_in_threadpool(_begin)
+    t0 = time.perf_counter()
+    count = committed = chunks = 0
+    chunk: list[dict] = []
+    try:
+        async for _, item in aiter_ndjson(request.stream()):
+            chunk.append(item)
+            if len(chunk) >= size:
+                chunks += 1
+                commit = chunks % commit_every == 0
+                await run_in_threadpool(_write, batch_id, chunk, count, commit)
+                count += len(chunk)
+                if commit:
+                    committed = count
+                chunk = []
+        if chunk:
+            await run_in_threadpool(_write, batch_id, chunk, count, False)
+            count += len(chunk)
+        await run_in_threadpool(_finish, batch_id, jobs.BATCH_RECEIVED)
+    except Exception as e:
+        import traceback
+
+        traceback.print_exc()
+        err = f"{type(e).__name__}: {e}"
+        await run_in_threadpool(
+            _finish, batch_id, jobs.BATCH_FAILED, {"error": err, "rows_committed": committed}
+        )
+        code = 400 if isinstance(e, ValueError) else 500
+        raise HTTPException(
+            status_code=code,
+            detail={"error": err, "batch_id": batch_id, "rows_committed": committed},
+        )
+
+    elapsed = time.perf_counter() - t0
+    return {
+        "batch_id": batch_id,
+        "count": count,
+        "rows_per_sec": round(count / elapsed, 1) if elapsed > 0 else None,
+    }
+
+
 # /api/wms/batches  (기존 함수 교체)
 @router.get("/batches")
 def list_batches(
+    response: Response,
     source: str | None = Query(None, description="AR|FP|SS"),
     limit: int | None = Query(None, ge=1),
+    cursor: int | None = Query(None, description="이전 페이지의 마지막 batch id (X-Next-Cursor)"),
     db: Session = Depends(get_db),
 ):
-    total = func.count(m.WmsRow.id)
-    errors = func.sum(case((m.WmsRow.status == "error", 1), else_=0))
-    oks = func.sum(case((m.WmsRow.status == "ok", 1), else_=0))
-
-    q = (
-        select(
-            m.WmsBatch.id,
-            m.WmsBatch.source,
-            m.WmsBatch.status,
-            m.WmsBatch.received_at,
-            m.WmsBatch.meta_json,
-            total.label("total_rows"),
-            errors.label("error_rows"),
-            oks.label("ok_rows"),
-        )
-        .select_from(m.WmsBatch)
-        .join(m.WmsRow, m.WmsRow.batch_id == m.WmsBatch.id, isouter=True)
-        .group_by(m.WmsBatch.id)
-        .order_by(m.WmsBatch.id.desc())
-    )
+    # ✅ 행 수는 wms_batch 카운터(counters.py)에서 → wms_row 조인/GROUP BY 없음
+    # ✅ keyset: 최신순(id desc), 다음 페이지는 id < cursor
+    q = select(
+        m.WmsBatch.id,
+        m.WmsBatch.source,
+        m.WmsBatch.status,
+        m.WmsBatch.received_at,
+        is_current_expr().label("is_current"),
+        m.WmsBatch.total_rows,
+        m.WmsBatch.error_rows,
+        m.WmsBatch.ok_rows,
+        m.WmsBatch.archived_at,
+    ).where(is_live()).order_by(m.WmsBatch.id.desc())
     if source:
         q = q.where(m.WmsBatch.source == source)
+    if cursor is not None:
+        q = q.where(m.WmsBatch.id < cursor)
     if limit:
         q = q.limit(limit)
 
     rows = db.execute(q).all()
+    _page_headers(response, rows[-1].id if rows else None, len(rows), limit, None)
     return [
         {
             "id": r.id,
             "source": r.source,
             "status": r.status,
             "received_at": r.received_at,
-            "total_rows": int(r.total_rows or 0),
-            "error_rows": int(r.error_rows or 0),
-            "ok_rows": int(r.ok_rows or 0),
-            "is_current": bool((r.meta_json or {}).get("is_current")),  # ✅ mj 대신 inline
+            "total_rows": r.total_rows,
+            "error_rows": r.error_rows,
+            "ok_rows": r.ok_rows,
+            "is_current": bool(r.is_current),
+            "archived": r.archived_at is not None,
         }
         for r in rows
     ]
 
 
-# @router.get("/batches/{batch_id}/preview", response_model=list[s.WmsRowOut])
+_PREVIEW_KEYS = ["row_index", "status", "payload_json", "errors_json"]
+
+
+def _preview_out(r) -> dict:
+    return {
+        "id": r.id,
+        "row_index": r.row_index,
+        "status": r.status,
+        "payload_json": r.payload_json,
+        "errors_json": r.errors_json,
+    }
+
+
+@router.get("/batches/{batch_id}/preview", response_model=list[s.WmsRowOut])
 def preview_batch(
     batch_id: int,
+    response: Response,
     # ✅ limit을 선택값으로. None이면 전체 반환
-    limit: int | None = Query(None),
+    limit: int | None = Query(None, ge=1),
     offset: int = Query(0, ge=0),
+    cursor: int | None = Query(None, description="이전 페이지의 마지막 id (X-Next-Cursor)"),
+    with_total: bool = Query(False),
+    shape: str = Query("rows", description="rows | columns (열 이름 1회 + 행 배열)"),
+    stream: str | None = Query(None, description="ndjson | arrow: 청크 단위 스트리밍 (shape 무시)"),
     db: Session = Depends(get_db),
 ):
-    q = select(m.WmsRow).where(m.WmsRow.batch_id == batch_id).order_by(m.WmsRow.row_index.asc())
-    if limit is not None:
-        q = q.limit(limit).offset(offset)
-    rows = db.execute(q).scalars().all()
-    return [
-        {
-            "id": r.id,
-            "row_index": r.row_index,
-            "status": r.status,
-            "payload_json": r.payload_json,
-            "errors_json": r.errors_json,
-        }
-        for r in rows
-    ]
+    _check_shape(shape)
+    if stream:
+        check_format(stream)
+    if archive.archived(db, [batch_id]):
+        # 보관된 배치: Parquet 을 memory-map 으로 읽어 같은 형태로 (archive.py)
+        table, total = archive.scan(batch_id, _PREVIEW_KEYS, cursor=cursor, with_total=with_total)
+        table = table.slice(0 if cursor is not None else offset, limit)
+        if stream:
+            return stream_items(archive.iter_rows(table), stream, _total_header(total))
+        items = archive.page(table)
+    else:
+        # 배치 내 id 순서 = 적재 순서(row_index 순)
+        base = select(m.WmsRow).where(m.WmsRow.batch_id == live_batch_id(batch_id))
+        total = _count_rows(db, base) if with_total else None
+        if stream:
+            cols = select(
+                m.WmsRow.id,
+                m.WmsRow.row_index,
+                m.WmsRow.status,
+                m.WmsRow.payload_json,
+                m.WmsRow.errors_json,
+            ).where(m.WmsRow.batch_id == live_batch_id(batch_id))
+            stmt = _paginate(cols, "asc", cursor, limit, offset)
+            return stream_response(stmt, _preview_out, stream, _total_header(total))
+        rows = db.execute(_paginate(base, "asc", cursor, limit, offset)).scalars().all()
+        items = [_preview_out(r) for r in rows]
+
+    _page_headers(response, items[-1]["id"] if items else None, len(items), limit, total)
+    if shape == "columns":
+        # payload_json 은 펼침: code/name/... 는 columns, _raw 는 raw_columns
+        flat = []
+        for r in items:
+            p = r["payload_json"] if isinstance(r["payload_json"], dict) else {}
+            d = {k: r[k] for k in ("id", "row_index", "status", "errors_json")}
+            d.update((k, v) for k, v in p.items() if k not in d)
+            flat.append(d)
+        return _columnar_response(response, flat, _batch_raw_columns(db, [batch_id]))
+    return items
+
+
+def _rule_spec(req: s.WmsValidateRequest) -> dict:
+    """규칙 스펙 dict (컴파일 가능 여부를 API 프로세스에서 먼저 확인 → 잘못된 규칙은 400)"""
+    spec = req.model_dump(include={"required_fields", "fields", "allowed_units", "unique_code"})
+    try:
+        compile_rules(spec)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return spec
+
+
+def _finish_validation(db: Session, batch_id: int, res: dict, t0: float) -> dict:
+    """검증이 같은 트랜잭션에서 갱신한 배치 카운터로 상태 결정 (행 재스캔 없음)"""
+    batch = db.get(m.WmsBatch, batch_id)
+    db.refresh(batch)  # 카운터는 Core UPDATE(요청 세션 또는 워커)로 갱신됨
+    if batch.total_rows == 0:
+        raise HTTPException(status_code=404, detail="batch not found or empty")
+
+    batch.status = "validated" if batch.error_rows == 0 else "invalid"
+    db.commit()
+    return {
+        "batch_id": batch_id,
+        "errors": batch.error_rows,
+        "total": batch.total_rows,
+        "checked": res["checked"],
+        "status": batch.status,
+        "elapsed_sec": round(time.perf_counter() - t0, 3),
+    }
 
 
 @router.post("/batches/{batch_id}/validate")
 def validate_batch(batch_id: int, req: s.WmsValidateRequest, db: Session = Depends(get_db)):
     # 간단 규칙: required_fields 모두 존재하고 빈값이 아니면 ok, 아니면 error
-    rows = db.execute(select(m.WmsRow).where(m.WmsRow.batch_id == batch_id)).scalars().all()
-    if not rows:
+    # ✅ required_fields 만 있으면 DB에서 집합 단위 UPDATE (건수만 반환)
+    # ✅ 타입/정규식/범위/단위/코드 중복 규칙이 있으면 규칙 엔진 (프로세스 풀에서 열 단위 평가)
+    # ✅ 증분: 규칙 fingerprint 또는 payload_hash가 바뀐 행만 다시 검사
+    batch = live_batch(db, batch_id)
+    if batch is None:
         raise HTTPException(status_code=404, detail="batch not found or empty")
+    _check_not_archived(batch)
 
-    error_count = 0
-    for r in rows:
-        errs = []
-        for k in req.required_fields:
-            v = r.payload_json.get(k)
-            if v is None or (isinstance(v, str) and v.strip() == ""):
-                errs.append(f"Missing/empty field: {k}")
-        if errs:
-            r.status = "error"
-            r.errors_json = {"messages": errs}
-            error_count += 1
+    t0 = time.perf_counter()
+    try:
+        spec = _rule_spec(req)
+        if req.has_rules():
+            db.rollback()  # 워커가 같은 행을 갱신하므로 읽기 트랜잭션을 닫고 위임
+            res = validate_rows(batch_id, spec, req.force)
         else:
-            r.status = "ok"
-            r.errors_json = None
+            res = validate_required(db, batch_id, req.required_fields, fingerprint(spec), req.force)
+        return _finish_validation(db, batch_id, res, t0)
+    except HTTPException:
+        db.rollback()
+        raise
+    except Exception as e:
+        import traceback
 
-    # 배치 상태 갱신
-    batch = db.get(m.WmsBatch, batch_id)
-    if batch:
-        batch.status = "validated" if error_count == 0 else "invalid"
+        traceback.print_exc()
+        db.rollback()
+        raise HTTPException(status_code=500, detail=f"validate failed: {type(e).__name__}: {e}")
 
-    db.commit()
+
+@router.post("/batches/validate")
+def validate_batches(req: s.WmsValidateManyRequest, db: Session = Depends(get_db)):
+    """
+    여러 배치를 같은 규칙으로 병렬 검증 (배치마다 워커 1개).
+    배치별 결과를 모아 반환하며 한 배치의 실패가 다른 배치에 영향을 주지 않음.
+    """
+    spec = _rule_spec(req)
+    batch_ids = list(dict.fromkeys(req.batch_ids))
+    fp = fingerprint(spec)
+    found = set(
+        db.execute(
+            select(m.WmsBatch.id).where(
+                m.WmsBatch.id.in_(batch_ids), is_live(), m.WmsBatch.archived_at.is_(None)
+            )
+        ).scalars()
+    )
+    db.rollback()
+
+    t0 = time.perf_counter()
+    futures = {
+        bid: submit_validate(bid, spec, req.force, block=True) for bid in batch_ids if bid in found
+    }
+    results = []
+    for bid in batch_ids:
+        if bid not in futures:
+            results.append({"batch_id": bid, "error": "batch not found or archived"})
+            continue
+        try:
+            results.append(_finish_validation(db, bid, futures[bid].result(), t0))
+        except HTTPException as e:
+            db.rollback()
+            results.append({"batch_id": bid, "error": e.detail})
+        except Exception as e:
+            import traceback
+
+            traceback.print_exc()
+            db.rollback()
+            results.append({"batch_id": bid, "error": f"{type(e).__name__}: {e}"})
     return {
-        "batch_id": batch_id,
-        "errors": error_count,
-        "total": len(rows),
-        "status": batch.status if batch else None,
+        "results": results,
+        "rule_fingerprint": fp,
+        "elapsed_sec": round(time.perf_counter() - t0, 3),
     }
 
 
 @router.get("/batches/{batch_id}/errors", response_model=list[s.WmsRowOut])
 def list_errors(batch_id: int, db: Session = Depends(get_db)):
+    if archive.archived(db, [batch_id]):
+        table, _ = archive.scan(batch_id, _PREVIEW_KEYS, equals={"status": "error"})
+        return archive.page(table.sort_by("row_index"))
     rows = (
         db.execute(
             select(m.WmsRow)
-            .where(m.WmsRow.batch_id == batch_id, m.WmsRow.status == "error")
+            .where(m.WmsRow.batch_id == live_batch_id(batch_id), m.WmsRow.status == "error")
             .order_by(m.WmsRow.row_index.asc())
         )
         .scalars()
@@ -207,119 +509,62 @@ def list_errors(batch_id: int, db: Session = Depends(get_db)):
     ]
 
 
-def _normalize_work_master_excel(file_bytes: bytes, sheet_name: str | None = None):
-    """
-    반환: (items, raw_columns)
-      - items: 각 행 dict: { code, name, qty, unit, group_code, _raw: {<원본헤더(디듀프)>: 값, ...} }
-      - raw_columns: 디듀프된 원본 컬럼명 리스트(표시 순서)
-    """
-    xls = pd.ExcelFile(BytesIO(file_bytes))
-    sheet = sheet_name or xls.sheet_names[0]
-    raw = pd.read_excel(xls, sheet_name=sheet, header=None)
-
-    # 헤더 2행 탐지 (Discipline가 포함된 행 + 다음 행)
-    h1_candidates = raw.index[raw.iloc[:, 0].astype(str).str.contains("Discipline", na=False)]
-    h1 = int(h1_candidates.min()) if len(h1_candidates) else 0
-    h2 = h1 + 1
-
-    top = raw.iloc[h1].fillna("").astype(str).tolist()
-    sub = raw.iloc[h2].fillna("").astype(str).tolist()
-    cols_flat = []
-    for a, b in zip(top, sub):
-        a = a.strip()
-        b = b.strip()
-        name = f"{a} {b}".strip()
-        cols_flat.append(name if name else "unnamed")
-
-    # 본문 + 인덱스 리셋
-    df = raw.iloc[h2 + 1 :].copy()
-    df = df.dropna(how="all").reset_index(drop=True)
-
-    # 열 이름 디듀프 (중복 시 __2, __3 ... 접미사)
-    counts = {}
-    dedup_cols = []
-    for name in cols_flat:
-        key = name or "unnamed"
-        counts[key] = counts.get(key, 0) + 1
-        dedup_cols.append(key if counts[key] == 1 else f"{key}__{counts[key]}")
-    df.columns = dedup_cols
-    raw_columns = dedup_cols[:]  # UI/메타로 반환할 원본 열 목록
-
-    # 토큰 매칭을 "원본(flat) 컬럼명" 기준으로 인덱스 반환
-    def find_idx(cands: list[str]) -> int | None:
-        for i, c in enumerate(cols_flat):
-            for cand in cands:
-                if cand.lower() in c.lower():
-                    return i
-        return None
-
-    idx_desc = find_idx(["Category(Middle) Description"]) or find_idx(["Description"])
-    idx_wc = find_idx(["Work Master", "Work Master Code"])
-    idx_qty = find_idx(["Qty", "Quantity"])
-    idx_uom = find_idx(["UoM1", "UoM 1", "UoM"])
-    idx_group = find_idx(["Work Group Code"])
-
-    # 인덱스 기반 시리즈 (중복 라벨과 무관)
-    def series_by_idx(idx: int | None) -> pd.Series:
-        if idx is None or idx < 0 or idx >= len(dedup_cols):
-            return pd.Series([None] * len(df), index=df.index)
-        return df.iloc[:, idx]
-
-    name_s = series_by_idx(idx_desc)
-    code_s = series_by_idx(idx_wc)
-    qty_s = pd.to_numeric(series_by_idx(idx_qty), errors="coerce")
-    unit_s = series_by_idx(idx_uom)
-    group_s = series_by_idx(idx_group)
-
-    # 상단 정규화 필드 프레임(동일 인덱스)
-    norm = pd.DataFrame(
-        {"code": code_s, "name": name_s, "qty": qty_s, "unit": unit_s, "group_code": group_s},
-        index=df.index,
-    )
+def _dry_run_out(entry, *, detected, sample, source, sheet, raw_cols, cached=False):
+    out = {
+        "dry_run": True,
+        "detected_items": detected,
+        "sample": sample,
+        "source": source,
+        "sheet_used": sheet,
+        "raw_columns": raw_cols,  # ✅ 원본 컬럼 리스트 반환
+        "cached": cached,
+        "staging_token": None,
+        "expires_at": None,
+    }
+    if entry is not None:
+        out["staging_token"] = entry["token"]
+        out["expires_at"] = entry["expires_at"]
+    return out
 
-    # 'Description' 헤더 잔재 행 제거
-    mask_header = norm["name"].astype(str).str.strip().str.lower().eq("description")
-    keep_idx = norm.index[~mask_header]
 
-    def clean_scalar(v):
-        # 위치 기반으로 가져오기 때문에 v는 스칼라
-        if v is None:
-            return None
-        try:
-            if pd.isna(v):
-                return None
-        except Exception:
-            pass
-        if isinstance(v, str):
-            s = v.strip()
-            return s if s != "" and s.lower() != "nan" else None
-        if isinstance(v, (pd.Timestamp,)):
-            return v.isoformat()
-        if isinstance(v, (int, float, np.number)):
-            return float(v)
-        return v
-
-    items: list[dict] = []
-    for i in keep_idx:
-        row = df.loc[i]
-
-        # 원본 전체 컬럼: 위치 기반으로 값 추출 → 디듀프된 컬럼명으로 매핑
-        raw_map = {}
-        for j, col_name in enumerate(raw_columns):
-            v = row.iloc[j]  # ← 위치 기반 (Series 아님)
-            raw_map[col_name] = clean_scalar(v)
-
-        itm = {
-            "code": clean_scalar(norm.at[i, "code"]) or "",
-            "name": clean_scalar(norm.at[i, "name"]),
-            "qty": clean_scalar(norm.at[i, "qty"]),
-            "unit": clean_scalar(norm.at[i, "unit"]),
-            "group_code": clean_scalar(norm.at[i, "group_code"]),
-            "_raw": raw_map,  # 원본 전체 보존
-        }
-        items.append(itm)
+def _create_upload_batch(
+    db: Session,
+    items_iter,
+    raw_cols: list[str],
+    *,
+    source: str | None,
+    filename: str | None,
+    project_id: int | None,
+    sheet: str | None,
+    content_sha256: str | None,
+    fmt: str = "xlsx",
+) -> dict:
+    # 인제스트 (기존 /wms/ingest 로직을 내부에서 그대로 수행)
+    batch = m.WmsBatch(
+        source=source or filename,
+        project_id=project_id,
+        uploader="upload",
+        status="received",
+        meta_json={
+            "filename": filename,
+            "sheet": sheet,
+            "raw_columns": raw_cols,
+            "content_sha256": content_sha256,
+            "format": fmt,
+        },  # ✅ 메타에 보존
+    )
+    db.add(batch)
+    db.flush()
 
-    return items, raw_columns
+    stats = insert_rows(db, batch.id, items_iter)  # ✅ 청크 단위 벌크 적재
+    db.commit()
+    return {
+        "batch_id": batch.id,
+        "count": stats["count"],
+        "new_payloads": stats["new_payloads"],
+        "source": batch.source,
+        "rows_per_sec": stats["rows_per_sec"],
+    }
 
 
 @router.post("/upload-excel")
@@ -329,52 +574,442 @@ def upload_excel(
     project_id: int | None = Form(None),
     sheet: str | None = Form(None),
     dry_run: bool = Form(False),
+    parser: str = Form("stream", description="stream|pandas"),
+    background: bool = Form(False, description="True면 잡으로 처리하고 job_id 즉시 반환"),
     db: Session = Depends(get_db),
 ):
     """
     엑셀 파일(Work Master 형식)을 업로드하고 items로 정규화한 뒤,
     dry_run=False면 즉시 WMS에 인제스트합니다.
+    parser=stream(기본): openpyxl read-only로 한 행씩 읽어 바로 적재 (메모리 일정)
+    parser=pandas: 파싱 프로세스 풀에서 시트 전체를 DataFrame으로 읽어 정규화
+    background=True: 배치를 'queued'로 만들고 워커 풀에서 파싱/적재 → GET /jobs/{job_id}
+
+    dry_run 결과는 staging_token으로 서버에 보관되며 POST /upload-excel/commit 으로
+    재파싱 없이 인제스트할 수 있습니다. 같은 파일 내용(sha256)+시트는 보관 결과를 재사용합니다.
     """
+    if parser not in ("stream", "pandas"):
+        raise HTTPException(400, "parser must be 'stream' or 'pandas'")
+    return _handle_upload(
+        file.file,
+        file.filename,
+        source=source,
+        project_id=project_id,
+        sheet=sheet,
+        dry_run=dry_run,
+        parser=parser,
+        background=background,
+        db=db,
+    )
+
+
+def _handle_upload(
+    fileobj,
+    filename: str | None,
+    *,
+    source: str | None,
+    project_id: int | None,
+    sheet: str | None,
+    dry_run: bool,
+    parser: str,
+    background: bool,
+    db: Session,
+    path: Path | None = None,
+    fmt: str = "xlsx",
+):
+    """
+    업로드 공통 처리 (upload-excel / upload / 분할 업로드 finalize).
+    fileobj: seek 가능한 바이너리 파일, path: 이미 디스크에 있는 경우 그 경로(복사 생략)
+      - background 잡은 path 를 스풀로 이동하므로 fileobj=None(파일을 닫은 상태) + fmt 지정으로 호출
+    fmt: xlsx|csv|parquet|arrow|auto (auto는 매직 바이트/확장자로 판별)
+    """
+    if fmt == "auto":
+        fmt = detect_format(fileobj, filename)
+    if fmt not in FORMATS:
+        raise HTTPException(400, f"format must be one of {', '.join(FORMATS)} or 'auto'")
+    if fmt != "xlsx":
+        sheet = None  # 시트 개념 없음
+    if background and not dry_run:
+        return _submit_upload_job(
+            fileobj, filename, source, project_id, sheet, parser, db, path, fmt=fmt
+        )
+    try:
+        sha = staging.content_hash(fileobj)
+        staged = staging.find(sha, sheet)
+        if staged is not None:
+            items = staged["items"]
+            if dry_run or not items:
+                return _dry_run_out(
+                    staged,
+                    detected=len(items),
+                    sample=items[:5],
+                    source=source,
+                    sheet=sheet,
+                    raw_cols=staged["raw_columns"],
+                    cached=True,
+                )
+            out = _create_upload_batch(
+                db,
+                iter(items),
+                staged["raw_columns"],
+                source=source,
+                filename=filename,
+                project_id=project_id,
+                sheet=sheet,
+                content_sha256=sha,
+                fmt=fmt,
+            )
+            staging.discard(staged["token"])  # 커밋된 뒤에만 (적재 실패 시 재시도에 다시 사용)
+            return out
+
+        if fmt != "xlsx":
+            # ✅ CSV/Parquet/Arrow: pyarrow 레코드 배치 단위 열 기반 정규화
+            raw_cols, items_iter = open_columnar(fileobj, fmt)
+            first, items_iter = peek(items_iter)
+        elif parser == "pandas":
+            tmp = None if path else jobs.spool_upload(fileobj)
+            try:
+                items, raw_cols = normalize_excel(path or tmp, sheet)
+            finally:
+                if tmp:
+                    tmp.unlink(missing_ok=True)
+            first, items_iter = (items[0] if items else None), iter(items)
+        else:
+            # ✅ 업로드 스풀 파일을 그대로 넘김 (전체 bytes로 읽지 않음)
+            raw_cols, _, items_iter = open_work_master_excel(fileobj, sheet_name=sheet)
+            first, items_iter = peek(items_iter)
+
+        if dry_run or first is None:
+            # 상한 이내면 전체를 보관(staging), 넘으면 개수/샘플만 집계
+            kept: list[dict] | None = []
+            sample, detected = [], 0
+            for it in items_iter:
+                if detected < 5:
+                    sample.append(it)
+                detected += 1
+                if kept is not None:
+                    kept.append(it)
+                    if len(kept) > settings.WMS_STAGING_MAX_ROWS:
+                        kept = None
+            entry = (
+                staging.put(kept, raw_cols, content_sha256=sha, sheet=sheet, filename=filename)
+                if kept is not None
+                else None
+            )
+            return _dry_run_out(
+                entry, detected=detected, sample=sample, source=source, sheet=sheet, raw_cols=raw_cols
+            )
+
+        return _create_upload_batch(
+            db,
+            items_iter,
+            raw_cols,
+            source=source,
+            filename=filename,
+            project_id=project_id,
+            sheet=sheet,
+            content_sha256=sha,
+            fmt=fmt,
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        import traceback
+
+        traceback.print_exc()
+        db.rollback()
+        raise HTTPException(status_code=500, detail=f"{type(e).__name__}: {e}")
+
+
+@router.post("/upload")
+def upload_file(
+    file: UploadFile = File(...),
+    source: str | None = Form(None),
+    project_id: int | None = Form(None),
+    sheet: str | None = Form(None),
+    dry_run: bool = Form(False),
+    format: str = Form("auto", description="auto|xlsx|csv|parquet|arrow"),
+    parser: str = Form("stream", description="xlsx 전용: stream|pandas"),
+    background: bool = Form(False),
+    db: Session = Depends(get_db),
+):
+    """
+    형식 자동 판별 업로드: Excel(Work Master) / CSV / Parquet / Arrow IPC.
+    CSV/Parquet/Arrow는 pyarrow 열 기반 리더로 읽어 같은 item 형태
+    (code/name/qty/unit/group_code/_raw)로 매핑합니다. 옵션은 upload-excel과 동일.
+    """
+    if parser not in ("stream", "pandas"):
+        raise HTTPException(400, "parser must be 'stream' or 'pandas'")
+    return _handle_upload(
+        file.file,
+        file.filename,
+        source=source,
+        project_id=project_id,
+        sheet=sheet,
+        dry_run=dry_run,
+        parser=parser,
+        background=background,
+        db=db,
+        fmt=format,
+    )
+
+
+@router.post("/upload-excel/commit")
+def commit_staged_upload(
+    staging_token: str = Form(...),
+    source: str | None = Form(None),
+    project_id: int | None = Form(None),
+    db: Session = Depends(get_db),
+):
+    """dry_run으로 보관된 정규화 결과(staging_token)를 재파싱 없이 인제스트"""
+    entry = staging.pop(staging_token)
+    if entry is None:
+        raise HTTPException(404, "staging token not found or expired")
+    if not entry["items"]:
+        raise HTTPException(400, "staged upload has no items")
+    try:
+        return _create_upload_batch(
+            db,
+            iter(entry["items"]),
+            entry["raw_columns"],
+            source=source,
+            filename=entry["filename"],
+            project_id=project_id,
+            sheet=entry["sheet"],
+            content_sha256=entry["content_sha256"],
+        )
+    except Exception as e:
+        import traceback
+
+        traceback.print_exc()
+        db.rollback()
+        raise HTTPException(status_code=500, detail=f"{type(e).__name__}: {e}")
+
+
+def _collect_multi(tasks: list[dict], dry_run: bool, project_id: int | None, db: Session):
+    """(파일, 시트)별 파싱 결과 → staging 보관(dry_run) 또는 배치 생성. 작업별 실패는 error 로"""
+    results = []
+    for t in tasks:
+        out = {"filename": t["filename"], "sheet": t["sheet"], "source": t["source"]}
+        try:
+            if t["staged"] is not None:
+                items, raw_cols = t["staged"]["items"], t["staged"]["raw_columns"]
+            else:
+                items, raw_cols = t["future"].result()
+
+            if dry_run or not items:
+                entry = t["staged"] or staging.put(
+                    items, raw_cols, content_sha256=t["sha"], sheet=t["sheet"],
+                    filename=t["filename"],
+                )  # fmt: skip
+                out.update(
+                    _dry_run_out(
+                        entry,
+                        detected=len(items),
+                        sample=items[:5],
+                        source=t["source"],
+                        sheet=t["sheet"],
+                        raw_cols=raw_cols,
+                        cached=t["staged"] is not None,
+                    )
+                )
+            else:
+                if t["staged"] is not None:
+                    staging.discard(t["staged"]["token"])
+                out.update(
+                    _create_upload_batch(
+                        db,
+                        iter(items),
+                        raw_cols,
+                        source=t["source"],
+                        filename=t["filename"],
+                        project_id=project_id,
+                        sheet=t["sheet"],
+                        content_sha256=t["sha"],
+                    )
+                )
+        except Exception as e:
+            import traceback
+
+            traceback.print_exc()
+            db.rollback()
+            out["error"] = f"{type(e).__name__}: {e}"
+        results.append(out)
+    return results
+
+
+@router.post("/upload-excel/multi")
+def upload_excel_multi(
+    files: list[UploadFile] = File(...),
+    sources: str | None = Form(None, description="파일 순서대로 쉼표구분: 'AR,FP,SS'"),
+    sheets: str | None = Form(None, description="쉼표구분 시트들, '*'=전체 시트, 생략=첫 시트"),
+    project_id: int | None = Form(None),
+    dry_run: bool = Form(False),
+    db: Session = Depends(get_db),
+):
+    """
+    여러 엑셀 파일 × 여러 시트를 한 번에 업로드.
+    (파일, 시트)마다 파싱 프로세스 풀에서 동시에 정규화하고, (파일, 시트)마다 WmsBatch 1건 생성.
+    요청 1건은 파싱 슬롯을 최대 WMS_PARSE_WORKERS 개만 사용하고 (남는 작업은 그 안에서 차례로),
+    시작 시 빈 슬롯이 하나도 없으면 503 (단일 업로드와 같음).
+    dry_run=True면 각 결과를 staging_token으로 보관 (POST /upload-excel/commit).
+    """
+    t0 = time.perf_counter()
+    src_list = [x.strip() for x in sources.split(",")] if sources else []
+    sheet_list = [x.strip() for x in sheets.split(",") if x.strip()] if sheets else [None]
+
+    # 1) 파일 스풀 + (파일, 시트) 작업 목록
+    tasks: list[dict] = []
+    paths = []
+    try:
+        for k, f in enumerate(files):
+            sha = staging.content_hash(f.file)
+            path = jobs.spool_upload(f.file)
+            paths.append(path)
+            names = sheet_names(str(path)) if sheet_list == ["*"] else sheet_list
+            for sh in names:
+                tasks.append(
+                    {
+                        "filename": f.filename,
+                        "source": (src_list[k] if k < len(src_list) and src_list[k] else None)
+                        or f.filename,
+                        "sheet": sh,
+                        "path": path,
+                        "sha": sha,
+                    }
+                )
+
+        # 2) 동시 파싱 (보관된 동일 내용은 재사용)
+        #    이 요청은 파싱 슬롯을 최대 WMS_PARSE_WORKERS 개만 잡음 (없으면 503, 나머지는 그 안에서 차례로)
+        for t in tasks:
+            t["staged"] = staging.find(t["sha"], t["sheet"])
+        todo = [t for t in tasks if t["staged"] is None]
+        with reserve(len(todo)) as slots:  # 나갈 때 이 요청의 파싱이 모두 끝남 → 슬롯 반환
+            for t in todo:
+                t["future"] = slots.submit_normalize(t["path"], t["sheet"])
+
+        # 3) 결과 수집 → 배치 생성 (DB 쓰기는 순차)
+        results = _collect_multi(tasks, dry_run, project_id, db)
+    except HTTPException:
+        raise
+    except Exception as e:
+        import traceback
+
+        traceback.print_exc()
+        db.rollback()
+        raise HTTPException(status_code=500, detail=f"{type(e).__name__}: {e}")
+    finally:
+        for t in tasks:
+            if "future" in t:
+                t["future"].cancel()  # 앞선 예외로 중단된 경우 대기 작업 정리
+        for path in paths:
+            path.unlink(missing_ok=True)
+
+    return {
+        "dry_run": dry_run,
+        "results": results,
+        "batches": [r["batch_id"] for r in results if r.get("batch_id")],
+        "errors": sum(1 for r in results if r.get("error")),
+        "elapsed_sec": round(time.perf_counter() - t0, 3),
+    }
+
+
+# === 분할(재개 가능) 업로드: 세션 생성 → 청크 PUT → finalize ===
+@router.post("/uploads")
+def create_upload_session(payload: s.WmsUploadSessionCreate):
+    return chunked.create_session(payload.filename, payload.total_chunks)
+
+
+@router.get("/uploads/{upload_id}")
+def get_upload_session(upload_id: str):
+    """재개용: 이미 받은 청크 index 목록(received) 포함"""
+    return chunked.load_session(upload_id)
+
+
+@router.put("/uploads/{upload_id}/chunks/{index}")
+async def put_upload_chunk(
+    upload_id: str,
+    index: int,
+    request: Request,
+    x_chunk_sha256: str | None = Header(None),
+):
+    """본문(raw bytes)을 _data/chunked/ 에 바로 기록. 같은 index 재전송은 덮어씀."""
+    return await chunked.write_chunk(upload_id, index, request.stream(), x_chunk_sha256)
+
+
+@router.post("/uploads/{upload_id}/finalize")
+def finalize_upload_session(
+    upload_id: str,
+    total_chunks: int | None = Form(None),
+    source: str | None = Form(None),
+    project_id: int | None = Form(None),
+    sheet: str | None = Form(None),
+    dry_run: bool = Form(False),
+    parser: str = Form("stream", description="stream|pandas"),
+    background: bool = Form(False),
+    db: Session = Depends(get_db),
+):
+    """
+    청크를 이어붙인 파일을 메모리에 올리지 않고 파서에 바로 전달 (upload-excel과 동일 옵션).
+    누락 청크가 있으면 409 + missing 목록 → 해당 청크만 다시 PUT 후 재시도.
+    """
+    if parser not in ("stream", "pandas"):
+        raise HTTPException(400, "parser must be 'stream' or 'pandas'")
+    path, meta = chunked.assemble(upload_id, total_chunks)
+    filename = meta.get("filename")
+    opts = dict(
+        source=source,
+        project_id=project_id,
+        sheet=sheet,
+        dry_run=dry_run,
+        parser=parser,
+        background=background,
+        db=db,
+        path=path,
+    )
+    # 처리에 실패하면 세션(이어붙인 파일)을 남겨 같은 upload_id 로 재시도 (성공 시에만 삭제)
+    with open(path, "rb") as f:
+        fmt = detect_format(f, filename)  # 분할 업로드는 형식 자동 판별 (xlsx/csv/parquet/arrow)
+        if not background or dry_run:
+            out = _handle_upload(f, filename, **opts, fmt=fmt)
+    if background and not dry_run:
+        # ✅ 잡은 파일을 스풀 디렉터리로 옮김 → 닫은 뒤 경로만 전달 (Windows 는 열린 파일 이동 불가)
+        out = _handle_upload(None, filename, **opts, fmt=fmt)
+    chunked.discard(upload_id)
+    return out
+
+
+@router.delete("/uploads/{upload_id}")
+def abort_upload_session(upload_id: str):
+    chunked.load_session(upload_id)
+    chunked.discard(upload_id)
+    return {"deleted": True, "upload_id": upload_id}
+
+
+def _submit_upload_job(
+    fileobj,
+    filename: str | None,
+    source: str | None,
+    project_id: int | None,
+    sheet: str | None,
+    parser: str,
+    db: Session,
+    path: Path | None = None,
+    fmt: str = "xlsx",
+):
     try:
-        content = file.file.read()
-        items, raw_cols = _normalize_work_master_excel(content, sheet_name=sheet)
-
-        if dry_run or not items:
-            return {
-                "dry_run": True,
-                "detected_items": len(items),
-                "sample": items[:5],
-                "source": source,
-                "sheet_used": sheet,
-                "raw_columns": raw_cols,  # ✅ 원본 컬럼 리스트 반환
-            }
-
-        # 인제스트 (기존 /wms/ingest 로직을 내부에서 그대로 수행)
         batch = m.WmsBatch(
-            source=source or file.filename,
+            source=source or filename,
             project_id=project_id,
             uploader="upload",
-            status="received",
-            meta_json={
-                "filename": file.filename,
-                "sheet": sheet,
-                "raw_columns": raw_cols,
-            },  # ✅ 메타에 보존
+            status=jobs.BATCH_QUEUED,
+            meta_json={"filename": filename, "sheet": sheet, "format": fmt},
         )
+        # 잡이 끝나면 스풀 파일을 지우므로, 기존 파일은 스풀 디렉터리로 이동만
+        path = jobs.spool_file(path) if path else jobs.spool_upload(fileobj)
+        jobs.mark(batch, jobs.BATCH_QUEUED, spool=path.name)  # 재시작 복구 시 스풀 정리
         db.add(batch)
-        db.flush()
-
-        for i, it in enumerate(items):
-            db.add(
-                m.WmsRow(
-                    batch_id=batch.id,
-                    row_index=i,
-                    payload_json=it,
-                    status="received",
-                )
-            )
         db.commit()
-        return {"batch_id": batch.id, "count": len(items), "source": batch.source}
     except Exception as e:
         import traceback
 
@@ -382,45 +1017,244 @@ def upload_excel(
         db.rollback()
         raise HTTPException(status_code=500, detail=f"{type(e).__name__}: {e}")
 
+    job = jobs.submit_excel_ingest(path, batch_id=batch.id, sheet=sheet, parser=parser, fmt=fmt)
+    return {
+        "job_id": job["job_id"],
+        "batch_id": batch.id,
+        "stage": job["stage"],
+        "source": batch.source,
+    }
+
+
+def _job_out(job: dict, db: Session) -> dict:
+    batch = db.get(m.WmsBatch, job["batch_id"]) if job.get("batch_id") else None
+    return {**job, "batch_status": batch.status if batch else None}
+
+
+@router.get("/jobs")
+def list_jobs(db: Session = Depends(get_db)):
+    return [_job_out(j, db) for j in jobs.list_jobs(db)]
+
+
+@router.get("/jobs/{job_id}")
+def get_job(job_id: str, db: Session = Depends(get_db)):
+    job = jobs.get_job(db, job_id)
+    if not job:
+        raise HTTPException(404, "job not found")
+    return _job_out(job, db)
+
 
 @router.delete("/batches/{batch_id}", status_code=status.HTTP_200_OK)
 def delete_batch(batch_id: int, db: Session = Depends(get_db)):
     """
-    배치 1건과 그 하위 rows 전체 삭제.
-    SQLite에서는 PRAGMA foreign_keys=ON + FK(ondelete='CASCADE')가 필요합니다.
+    배치 1건 삭제 (소프트 삭제).
+    요청은 deleted_at 설정 + 현재 배치 포인터 제거만 하고 바로 반환 → 모든 조회에서 즉시 제외.
+    하위 rows / 링크는 백그라운드 purge 가 청크 단위로 삭제 (진행 상황: GET /batches/purge)
     """
     try:
-        batch = db.get(m.WmsBatch, batch_id)
+        batch = live_batch(db, batch_id)
         if not batch:
             raise HTTPException(status_code=404, detail="batch not found")
 
-        # DB FK ondelete='CASCADE'가 있지만, 안전하게 하위 먼저 삭제해도 OK
-        db.execute(sa_delete(m.WmsRow).where(m.WmsRow.batch_id == batch_id))
-        db.delete(batch)
+        purge.soft_delete(db, batch)
         db.commit()
-        return {"deleted": True, "batch_id": batch_id}
+    except HTTPException:
+        raise
     except Exception as e:
         import traceback
 
         traceback.print_exc()
         db.rollback()
         raise HTTPException(status_code=500, detail=f"{type(e).__name__}: {e}")
+    purge.schedule()
+    return {"deleted": True, "batch_id": batch_id, "purge": "scheduled"}
+
+
+@router.get("/batches/purge")
+def get_purge_status():
+    return purge.status()
+
+
+@router.post("/batches/purge")
+def run_purge():
+    """남아 있는 삭제 배치 purge + 정리 예약 (서버 재시작 등으로 중단된 purge 재개)"""
+    return purge.schedule()
+
+
+# === 보관 (대체된 배치 → Parquet, archive.py) ===
+@router.get("/batches/archive")
+def get_archive_status(db: Session = Depends(get_db)):
+    return {**archive.status(), "candidates": archive.candidates(db)}
+
+
+@router.post("/batches/archive")
+def archive_batches(
+    dry_run: bool = Query(False, description="대상 목록만"), db: Session = Depends(get_db)
+):
+    """보관 대상(현재 배치 아님 + ACTIVE/DRAFT 릴리즈 링크 없음 + 더 새 배치 있음) 전체를 백그라운드로 보관"""
+    if dry_run:
+        return {"candidates": archive.candidates(db)}
+    return archive.schedule()  # 워커가 자기 세션으로 진행
+
+
+@router.post("/batches/{batch_id}/archive")
+def archive_batch(batch_id: int, db: Session = Depends(get_db)):
+    try:
+        return archive.archive_batch(db, batch_id)
+    except HTTPException:
+        raise
+    except Exception as e:
+        import traceback
+
+        traceback.print_exc()
+        db.rollback()
+        raise HTTPException(status_code=500, detail=f"archive failed: {type(e).__name__}: {e}")
+
+
+@router.post("/batches/{batch_id}/restore")
+def restore_batch(batch_id: int, db: Session = Depends(get_db)):
+    try:
+        return archive.restore_batch(db, batch_id)
+    except HTTPException:
+        raise
+    except Exception as e:
+        import traceback
+
+        traceback.print_exc()
+        db.rollback()
+        raise HTTPException(status_code=500, detail=f"restore failed: {type(e).__name__}: {e}")
+
+
+# 목록 응답의 code/name/unit/qty/group_code 는 payload 원본 값 그대로
+#   (wms_row 의 같은 이름 인덱스 컬럼은 strip/숫자 변환한 필터·조인용 키 → 응답에 쓰지 않음)
+_ITEM_COLUMNS = (m.WmsRow.id, m.WmsBatch.source, m.WmsRow.batch_id)
+_PAYLOAD_FIELDS = ("code", "name", "unit", "qty", "group_code")
+
+
+def _item_out(r) -> dict:
+    p = r.payload_json if isinstance(r.payload_json, dict) else {}
+    return {
+        "row_id": int(r.id),
+        "source": r.source,
+        "code": p.get("code") or "",
+        "name": p.get("name") or "",
+        "unit": p.get("unit"),
+        "qty": p.get("qty"),
+        "_raw": p.get("_raw") or {},  # ✅ 프론트가 여기서 모든 컬럼을 꺼내 쓸 것
+    }
+
+
+# fields= 프로젝션: 요청한 필드만 직렬화 (row_id, source 는 항상 포함)
+#   예) fields=code,name,unit,qty  /  fields=code,_raw.Description,_raw.Qty  /  fields=_raw
+#   batch_id 는 wms_row 컬럼, 나머지(payload 원본 값, _raw)는 행마다 payload 를 1회만 읽어 추림
+_PROJ_FIELDS = ("batch_id", *_PAYLOAD_FIELDS)
+
+
+def _parse_fields(fields: str) -> tuple[list[str], list[str], bool]:
+    """fields= → (최상위 필드들, _raw 키들, _raw 전체 여부)"""
+    top: list[str] = []
+    raw_keys: list[str] = []
+    raw_all = False
+    for f in dict.fromkeys(x.strip() for x in fields.split(",")):
+        if not f or f in ("row_id", "source"):
+            continue
+        if f == "_raw":
+            raw_all = True
+        elif f.startswith("_raw.") and len(f) > 5:
+            raw_keys.append(f[5:])
+        elif f in _PROJ_FIELDS:
+            top.append(f)
+        else:
+            raise HTTPException(400, f"unknown field: {f}")
+    return top, raw_keys, raw_all
+
+
+def _pick(p, batch_id: int, top: list[str], raw_keys: list[str], raw_all: bool) -> dict:
+    """payload dict 에서 요청한 필드만 (DB 행 / 보관 행 공용)"""
+    p = p if isinstance(p, dict) else {}
+    d = {}
+    for f in top:
+        v = batch_id if f == "batch_id" else p.get(f)
+        d[f] = (v or "") if f in ("code", "name") else v
+    raw = p.get("_raw") if isinstance(p.get("_raw"), dict) else {}
+    if raw_all:
+        d["_raw"] = raw
+    elif raw_keys:
+        d["_raw"] = {k: raw.get(k) for k in raw_keys}
+    return d
+
+
+def _projection(db: Session, fields: str | None):
+    """반환: (SELECT 컬럼들, row → 응답 dict)"""
+    # row_batch_id: shape=columns 의 raw_columns(배치 메타) 조회용 (항상 마지막)
+    bid = m.WmsRow.batch_id.label("row_batch_id")
+    if not fields:
+        return (*_ITEM_COLUMNS, m.WmsRow.payload_json, bid), _item_out
+
+    top, raw_keys, raw_all = _parse_fields(fields)
+    cols = [m.WmsRow.id, m.WmsBatch.source]
+    # payload 는 필드 수와 무관하게 행당 1회 조회 (batch_id 만 요청하면 조회 없음)
+    with_payload = raw_all or bool(raw_keys) or any(f != "batch_id" for f in top)
+    if with_payload:
+        cols.append(m.WmsRow.payload_json)
+    cols.append(bid)
+
+    def out(r) -> dict:
+        p = r.payload_json if with_payload else None
+        d = {"row_id": int(r.id), "source": r.source}
+        d.update(_pick(p, r.row_batch_id, top, raw_keys, raw_all))
+        return d
+
+    return cols, out
+
+
+# 보관(archive.py) 배치의 Parquet 행 → _projection 의 out 과 같은 응답 dict
+_ARCHIVE_ITEM_KEYS = ["payload_json"]
+
+
+def _archived_out(fields: str | None):
+    top, raw_keys, raw_all = _parse_fields(fields) if fields else (None, [], True)
+
+    def out(r: dict, batch_id: int, source: str | None) -> dict:
+        if top is None:
+            return _item_out(SimpleNamespace(**r, source=source))
+        d = {"row_id": int(r["id"]), "source": source}
+        d.update(_pick(r["payload_json"], batch_id, top, raw_keys, raw_all))
+        return d
+
+    return out
+
+
+def _archived_rows(table, out, batch_id: int, source: str | None) -> Iterator[dict]:
+    for r in archive.iter_rows(table):
+        yield out(r, batch_id, source)
 
 
 # 통합 아이템 목록 (AR/FP/SS 통합, 필터/검색/페이지네이션)
 @router.get("/items")
 def list_items(
+    response: Response,
     sources: Optional[str] = Query(None, description="AR,FP,SS"),
     search: Optional[str] = Query(None),
-    limit: int | None = Query(None),
+    limit: int | None = Query(None, ge=1),
     offset: int = Query(0, ge=0),
     order: str = Query("asc"),
     batch_id: int | None = Query(None, description="이 배치의 행만 조회"),
     batch_ids: str | None = Query(None, description="쉼표구분 배치들: '7,8,12'"),
+    cursor: int | None = Query(None, description="이전 페이지의 마지막 row_id (X-Next-Cursor)"),
+    with_total: bool = Query(False, description="X-Total-Count 헤더로 전체 건수"),
+    code: str | None = Query(None, description="code 정확히 일치"),
+    group_code: str | None = Query(None, description="group_code 정확히 일치"),
+    fields: str | None = Query(None, description="쉼표구분 응답 필드: 'code,name,_raw.Qty'"),
+    shape: str = Query("rows", description="rows | columns (열 이름 1회 + 행 배열)"),
+    stream: str | None = Query(None, description="ndjson | arrow: 청크 단위 스트리밍 (shape 무시)"),
     db: Session = Depends(get_db),
 ):
     if order not in ("asc", "desc"):
         raise HTTPException(400, "order must be 'asc' or 'desc'")
+    _check_shape(shape)
+    if stream:
+        check_format(stream)
 
     src_list = [s.strip() for s in sources.split(",")] if sources else None
     ids_list = None
@@ -430,76 +1264,129 @@ def list_items(
         except Exception:
             raise HTTPException(400, "batch_ids must be comma-separated integers")
 
-    q = (
-        select(m.WmsRow.id, m.WmsBatch.source, m.WmsRow.payload_json, m.WmsRow.batch_id)
-        .join(m.WmsBatch, m.WmsBatch.id == m.WmsRow.batch_id)
-        .order_by(m.WmsRow.id.asc() if order == "asc" else m.WmsRow.id.desc())
-    )
+    # 보관된 배치는 batch_id / batch_ids 로 지정했을 때 Parquet 에서 읽어 id 순으로 병합
+    wanted = ids_list or ([batch_id] if batch_id is not None else [])
+    arch = archive.archived(db, wanted)
+    if src_list:
+        arch = {b: src for b, src in arch.items() if src in src_list}
+    live_ids = [b for b in wanted if b not in arch]
+
+    cols, out = _projection(db, fields)
+    q = select(*cols).join(m.WmsBatch, m.WmsBatch.id == m.WmsRow.batch_id).where(is_live())
     if src_list:
         q = q.where(m.WmsBatch.source.in_(src_list))
     if ids_list:
-        q = q.where(m.WmsRow.batch_id.in_(ids_list))
+        q = q.where(m.WmsRow.batch_id.in_(live_ids))
     elif batch_id is not None:
         q = q.where(m.WmsRow.batch_id == batch_id)
-
-    rows = db.execute(q).all()
-    s_lower = (search or "").lower()
-    items = []
-
-    for r in rows:
-        p = r.payload_json or {}
-        raw = p.get("_raw") if isinstance(p, dict) else {}
-        code = (p.get("code") or "") if isinstance(p, dict) else ""
-        name = (p.get("name") or "") if isinstance(p, dict) else ""
-
-        # ✅ 검색: code/name + raw 전체 값에서 부분일치
-        if s_lower:
-            hit = any(s_lower in str(v).lower() for v in (code, name))
-            if not hit and isinstance(raw, dict):
-                for v in raw.values():
-                    try:
-                        if s_lower in str(v).lower():
-                            hit = True
-                            break
-                    except Exception:
-                        pass
-            if not hit:
-                continue
-
-        items.append(
-            {
-                "row_id": int(r.id),
-                "source": r.source,
-                "code": code,
-                "name": name,
-                "unit": (p.get("unit") if isinstance(p, dict) else None),
-                "qty": (p.get("qty") if isinstance(p, dict) else None),
-                "_raw": raw,  # ✅ 프론트가 여기서 모든 컬럼을 꺼내 쓸 것
-            }
-        )
-
-    # ✅ 검색 후 최종 정렬
-    items.sort(key=lambda x: x["row_id"], reverse=(order == "desc"))
-
-    # ✅ 정렬 이후 슬라이스
-    if limit is not None:
-        items = items[offset : offset + limit]
-
-    return items
-
-
-@router.get("/links", response_model=list[s.WmsLinkedItemOut])
+    if code is not None:
+        q = q.where(m.WmsRow.code == code.strip())
+    if group_code is not None:
+        q = q.where(m.WmsRow.group_code == group_code.strip())
+
+    # ✅ 검색: code/name + raw 전체 값에서 부분일치 → DB 검색 인덱스 (search.py)
+    if search and (live_ids or not wanted):
+        q = q.where(search_clause(db, search))
+
+    if arch:
+        return _list_items_archived(
+            db, response, q if (live_ids or not wanted) else None, out, arch,
+            fields=fields, search=search, code=code, group_code=group_code, order=order,
+            cursor=cursor, offset=offset, limit=limit, with_total=with_total, shape=shape,
+            stream=stream,
+        )  # fmt: skip
+
+    # ✅ 정렬/페이지도 SQL (keyset: cursor, 이전 방식: offset)
+    total = _count_rows(db, q) if with_total else None
+    if stream:
+        # limit 없는 전체 조회도 메모리 일정 (서버측 커서 → 청크별 NDJSON/Arrow)
+        stmt = _paginate(q, order, cursor, limit, offset)
+        return stream_response(stmt, out, stream, _total_header(total))
+    rows = db.execute(_paginate(q, order, cursor, limit, offset)).all()
+    items = [out(r) for r in rows]
+    _page_headers(response, items[-1]["row_id"] if items else None, len(items), limit, total)
+    if shape == "columns":
+        raw_order = _batch_raw_columns(db, {r.row_batch_id for r in rows})
+        return _columnar_response(response, items, raw_order)
+    return _direct_response(response, items)
+
+
+def _list_items_archived(
+    db: Session,
+    response: Response,
+    q,
+    out,
+    arch: dict[int, str | None],
+    *,
+    fields, search, code, group_code, order, cursor, offset, limit, with_total, shape, stream,
+):  # fmt: skip
+    """DB 행(q, 없으면 None) + 보관 배치 Parquet 행을 row_id 순으로 병합해 한 페이지"""
+    desc = order == "desc"
+    skip = 0 if cursor is not None else offset  # _paginate 와 같이 cursor 가 있으면 offset 무시
+    need = None if limit is None else skip + limit  # 각 출처에서 앞쪽 need 개면 충분
+    equals = {}
+    if code is not None:
+        equals["code"] = code.strip()
+    if group_code is not None:
+        equals["group_code"] = group_code.strip()
+    aout = _archived_out(fields)
+
+    total = 0 if with_total else None
+    tables = {}
+    for bid in sorted(arch):
+        t, n = archive.scan(
+            bid, _ARCHIVE_ITEM_KEYS, order=order, cursor=cursor, equals=equals, search=search,
+            with_total=with_total,
+        )  # fmt: skip
+        if with_total:
+            total += n
+        tables[bid] = t.slice(0, need)
+    if q is not None and with_total:
+        total += _count_rows(db, q)
+
+    streams = [_archived_rows(t, aout, bid, arch[bid]) for bid, t in tables.items()]
+    db_rows = []
+    if q is not None:
+        stmt = _paginate(q, order, cursor, need)
+        if stream:
+            streams.append(iter_query(stmt, out))
+        else:
+            db_rows = db.execute(stmt).all()
+            streams.append(out(r) for r in db_rows)
+    merged = heapq.merge(*streams, key=lambda d: d["row_id"], reverse=desc)
+    page = islice(merged, skip, need)
+    if stream:
+        return stream_items(page, stream, _total_header(total))
+
+    items = list(page)
+    _page_headers(response, items[-1]["row_id"] if items else None, len(items), limit, total)
+    if shape == "columns":
+        raw_order = _batch_raw_columns(db, {r.row_batch_id for r in db_rows} | set(arch))
+        return _columnar_response(response, items, raw_order)
+    return _direct_response(response, items)
+
+
+@router.get(
+    "/links", response_model=list[s.WmsLinkedItemOut], response_model_exclude_unset=True
+)
 def list_links(
+    response: Response,
     rid: int = Query(...),
     uid: str = Query(...),
     order: str = Query("asc"),
     source: str | None = Query(None, description="AR|FP|SS"),
     batch_id: int | None = Query(None, description="이 배치의 링크만"),
     batch_ids: str | None = Query(None, description="쉼표구분 배치들"),
+    limit: int | None = Query(None, ge=1),
+    cursor: int | None = Query(None, description="이전 페이지의 마지막 row_id (X-Next-Cursor)"),
+    with_total: bool = Query(False),
+    fields: str | None = Query(None, description="쉼표구분 응답 필드: 'code,name,unit,qty'"),
+    shape: str = Query("rows", description="rows | columns (열 이름 1회 + 행 배열)"),
     db: Session = Depends(get_db),
 ):
     if order not in ("asc", "desc"):
         raise HTTPException(400, "order must be 'asc' or 'desc'")
+    _check_shape(shape)
 
     ids_list = None
     if batch_ids:
@@ -508,15 +1395,16 @@ def list_links(
         except Exception:
             raise HTTPException(400, "batch_ids must be comma-separated integers")
 
+    cols, out = _projection(db, fields)
     q = (
-        select(m.WmsRow.id, m.WmsBatch.source, m.WmsRow.payload_json, m.WmsRow.batch_id)
+        select(*cols)
         .join(m.WmsBatch, m.WmsBatch.id == m.WmsRow.batch_id)
         .join(m.StdWmsLink, m.StdWmsLink.wms_row_id == m.WmsRow.id)
         .where(
             m.StdWmsLink.std_release_id == rid,
             m.StdWmsLink.std_node_uid == uid,
+            is_live(),
         )
-        .order_by(m.WmsRow.id.asc() if order == "asc" else m.WmsRow.id.desc())
     )
     if source:
         q = q.where(m.WmsBatch.source == source)
@@ -525,19 +1413,14 @@ def list_links(
     elif batch_id is not None:
         q = q.where(m.WmsRow.batch_id == batch_id)
 
-    rows = db.execute(q).all()
-    return [
-        {
-            "row_id": int(r.id),
-            "source": r.source,
-            "code": (r.payload_json or {}).get("code") or "",
-            "name": (r.payload_json or {}).get("name") or "",
-            "unit": (r.payload_json or {}).get("unit"),
-            "qty": (r.payload_json or {}).get("qty"),
-            "_raw": (r.payload_json or {}).get("_raw") or {},
-        }
-        for r in rows
-    ]
+    total = _count_rows(db, q) if with_total else None
+    rows = db.execute(_paginate(q, order, cursor, limit)).all()
+    _page_headers(response, rows[-1].id if rows else None, len(rows), limit, total)
+    items = [out(r) for r in rows]
+    if shape == "columns":
+        raw_order = _batch_raw_columns(db, {r.row_batch_id for r in rows})
+        return _columnar_response(response, items, raw_order)
+    return items
 
 
 # 다중 할당
@@ -555,6 +1438,7 @@ def assign_links(
         ids: Iterable[int] = payload.get("row_ids") or []
         if not uid or not ids:
             raise HTTPException(status_code=400, detail="invalid request")
+        archive.check_linkable(db, ids)  # 보관(중)인 배치의 행 → 409
 
         # 중복 방지: 이미 존재하는 것은 건너뜀
         existing = set(
@@ -611,35 +1495,35 @@ def unassign_links(
 
 # set current for a batch
 @router.post("/batches/{batch_id}/set-current")
-def set_current_batch(batch_id: int, db: Session = Depends(get_db)):
-    batch = db.get(m.WmsBatch, batch_id)
+def set_current_batch(
+    batch_id: int,
+    per_project: bool = Query(False, description="배치의 project_id 범위 포인터로 지정"),
+    db: Session = Depends(get_db),
+):
+    batch = live_batch(db, batch_id)
     if not batch:
         raise HTTPException(404, "batch not found")
-    # 동일 source의 기존 current 해제
-    siblings = (
-        db.execute(select(m.WmsBatch).where(m.WmsBatch.source == batch.source)).scalars().all()
-    )
-    for b in siblings:
-        mj = dict(b.meta_json or {})
-        if mj.get("is_current"):
-            mj["is_current"] = False
-            b.meta_json = mj
-    # 대상 배치를 current로
-    mj = dict(batch.meta_json or {})
-    mj["is_current"] = True
-    batch.meta_json = mj
+    _check_not_archived(batch)
+    # ✅ (source, project) 포인터 upsert 1회 → 형제 배치 meta_json 을 고쳐 쓰지 않음
+    project_id = (batch.project_id or 0) if per_project else 0
+    set_current(db, batch.source or "", batch.id, project_id)
     db.commit()
     return {
         "ok": True,
         "source": batch.source,
+        "project_id": project_id or None,
         "current_batch_id": int(batch.id),
     }
 
 
 # get current for a source (편의)
 @router.get("/batches/current")
-def get_current_batch(source: str = Query(...), db: Session = Depends(get_db)):
-    b = _pick_current_batch_for_source(db, source)
+def get_current_batch(
+    source: str = Query(...),
+    project_id: int = Query(0, description="per_project 로 지정한 포인터 조회 (0 = source 전체)"),
+    db: Session = Depends(get_db),
+):
+    b = _pick_current_batch_for_source(db, source, project_id)
     if not b:
         raise HTTPException(404, f"No batch for source {source}")
     return {
@@ -647,7 +1531,7 @@ def get_current_batch(source: str = Query(...), db: Session = Depends(get_db)):
         "source": b.source,
         "status": b.status,
         "received_at": b.received_at,
-        "is_current": True if (b.meta_json or {}).get("is_current") else False,
+        "is_current": pointer_ids(db, [source], project_id).get(source) == b.id,
     }
 
 
@@ -681,11 +1565,12 @@ def rebase_links(payload: dict, db: Session = Depends(get_db)):
             raise HTTPException(404, f"No current or recent batch found for {source}")
         to_bid = int(to_b.id)
     else:
-        to_b = db.get(m.WmsBatch, to_bid)
+        to_b = live_batch(db, to_bid)
         if not to_b:
             raise HTTPException(404, f"to_batch_id {to_bid} not found")
         if to_b.source != source:
             raise HTTPException(400, f"to_batch_id {to_bid} is not for source {source}")
+    _check_not_archived(to_b)
 
     # 기존(from) 배치 결정: 릴리즈가 현재 참조 중인 배치를 우선 사용
     if not from_bid:
@@ -698,6 +1583,7 @@ def rebase_links(payload: dict, db: Session = Depends(get_db)):
                 .where(
                     m.StdWmsLink.std_release_id == rid,
                     m.WmsBatch.source == source,
+                    is_live(),
                 )
                 .group_by(m.WmsRow.batch_id)
             )
@@ -708,11 +1594,12 @@ def rebase_links(payload: dict, db: Session = Depends(get_db)):
             raise HTTPException(404, "No existing links for this release/source; nothing to rebase")
         from_bid = int(sorted(used_bids)[-1])
     else:
-        from_b = db.get(m.WmsBatch, from_bid)
+        from_b = live_batch(db, from_bid)
         if not from_b:
             raise HTTPException(404, f"from_batch_id {from_bid} not found")
         if from_b.source != source:
             raise HTTPException(400, f"from_batch_id {from_bid} is not for source {source}")
+        _check_not_archived(from_b)
 
     if int(from_bid) == int(to_bid):
         return {
@@ -727,43 +1614,27 @@ def rebase_links(payload: dict, db: Session = Depends(get_db)):
             "note": "from == to; nothing to do",
         }
 
-    # 1) 새/옛 배치의 code → row_id 매핑 구성
-    def _code_of_payload(payload: dict) -> Optional[str]:
-        if not isinstance(payload, dict):
-            return None
-        code = payload.get("code")
-        if isinstance(code, str):
-            code = code.strip()
-        return code or None
-
-    new_rows = db.execute(
-        select(m.WmsRow.id, m.WmsRow.payload_json)
-        .join(m.WmsBatch, m.WmsBatch.id == m.WmsRow.batch_id)
-        .where(m.WmsRow.batch_id == to_bid, m.WmsBatch.source == source)
-    ).all()
-    new_by_code: dict[str, int] = {}
-    for r in new_rows:
-        c = _code_of_payload(r.payload_json or {})
-        if c:
-            new_by_code.setdefault(c, int(r.id))
-
-    old_rows = db.execute(
-        select(m.WmsRow.id, m.WmsRow.payload_json)
-        .join(m.WmsBatch, m.WmsBatch.id == m.WmsRow.batch_id)
-        .where(m.WmsRow.batch_id == from_bid, m.WmsBatch.source == source)
-    ).all()
-    old_id_to_code: dict[int, str] = {}
-    for r in old_rows:
-        c = _code_of_payload(r.payload_json or {})
-        if c:
-            old_id_to_code[int(r.id)] = c
+    # 1) 새 배치의 code → row_id 매핑 (인덱스 컬럼 wms_row.code, 코드 중복 시 가장 앞 행)
+    new_by_code: dict[str, int] = {
+        c: int(rid_)
+        for c, rid_ in db.execute(
+            select(m.WmsRow.code, func.min(m.WmsRow.id))
+            .join(m.WmsBatch, m.WmsBatch.id == m.WmsRow.batch_id)
+            .where(
+                m.WmsRow.batch_id == to_bid,
+                m.WmsBatch.source == source,
+                m.WmsRow.code.is_not(None),
+            )
+            .group_by(m.WmsRow.code)
+        )
+    }
 
     if not new_by_code:
         raise HTTPException(404, f"No rows with code in to_batch_id={to_bid}")
 
-    # 2) 릴리즈에서 '옛 배치'를 참조 중인 링크들 나열
+    # 2) 릴리즈에서 '옛 배치'를 참조 중인 링크들 나열 (옛 행의 code 포함)
     old_links = db.execute(
-        select(m.StdWmsLink.std_node_uid, m.StdWmsLink.wms_row_id)
+        select(m.StdWmsLink.std_node_uid, m.StdWmsLink.wms_row_id, m.WmsRow.code)
         .join(m.WmsRow, m.WmsRow.id == m.StdWmsLink.wms_row_id)
         .join(m.WmsBatch, m.WmsBatch.id == m.WmsRow.batch_id)
         .where(
@@ -803,8 +1674,7 @@ def rebase_links(payload: dict, db: Session = Depends(get_db)):
     replaced_pairs: list[tuple[str, int]] = []  # (node_uid, old_row_id)
     skipped = 0
 
-    for node_uid, old_row_id in old_links:
-        code = old_id_to_code.get(int(old_row_id))
+    for node_uid, old_row_id, code in old_links:
         if not code:
             skipped += 1
             continue
@@ -826,6 +1696,7 @@ def rebase_links(payload: dict, db: Session = Depends(get_db)):
     deleted = 0
 
     if not dry_run and to_insert:
+        archive.check_linkable(db, [ln.wms_row_id for ln in to_insert])  # 그 사이 보관 시작 → 409
         db.add_all(to_insert)
         db.flush()
         inserted = len(to_insert)
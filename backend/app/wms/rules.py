@@ -0,0 +1,65 @@
+# backend/app/wms/rules.py
+import hashlib
+import json
+import re
+from functools import lru_cache
+from typing import Any, NamedTuple
+
+
+# 검증 규칙 컴파일 (pandas 없음 → API 프로세스에서 미리 검사 가능)
+# 규칙 스펙(WmsValidateRequest.model_dump) → Check 튜플. 같은 스펙은 한 번만 컴파일.
+class Check(NamedTuple):
+    kind: str  # required | type | pattern | min | max | unit | unique
+    field: str
+    arg: Any
+    message: str
+
+
+def canonical(spec: dict) -> str:
+    return json.dumps(spec, sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+
+
+def fingerprint(spec: dict) -> str:
+    return hashlib.sha256(canonical(spec).encode("utf-8")).hexdigest()[:16]
+
+
+def compile_rules(spec: dict) -> tuple[Check, ...]:
+    """잘못된 정규식/범위는 ValueError"""
+    return _compile(canonical(spec))
+
+
+@lru_cache(maxsize=64)
+def _compile(spec_json: str) -> tuple[Check, ...]:
+    spec = json.loads(spec_json)
+    checks: list[Check] = []
+
+    for k in dict.fromkeys(spec.get("required_fields") or []):
+        checks.append(Check("required", k, None, f"Missing/empty field: {k}"))
+
+    for k, rule in (spec.get("fields") or {}).items():
+        rule = rule or {}
+        if rule.get("type"):
+            t = rule["type"]
+            checks.append(Check("type", k, t, f"Invalid type for {k}: expected {t}"))
+        if rule.get("pattern"):
+            try:
+                rx = re.compile(rule["pattern"])
+            except re.error as e:
+                raise ValueError(f"invalid pattern for {k}: {e}")
+            checks.append(Check("pattern", k, rx, f"Pattern mismatch for {k}"))
+        lo, hi = rule.get("min"), rule.get("max")
+        if lo is not None and hi is not None and lo > hi:
+            raise ValueError(f"invalid range for {k}: min > max")
+        if lo is not None:
+            checks.append(Check("min", k, float(lo), f"{k} below minimum {lo:g}"))
+        if hi is not None:
+            checks.append(Check("max", k, float(hi), f"{k} above maximum {hi:g}"))
+
+    if spec.get("allowed_units") is not None:
+        allowed = frozenset(str(u).strip() for u in spec["allowed_units"])
+        checks.append(Check("unit", "unit", allowed, "Unit not allowed"))
+
+    if spec.get("unique_code"):
+        checks.append(Check("unique", "code", None, "Duplicate code in batch"))
+
+    return tuple(checks)
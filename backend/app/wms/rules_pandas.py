@@ -0,0 +1,160 @@
+# backend/app/wms/rules_pandas.py
+# pandas/NumPy 기반 규칙 평가. API 프로세스에서는 import 하지 않고
+# parse_pool의 워커 프로세스에서만 로드됩니다.
+import numpy as np
+import pandas as pd
+from sqlalchemy import null, select, update
+from ..shared.config import settings
+from ..shared.db import SessionLocal
+from . import counters
+from . import models as m
+from .excel_pandas import _str_mask
+from .rules import Check, compile_rules, fingerprint
+from .validation import _field, _is_pg, stale_clause, stale_stats
+
+
+class _Column:
+    """필드 하나에 대한 파생 시리즈를 필요할 때 한 번만 계산"""
+
+    def __init__(self, s: pd.Series):
+        self.s = s
+        is_str = _str_mask(s, s.isna().to_numpy())
+        stripped = pd.Series(np.nan, index=s.index, dtype=object)  # 문자열이 아닌 값은 NaN
+        if is_str.any():
+            stripped[is_str] = s[is_str].str.strip()
+        self.is_str = pd.Series(is_str, index=s.index)
+        self.present = s.notna() & ~stripped.eq("")
+        self._stripped = stripped
+        self._num = None
+        self._text = None
+
+    @property
+    def num(self) -> pd.Series:
+        if self._num is None:
+            self._num = pd.to_numeric(self.s.where(~self.s.map(type).eq(bool)), errors="coerce")
+        return self._num
+
+    @property
+    def text(self) -> pd.Series:
+        """비교용 문자열 (문자열은 strip, 그 외 값은 str())"""
+        if self._text is None:
+            self._text = self._stripped.where(self.is_str, self.s.astype(str))
+        return self._text
+
+
+def _mask(c: Check, col: _Column) -> np.ndarray:
+    """위반 행 = True"""
+    if c.kind == "required":
+        return ~col.present.to_numpy()
+
+    p = col.present
+    if c.kind == "type":
+        if c.arg == "string":
+            bad = ~col.is_str
+        elif c.arg == "number":
+            bad = col.num.isna()
+        else:  # integer
+            bad = col.num.isna() | col.num.mod(1).ne(0)
+    elif c.kind == "pattern":
+        bad = ~col.text.str.fullmatch(c.arg).fillna(False).astype(bool)
+    elif c.kind == "min":
+        bad = col.num.lt(c.arg)
+    elif c.kind == "max":
+        bad = col.num.gt(c.arg)
+    elif c.kind == "unit":
+        bad = ~col.text.isin(c.arg)
+    elif c.kind == "unique":
+        bad = col.text.where(p).duplicated(keep=False)
+    else:
+        raise ValueError(f"unknown rule: {c.kind}")
+    return (p & bad).to_numpy()
+
+
+def _select_field(db, key: str):
+    if _is_pg(db):
+        return m.WmsRow.payload_json[key]  # -> : 드라이버가 JSON 디코드 (타입 유지)
+    return _field(db, key)  # json_extract: SQLite 스칼라를 그대로 받음 (행별 json.loads 없음)
+
+
+def evaluate(
+    checks: tuple[Check, ...], frame: pd.DataFrame
+) -> list[tuple[list[str], np.ndarray]]:
+    """
+    반환: [(메시지 목록, 행 위치 배열), ...]
+    위반 조합(비트마스크)별로 행을 묶음 → 행마다 파이썬 루프를 돌지 않음
+    """
+    if not checks or frame.empty:
+        return []
+    cols = {k: _Column(frame[k]) for k in frame.columns}
+    hits = np.column_stack([_mask(c, cols[c.field]) for c in checks])
+    weights = np.left_shift(1, np.arange(len(checks), dtype=np.int64))
+    codes = hits.astype(np.int64) @ weights
+    bad = np.flatnonzero(codes)
+    if not bad.size:
+        return []
+    order = bad[np.argsort(codes[bad], kind="stable")]
+    uniq, starts = np.unique(codes[order], return_index=True)
+    groups = np.split(order, starts[1:])
+    return [
+        ([c.message for j, c in enumerate(checks) if code >> j & 1], rows)
+        for code, rows in zip(uniq.tolist(), groups)
+    ]
+
+
+def validate_batch_rows(batch_id: int, spec: dict, force: bool = False) -> dict:
+    """
+    워커 프로세스에서 실행: 재검증 대상 행을 읽어 규칙 평가 → errors_json 일괄 기록,
+    배치 카운터 반영 후 커밋.
+    반환: stale_stats + {"errors": 대상 행 중 새 error 수}
+    """
+    checks = compile_rules(spec)
+    fields = list(dict.fromkeys(c.field for c in checks))
+    fp = fingerprint(spec)
+
+    db = SessionLocal()
+    try:
+        where = stale_clause(batch_id, fp, force)
+        if not force and any(c.kind == "unique" for c in checks):
+            # 코드 중복은 배치 전체에 걸친 규칙 → 바뀐 행이 하나라도 있으면 전체 재평가
+            if db.execute(select(m.WmsRow.id).where(where).limit(1)).first():
+                where = stale_clause(batch_id, fp, force=True)
+        stats = stale_stats(db, where)
+        if not stats["checked"]:
+            return {**stats, "errors": 0}
+
+        # 규칙에 쓰이는 필드만 SQL에서 추출 (_raw 등 큰 payload 전체를 디코드하지 않음)
+        rows = db.execute(
+            select(m.WmsRow.id, *(_select_field(db, k) for k in fields))
+            .where(where)
+            .order_by(m.WmsRow.id)
+        ).all()
+        ids = np.fromiter((r[0] for r in rows), dtype=np.int64, count=len(rows))
+        frame = pd.DataFrame([r[1:] for r in rows], columns=fields, dtype=object)
+        del rows
+        groups = evaluate(checks, frame)
+
+        # 대상 행을 ok 로 초기화(검증 표시 포함) 후, 위반 조합별로 id IN (...) 청크 UPDATE
+        t = m.WmsRow.__table__
+        conn = db.connection()
+        conn.execute(
+            update(t)
+            .where(where)
+            .values(
+                status="ok", errors_json=null(), rules_fp=fp, validated_hash=t.c.payload_hash
+            )
+        )
+        size = max(settings.WMS_INGEST_CHUNK_SIZE, 1)
+        n_errors = 0
+        for msgs, pos in groups:
+            n_errors += len(pos)
+            stmt = update(t).values(status="error", errors_json={"messages": msgs})
+            for s in range(0, len(pos), size):
+                conn.execute(stmt.where(t.c.id.in_(ids[pos[s : s + size]].tolist())))
+        counters.apply_validation(db, batch_id, stats, n_errors)
+        db.commit()
+        return {**stats, "errors": n_errors}
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
@@ -1,5 +1,5 @@
 from __future__ import annotations
-from typing import Any, Optional, List
+from typing import Any, Literal, Optional, List
 from pydantic import BaseModel, Field, ConfigDict
 
 
@@ -30,8 +30,28 @@ class WmsRowOut(BaseModel):
     errors_json: Optional[dict] = None
 
 
+class WmsFieldRule(BaseModel):
+    type: Optional[Literal["string", "number", "integer"]] = None
+    pattern: Optional[str] = None  # 전체 일치(fullmatch) 정규식
+    min: Optional[float] = None
+    max: Optional[float] = None
+
+
 class WmsValidateRequest(BaseModel):
     required_fields: List[str] = Field(default_factory=list)
+    # ✅ 규칙 엔진 (하나라도 지정되면 파싱 프로세스 풀에서 열 단위로 평가)
+    fields: dict[str, WmsFieldRule] = Field(default_factory=dict)
+    allowed_units: Optional[List[str]] = None
+    unique_code: bool = False
+    # 기본은 증분(규칙/payload가 바뀐 행만), True면 배치 전체 재검증
+    force: bool = False
+
+    def has_rules(self) -> bool:
+        return bool(self.fields) or self.allowed_units is not None or self.unique_code
+
+
+class WmsValidateManyRequest(WmsValidateRequest):
+    batch_ids: List[int] = Field(min_length=1)
 
 
 class WmsLinkedItemOut(BaseModel):
@@ -41,5 +61,12 @@ class WmsLinkedItemOut(BaseModel):
     name: Optional[str] = None
     unit: Optional[str] = None
     qty: Optional[Any] = None
+    batch_id: Optional[int] = None  # fields= 로 요청한 경우만
+    group_code: Optional[str] = None  # fields= 로 요청한 경우만
     # JSON 키는 "_raw"로 내보내되, 내부 필드명은 raw로 관리
     raw: Optional[dict[str, Any]] = Field(default=None, alias="_raw")
+
+
+class WmsUploadSessionCreate(BaseModel):
+    filename: Optional[str] = None
+    total_chunks: Optional[int] = Field(default=None, ge=1)
@@ -0,0 +1,127 @@
+# backend/app/wms/search.py
+from fastapi import HTTPException
+from sqlalchemy import Engine, bindparam, column, func, inspect, select, table, text
+from sqlalchemy.orm import Session
+from . import models as m
+
+
+# /items search= 용 전문 검색 인덱스 (마이그레이션 9a2f61c3e8d4 → b7c1e4a9d352 에서 payload 단위로)
+#   - SQLite: FTS5 trigram 가상 테이블 wms_payload_fts(rowid = wms_payload.id, body)
+#   - Postgres: wms_payload_search(payload_id, body) + pg_trgm GIN 인덱스
+# body = code / name / _raw 값들을 char(31)로 이어붙인 문자열 → 대소문자 무시 부분일치
+# 본문은 payload 에서만 나오므로 같은 내용의 행(재업로드)은 색인도 공유 → 새 payload 만 색인
+# 신규 payload 는 payloads.store 가 청크마다 index_payloads 로 일괄 색인, 삭제는 트리거/FK CASCADE
+_fts = table("wms_payload_fts", column("rowid"), column("body"))
+_pg = table("wms_payload_search", column("payload_id"), column("body"))
+
+
+# 마이그레이션의 _sqlite_body('wms_payload') 와 동일
+_SQLITE_BODY = (
+    "coalesce(json_extract(wms_payload.payload_json, '$.code'), '') || char(31) || "
+    "coalesce(json_extract(wms_payload.payload_json, '$.name'), '') || char(31) || "
+    "coalesce((SELECT group_concat(value, char(31)) "
+    "FROM json_each(wms_payload.payload_json, '$._raw') WHERE value IS NOT NULL), '')"
+)
+_SQLITE_INDEX = text(
+    f"INSERT INTO wms_payload_fts(rowid, body) SELECT wms_payload.id, {_SQLITE_BODY} "
+    "FROM wms_payload WHERE wms_payload.hash IN :hashes"
+).bindparams(bindparam("hashes", expanding=True))
+_PG_INDEX = text(
+    "INSERT INTO wms_payload_search(payload_id, body) "
+    "SELECT id, wms_row_search_body(payload_json) FROM wms_payload WHERE hash IN :hashes "
+    "ON CONFLICT (payload_id) DO NOTHING"
+).bindparams(bindparam("hashes", expanding=True))
+_has_index_cache: dict[str, bool] = {}
+
+# create_all 로 만든 DB(테스트, 새 개발 DB)용 — 마이그레이션 b7c1e4a9d352 이후와 같은 구조
+_SQLITE_CREATE = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS wms_payload_fts USING fts5(body, tokenize='trigram')",
+    """
+    CREATE TRIGGER IF NOT EXISTS wms_payload_fts_ad AFTER DELETE ON wms_payload BEGIN
+      DELETE FROM wms_payload_fts WHERE rowid = OLD.id;
+    END
+    """,
+]
+_PG_CREATE = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    """
+    CREATE OR REPLACE FUNCTION wms_row_search_body(p json) RETURNS text
+    LANGUAGE sql IMMUTABLE AS $$
+      SELECT concat_ws(chr(31),
+        coalesce(p->>'code', ''),
+        coalesce(p->>'name', ''),
+        (SELECT string_agg(value, chr(31)) FROM json_each_text(
+           CASE WHEN json_typeof(p->'_raw') = 'object' THEN p->'_raw' END)))
+    $$
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS wms_payload_search (
+      payload_id integer PRIMARY KEY REFERENCES wms_payload(id) ON DELETE CASCADE,
+      body text NOT NULL
+    )
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS ix_wms_payload_search_trgm
+      ON wms_payload_search USING gin (body gin_trgm_ops)
+    """,
+]
+
+
+def create_index(engine: Engine) -> None:
+    """
+    검색 인덱스 테이블/트리거 생성 (이미 있으면 그대로).
+    운영 DB 는 마이그레이션으로 만들고, 이 함수는 Base.metadata.create_all 로 만든 빈 DB 용.
+    """
+    stmts = _PG_CREATE if engine.dialect.name == "postgresql" else _SQLITE_CREATE
+    with engine.begin() as conn:
+        for sql in stmts:
+            conn.exec_driver_sql(sql)
+    _has_index_cache.pop(str(engine.url), None)
+
+
+def has_index(db: Session) -> bool:
+    """검색 인덱스 테이블 존재 여부 (엔진별 1회 확인)"""
+    bind = db.get_bind()
+    key = str(bind.url)
+    if key not in _has_index_cache:
+        name = "wms_payload_search" if bind.dialect.name == "postgresql" else "wms_payload_fts"
+        _has_index_cache[key] = name in inspect(db.connection()).get_table_names()
+    return _has_index_cache[key]
+
+
+def index_payloads(db: Session, hashes: list[str]) -> None:
+    """새로 저장한 payload 들을 한 문장으로 색인 (payloads.store 와 같은 트랜잭션)"""
+    if not hashes or not has_index(db):
+        return
+    stmt = _PG_INDEX if db.get_bind().dialect.name == "postgresql" else _SQLITE_INDEX
+    db.execute(stmt, {"hashes": hashes})
+
+
+def _like_escape(s: str) -> str:
+    return s.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def search_clause(db: Session, search: str):
+    """WmsRow 에 거는 WHERE 절 (검색어 부분일치 payload 를 참조하는 행만)"""
+    if not has_index(db):
+        raise HTTPException(503, "search index is not available; run alembic upgrade")
+    if db.get_bind().dialect.name == "postgresql":
+        pat = f"%{_like_escape(search)}%"
+        sub = select(_pg.c.payload_id).where(_pg.c.body.ilike(pat, escape="\\"))
+        return _rows_with(sub)
+
+    if len(search) >= 3:
+        # trigram 구문(phrase) 검색 = 부분 문자열 일치, 인덱스 사용
+        phrase = '"' + search.replace('"', '""') + '"'
+        sub = select(_fts.c.rowid).where(text("wms_payload_fts MATCH :q").bindparams(q=phrase))
+    else:
+        # 3글자 미만은 trigram으로 찾을 수 없음 → 검색 본문만 스캔 (payload JSON 디코드 없음)
+        sub = select(_fts.c.rowid).where(func.instr(func.lower(_fts.c.body), search.lower()) > 0)
+    return _rows_with(sub)
+
+
+def _rows_with(payload_ids):
+    """payload id 서브쿼리 → 해시 → 행 (ix_wms_row_payload_hash)"""
+    return m.WmsRow.payload_hash.in_(
+        select(m.WmsPayload.hash).where(m.WmsPayload.id.in_(payload_ids))
+    )
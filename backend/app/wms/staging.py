@@ -0,0 +1,177 @@
+# backend/app/wms/staging.py
+import hashlib
+import json
+import os
+import re
+import shutil
+import time
+import uuid
+from pathlib import Path
+from typing import IO
+from ..shared.config import BASE_DIR, settings
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - 선택 의존성
+    orjson = None
+
+
+# dry-run 정규화 결과 보관소: _data/staging/<token>/ (디스크 → 워커 프로세스 여러 개가 공유)
+#   meta.json   token, raw_columns, content_sha256, sheet, filename, rows, created_at, expires_at
+#   items.json  정규화 item 목록
+#  - TTL 만료 + 전체 행 수 상한(마지막 사용이 오래된 것부터 축출, meta.json mtime 기준)
+#  - 같은 (content_sha256, sheet) 는 1개만 유지
+#  - pop 은 디렉터리 rename 으로 가져감 → 동시에 commit 해도 한 요청만 성공
+STAGING_DIR = BASE_DIR / "_data" / "staging"
+_TOKEN_RE = re.compile(r"^[0-9a-f]{32}$")
+
+
+def content_hash(fileobj: IO[bytes]) -> str:
+    """업로드 파일의 sha256 (청크 단위로 읽고 원위치로 되돌림)"""
+    h = hashlib.sha256()
+    fileobj.seek(0)
+    for chunk in iter(lambda: fileobj.read(1024 * 1024), b""):
+        h.update(chunk)
+    fileobj.seek(0)
+    return h.hexdigest()
+
+
+def _dumps(obj) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, ensure_ascii=False).encode("utf-8")
+
+
+def _loads(data: bytes):
+    return orjson.loads(data) if orjson is not None else json.loads(data)
+
+
+def _read_meta(d: Path) -> dict | None:
+    try:
+        return _loads((d / "meta.json").read_bytes())
+    except (OSError, ValueError):
+        return None
+
+
+def _scan(now: float) -> list[tuple[Path, dict, float]]:
+    """유효 항목 (경로, meta, 마지막 사용 시각). 만료/깨진 항목은 삭제"""
+    if not STAGING_DIR.exists():
+        return []
+    out = []
+    for d in STAGING_DIR.iterdir():
+        if not _TOKEN_RE.match(d.name):  # 작성 중(.tmp) / pop 중 → 중단돼 남은 것만 정리
+            try:
+                if now - d.stat().st_mtime > settings.WMS_STAGING_TTL_SEC:
+                    shutil.rmtree(d, ignore_errors=True)
+            except OSError:
+                pass
+            continue
+        meta = _read_meta(d)
+        if meta is None or meta["expires_at"] <= now:
+            shutil.rmtree(d, ignore_errors=True)
+            continue
+        try:
+            used = (d / "meta.json").stat().st_mtime
+        except OSError:
+            continue
+        out.append((d, meta, used))
+    return out
+
+
+def _evict(now: float) -> None:
+    """만료 항목 제거 후, 행 수 상한을 넘으면 오래된 것부터 제거"""
+    entries = sorted(_scan(now), key=lambda x: x[2])
+    total = sum(meta["rows"] for _, meta, _ in entries)
+    for d, meta, _ in entries:
+        if total <= settings.WMS_STAGING_MAX_ROWS:
+            break
+        shutil.rmtree(d, ignore_errors=True)
+        total -= meta["rows"]
+
+
+def _load(d: Path, meta: dict) -> dict | None:
+    try:
+        items = _loads((d / "items.json").read_bytes())
+        os.utime(d / "meta.json")  # 최근 사용 (축출 순서)
+    except (OSError, ValueError):
+        return None
+    return {**meta, "items": items}
+
+
+def put(
+    items: list[dict],
+    raw_columns: list[str],
+    *,
+    content_sha256: str,
+    sheet: str | None,
+    filename: str | None,
+) -> dict | None:
+    """정규화 결과를 보관하고 entry 반환. 단일 결과가 상한을 넘으면 보관하지 않음(None)."""
+    if len(items) > settings.WMS_STAGING_MAX_ROWS:
+        return None
+    now = time.time()
+    meta = {
+        "token": uuid.uuid4().hex,
+        "raw_columns": raw_columns,
+        "content_sha256": content_sha256,
+        "sheet": sheet,
+        "filename": filename,
+        "rows": len(items),
+        "created_at": now,
+        "expires_at": now + settings.WMS_STAGING_TTL_SEC,
+    }
+    STAGING_DIR.mkdir(parents=True, exist_ok=True)
+    tmp = STAGING_DIR / f"{meta['token']}.tmp"
+    tmp.mkdir()
+    try:
+        (tmp / "items.json").write_bytes(_dumps(items))
+        (tmp / "meta.json").write_bytes(_dumps(meta))
+        for d, old, _ in _scan(now):
+            if (old["content_sha256"], old["sheet"] or "") == (content_sha256, sheet or ""):
+                shutil.rmtree(d, ignore_errors=True)
+        os.replace(tmp, STAGING_DIR / meta["token"])
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+    _evict(now)
+    return {**meta, "items": items}
+
+
+def get(token: str) -> dict | None:
+    if not _TOKEN_RE.match(token or ""):
+        return None
+    d = STAGING_DIR / token
+    meta = _read_meta(d)
+    if meta is None or meta["expires_at"] <= time.time():
+        return None
+    return _load(d, meta)
+
+
+def find(content_sha256: str, sheet: str | None) -> dict | None:
+    """동일 파일 내용(+시트)의 보관 결과"""
+    for d, meta, _ in _scan(time.time()):
+        if (meta["content_sha256"], meta["sheet"] or "") == (content_sha256, sheet or ""):
+            return _load(d, meta)
+    return None
+
+
+def pop(token: str) -> dict | None:
+    if not _TOKEN_RE.match(token or ""):
+        return None
+    taken = STAGING_DIR / f"{token}.{uuid.uuid4().hex}.pop"
+    try:
+        os.replace(STAGING_DIR / token, taken)  # 먼저 rename 한 요청만 성공
+    except OSError:
+        return None
+    try:
+        meta = _read_meta(taken)
+        if meta is None or meta["expires_at"] <= time.time():
+            return None
+        return _load(taken, meta)
+    finally:
+        shutil.rmtree(taken, ignore_errors=True)
+
+
+def discard(token: str) -> None:
+    """보관 결과 삭제 (이미 읽은 항목을 적재할 때)"""
+    if _TOKEN_RE.match(token or ""):
+        shutil.rmtree(STAGING_DIR / token, ignore_errors=True)
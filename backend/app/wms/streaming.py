@@ -0,0 +1,123 @@
+# backend/app/wms/streaming.py
+import io
+import json
+from itertools import islice
+from typing import Callable, Iterator
+from fastapi import HTTPException
+from fastapi.responses import StreamingResponse
+from ..shared.config import settings
+from ..shared.db import SessionLocal
+
+
+# 전체 배치 조회용 스트리밍 응답 (stream=ndjson | arrow)
+#   서버측 커서(yield_per)로 청크씩 읽어 바로 써 보냄 → 메모리는 배치 크기가 아니라 청크 크기에 비례
+#   - ndjson: 한 줄 = shape=rows 응답의 행 객체 1개
+#   - arrow : Arrow IPC 스트림, 청크마다 레코드 배치 1개
+#             id 류는 int64, qty 는 float64, dict 값(_raw/payload_json/errors_json)은 JSON 문자열
+STREAM_FORMATS = ("ndjson", "arrow")
+MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "arrow": "application/vnd.apache.arrow.stream",
+}
+_INT_KEYS = frozenset({"id", "row_id", "batch_id", "row_index"})
+_FLOAT_KEYS = frozenset({"qty"})
+_JSON_KEYS = frozenset({"_raw", "payload_json", "errors_json"})
+
+
+def check_format(fmt: str) -> None:
+    if fmt not in STREAM_FORMATS:
+        raise HTTPException(400, "stream must be 'ndjson' or 'arrow'")
+    if fmt == "arrow":
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            raise HTTPException(501, "pyarrow is required for stream=arrow")
+
+
+def _dumps(v) -> str:
+    return json.dumps(v, ensure_ascii=False, separators=(",", ":"))
+
+
+def _iter_chunks(stmt, out: Callable, chunk: int) -> Iterator[list[dict]]:
+    """요청 세션과 별개의 세션으로 읽음 (응답 본문은 엔드포인트 반환 뒤에 생성됨)"""
+    db = SessionLocal()
+    try:
+        result = db.execute(stmt, execution_options={"yield_per": chunk})
+        for part in result.partitions():
+            yield [out(r) for r in part]
+    finally:
+        db.close()
+
+
+def _ndjson(chunks: Iterator[list[dict]]) -> Iterator[bytes]:
+    for items in chunks:
+        yield "".join(_dumps(d) + "\n" for d in items).encode("utf-8")
+
+
+def _arrow_type(pa, key: str):
+    if key in _INT_KEYS:
+        return pa.int64()
+    if key in _FLOAT_KEYS:
+        return pa.float64()
+    return pa.string()
+
+
+def _arrow(chunks: Iterator[list[dict]]) -> Iterator[bytes]:
+    import pyarrow as pa
+
+    sink = io.BytesIO()
+    writer = schema = None
+    for items in chunks:
+        if not items:
+            continue
+        if schema is None:
+            # 열 구성은 엔드포인트/fields= 로 고정 → 첫 청크의 키로 스키마 결정
+            schema = pa.schema([(k, _arrow_type(pa, k)) for k in items[0]])
+            writer = pa.ipc.new_stream(sink, schema)
+        arrays = []
+        for f in schema:
+            vals = [d.get(f.name) for d in items]
+            if f.name in _JSON_KEYS:
+                vals = [None if v is None else _dumps(v) for v in vals]
+            arrays.append(pa.array(vals, type=f.type))
+        writer.write_batch(pa.record_batch(arrays, schema=schema))
+        yield _drain(sink)
+    if writer is None:
+        # 행이 없어도 읽을 수 있는 빈 스트림 (스키마만)
+        writer = pa.ipc.new_stream(sink, pa.schema([]))
+    writer.close()
+    yield _drain(sink)
+
+
+def _drain(sink: io.BytesIO) -> bytes:
+    data = sink.getvalue()
+    sink.seek(0)
+    sink.truncate()
+    return data
+
+
+def _rechunk(items: Iterator[dict], size: int) -> Iterator[list[dict]]:
+    it = iter(items)
+    while chunk := list(islice(it, size)):
+        yield chunk
+
+
+def iter_query(stmt, out: Callable) -> Iterator[dict]:
+    """stmt 결과 행을 하나씩 (서버측 커서) → 다른 행 스트림과 병합할 때 사용"""
+    for part in _iter_chunks(stmt, out, max(settings.WMS_STREAM_CHUNK_SIZE, 1)):
+        yield from part
+
+
+def _respond(chunks: Iterator[list[dict]], fmt: str, headers: dict | None) -> StreamingResponse:
+    body = _arrow(chunks) if fmt == "arrow" else _ndjson(chunks)
+    return StreamingResponse(body, media_type=MEDIA_TYPES[fmt], headers=headers)
+
+
+def stream_response(stmt, out: Callable, fmt: str, headers: dict | None = None) -> StreamingResponse:
+    """stmt 결과를 out(row) → dict 로 바꿔 fmt 형식으로 스트리밍"""
+    return _respond(_iter_chunks(stmt, out, max(settings.WMS_STREAM_CHUNK_SIZE, 1)), fmt, headers)
+
+
+def stream_items(items: Iterator[dict], fmt: str, headers: dict | None = None) -> StreamingResponse:
+    """이미 응답 형태인 행 dict 이터레이터를 청크로 묶어 스트리밍 (보관 배치 Parquet 등)"""
+    return _respond(_rechunk(items, max(settings.WMS_STREAM_CHUNK_SIZE, 1)), fmt, headers)
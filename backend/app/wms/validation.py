@@ -0,0 +1,148 @@
+# backend/app/wms/validation.py
+import json
+from sqlalchemy import and_, case, cast, func, literal, not_, null, or_, select, update
+from sqlalchemy.dialects.postgresql import JSON as PG_JSON
+from sqlalchemy.orm import Session
+from . import counters
+from . import models as m
+
+
+# 배치 검증을 DB 안에서 집합 단위 UPDATE로 수행 (행을 파이썬으로 가져오지 않음)
+#   - 증분: 행마다 검증 당시 규칙 fingerprint(rules_fp)와 payload_hash(validated_hash)를 기록,
+#     둘 중 하나라도 달라진 행만 다시 검사
+#   - 필드 추출: SQLite json_extract / Postgres ->>  (SQLAlchemy JSON.as_string())
+#   - 빈값 판정: NULL 또는 공백뿐인 문자열. trim 문자 집합 = str.isspace() 전체 (최대 U+3000)
+#     → 적재 시 str.strip() 한 컬럼, 드라이런(rules_pandas)과 같은 판정 (전각 공백, NBSP 포함)
+_WS = "".join(c for c in map(chr, range(0x3001)) if c.isspace())
+
+
+def _is_pg(db: Session) -> bool:
+    return db.get_bind().dialect.name == "postgresql"
+
+
+def _field(db: Session, key: str):
+    if '"' in key and not _is_pg(db):
+        # SQLite JSON 경로는 키 안의 따옴표를 표현할 수 없음 → json_each 로 키 비교
+        je = func.json_each(m.WmsRow.payload_json).table_valued("key", "value")
+        return select(je.c.value).where(je.c.key == key).scalar_subquery()
+    return m.WmsRow.payload_json[key].as_string()
+
+
+# 적재 시 strip 후 빈값이면 NULL 로 추출되는 문자열 컬럼 → JSON 대신 컬럼으로 판정
+_TEXT_COLUMNS = {
+    "code": m.WmsRow.code,
+    "name": m.WmsRow.name,
+    "unit": m.WmsRow.unit,
+    "group_code": m.WmsRow.group_code,
+}
+
+
+def _missing(db: Session, key: str):
+    if key in _TEXT_COLUMNS:
+        return _TEXT_COLUMNS[key].is_(None)
+    v = _field(db, key)
+    trimmed = func.btrim(v, _WS) if _is_pg(db) else func.trim(v, _WS)
+    return or_(v.is_(None), trimmed == "")
+
+
+def _errors_doc(db: Session, fields: list[str], missing: list):
+    """
+    누락 필드 메시지를 SQL 문자열 연결로 조립 → {"messages": [...]}
+    메시지는 파이썬에서 JSON 인코딩해 바인드 (키에 따옴표가 있어도 안전)
+    """
+    parts = None
+    for k, cond in zip(fields, missing):
+        msg = "," + json.dumps(f"Missing/empty field: {k}", ensure_ascii=False)
+        piece = case((cond, literal(msg)), else_=literal(""))
+        parts = piece if parts is None else parts.concat(piece)
+    doc = literal('{"messages":[').concat(func.substr(parts, 2)).concat(literal("]}"))
+    return cast(doc, PG_JSON) if _is_pg(db) else func.json(doc)
+
+
+def stale_clause(batch_id: int, fp: str, force: bool = False):
+    """
+    재검증 대상 행: 규칙 fingerprint가 다르거나, 마지막 검증 이후 payload_hash가 바뀐 행
+    force=True 면 배치 전체
+    """
+    in_batch = m.WmsRow.batch_id == batch_id
+    if force:
+        return in_batch
+    return and_(
+        in_batch,
+        or_(
+            m.WmsRow.rules_fp.is_(None),
+            m.WmsRow.rules_fp != fp,
+            m.WmsRow.validated_hash.is_(None),
+            m.WmsRow.payload_hash.is_(None),
+            m.WmsRow.validated_hash != m.WmsRow.payload_hash,
+        ),
+    )
+
+
+def stale_stats(db: Session, where) -> dict:
+    """
+    갱신 전 대상 행 집계 (배치 카운터 증분 갱신용)
+      checked: 대상 행 수 / fresh: 한 번도 검증되지 않은 행 / prev_errors: 기존 error 행
+    """
+    checked, fresh, prev_errors = db.execute(
+        select(
+            func.count(),
+            func.coalesce(func.sum(case((m.WmsRow.rules_fp.is_(None), 1), else_=0)), 0),
+            func.coalesce(
+                func.sum(
+                    case(
+                        (and_(m.WmsRow.rules_fp.is_not(None), m.WmsRow.status == "error"), 1),
+                        else_=0,
+                    )
+                ),
+                0,
+            ),
+        ).where(where)
+    ).one()
+    return {"checked": checked, "fresh": fresh, "prev_errors": prev_errors}
+
+
+def validate_required(
+    db: Session, batch_id: int, required_fields: list[str], fp: str, force: bool = False
+) -> dict:
+    """
+    required_fields 검사 결과로 wms_row.status / errors_json 갱신 (재검증 대상 행만).
+    UPDATE 두 번(error, ok)으로 끝나며 파이썬으로는 건수만 돌아옴.
+    배치 카운터(ok_rows/error_rows)도 같은 트랜잭션에서 반영. 커밋은 호출 측.
+    반환: stale_stats + {"errors": 대상 행 중 새 error 수}
+    """
+    fields = list(dict.fromkeys(required_fields))  # 중복 제거(순서 유지)
+    where = stale_clause(batch_id, fp, force)
+    stats = stale_stats(db, where)
+    if not stats["checked"]:
+        return {**stats, "errors": 0}
+    mark = {"rules_fp": fp, "validated_hash": m.WmsRow.payload_hash}
+
+    if not fields:
+        db.execute(
+            update(m.WmsRow)
+            .where(where)
+            .values(status="ok", errors_json=null(), **mark)
+            .execution_options(synchronize_session=False)
+        )
+        counters.apply_validation(db, batch_id, stats, 0)
+        return {**stats, "errors": 0}
+
+    missing = [_missing(db, k) for k in fields]
+    any_missing = or_(*missing)
+
+    # error 행을 먼저 표시 → 두 번째 UPDATE의 대상(where)에서 자연히 빠짐
+    err = db.execute(
+        update(m.WmsRow)
+        .where(where, any_missing)
+        .values(status="error", errors_json=_errors_doc(db, fields, missing), **mark)
+        .execution_options(synchronize_session=False)
+    )
+    db.execute(
+        update(m.WmsRow)
+        .where(where, not_(any_missing))
+        .values(status="ok", errors_json=null(), **mark)
+        .execution_options(synchronize_session=False)
+    )
+    counters.apply_validation(db, batch_id, stats, err.rowcount)
+    return {**stats, "errors": err.rowcount}
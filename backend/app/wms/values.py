@@ -0,0 +1,21 @@
+# backend/app/wms/values.py
+import math
+import numbers
+from datetime import datetime
+
+
+# 파서(excel / columnar)와 적재(ingest)가 함께 쓰는 값 변환
+def to_number(v) -> float | None:
+    """pd.to_numeric(errors='coerce') 대응 + NaN/±inf 는 None ("nan", "inf" 문자열 포함)"""
+    if v is None or isinstance(v, datetime):
+        return None
+    if isinstance(v, numbers.Number):
+        x = float(v)
+    elif isinstance(v, str):
+        try:
+            x = float(v.strip())
+        except ValueError:
+            return None
+    else:
+        return None
+    return x if math.isfinite(x) else None
@@ -0,0 +1,147 @@
+# backend/scripts/bench_normalize.py
+"""
+Work Master 정규화 벤치마크: 행 단위(clean_scalar 루프) vs 열 단위(_normalize_raw_frame)
+
+사용:
+    cd backend
+    python scripts/bench_normalize.py                       # 합성 시트 (50,000행 x 40열)
+    python scripts/bench_normalize.py --rows 20000 --cols 60
+    python scripts/bench_normalize.py ../samples/AR.xlsx     # 실제 엑셀 (정규화 단계만 측정)
+"""
+
+import argparse
+from datetime import datetime
+import pathlib
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[1]))
+
+from app.wms.excel import _dedup_columns, _field_indexes, _flatten_header  # noqa: E402
+from app.wms.excel_pandas import _clean_scalar, _normalize_raw_frame  # noqa: E402
+
+
+def normalize_rowwise(raw: pd.DataFrame):
+    """기존 구현 (df.loc[i] + row.iloc[j] + clean_scalar) — 비교 기준"""
+    h1_candidates = raw.index[raw.iloc[:, 0].astype(str).str.contains("Discipline", na=False)]
+    h1 = int(h1_candidates.min()) if len(h1_candidates) else 0
+    h2 = h1 + 1
+    top = raw.iloc[h1].fillna("").astype(str).tolist()
+    sub = raw.iloc[h2].fillna("").astype(str).tolist()
+    cols_flat = _flatten_header(top, sub)
+
+    df = raw.iloc[h2 + 1 :].copy()
+    df = df.dropna(how="all").reset_index(drop=True)
+    raw_columns = _dedup_columns(cols_flat)
+    df.columns = raw_columns
+    idx = _field_indexes(cols_flat)
+
+    def series_by_idx(i):
+        if i is None:
+            return pd.Series([None] * len(df), index=df.index)
+        return df.iloc[:, i]
+
+    norm = pd.DataFrame(
+        {
+            "code": series_by_idx(idx["code"]),
+            "name": series_by_idx(idx["name"]),
+            "qty": pd.to_numeric(series_by_idx(idx["qty"]), errors="coerce"),
+            "unit": series_by_idx(idx["unit"]),
+            "group_code": series_by_idx(idx["group_code"]),
+        },
+        index=df.index,
+    )
+    mask_header = norm["name"].astype(str).str.strip().str.lower().eq("description")
+
+    items = []
+    for i in norm.index[~mask_header]:
+        row = df.loc[i]
+        raw_map = {c: _clean_scalar(row.iloc[j]) for j, c in enumerate(raw_columns)}
+        items.append(
+            {
+                "code": _clean_scalar(norm.at[i, "code"]) or "",
+                "name": _clean_scalar(norm.at[i, "name"]),
+                "qty": _clean_scalar(norm.at[i, "qty"]),
+                "unit": _clean_scalar(norm.at[i, "unit"]),
+                "group_code": _clean_scalar(norm.at[i, "group_code"]),
+                "_raw": raw_map,
+            }
+        )
+    return items, raw_columns
+
+
+def synthetic_raw(rows: int, cols: int, seed: int = 0) -> pd.DataFrame:
+    """read_excel(header=None) 형태의 합성 시트 (헤더 2행 + 혼합 타입 본문, 숫자/날짜/불리언이 섞인 열 포함)"""
+    rng = np.random.default_rng(seed)
+    named = ["Discipline", "Work Master Code", "Category(Middle) Description", "Qty", "UoM1",
+             "Work Group Code"]  # fmt: skip
+    top = (named + [f"Attr {k}" for k in range(cols)])[:cols]
+    sub = ["" if k % 3 else "Sub" for k in range(cols)]
+
+    data = {}
+    for k in range(cols):
+        kind = k % 7
+        if kind == 0:
+            col = rng.choice(np.array(["  AR-01 ", "FP", "nan", "", "SS  "], dtype=object), rows)
+        elif kind == 1:
+            col = rng.integers(0, 1000, rows).astype(object)
+        elif kind == 2:
+            col = rng.random(rows).astype(object)
+            col[rng.random(rows) < 0.2] = np.nan
+        elif kind == 3:
+            col = np.array([f"item {v}" for v in rng.integers(0, 10_000, rows)], dtype=object)
+            col[rng.random(rows) < 0.1] = 12.5
+        elif kind == 4:
+            col = np.full(rows, np.nan, dtype=object)
+            col[rng.random(rows) < 0.3] = "  x "
+        elif kind == 5:  # 숫자 + 불리언 (str 없는 mixed 열)
+            col = rng.integers(0, 100, rows).astype(object)
+            col[rng.random(rows) < 0.2] = True
+        else:  # 날짜 + 숫자 + 결측 (mixed 열)
+            col = np.full(rows, np.nan, dtype=object)
+            col[rng.random(rows) < 0.4] = datetime(2024, 1, 1)
+            col[rng.random(rows) < 0.2] = 7
+        data[k] = np.concatenate([[top[k], sub[k] or np.nan], col])
+    raw = pd.DataFrame(data)
+    raw.iloc[10, 2] = "Description"  # 헤더 잔재 행
+    raw.iloc[20] = np.nan  # 빈 행
+    return raw
+
+
+def _timed(fn, raw, repeat: int):
+    best, out = float("inf"), None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        out = fn(raw)
+        best = min(best, time.perf_counter() - t0)
+    return best, out
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("xlsx", nargs="*", help="실제 Work Master 엑셀 경로(생략 시 합성 데이터)")
+    ap.add_argument("--rows", type=int, default=50_000)
+    ap.add_argument("--cols", type=int, default=40)
+    ap.add_argument("--repeat", type=int, default=3)
+    args = ap.parse_args()
+
+    cases = [(p, pd.read_excel(p, header=None)) for p in args.xlsx] or [
+        (f"synthetic {args.rows}x{args.cols}", synthetic_raw(args.rows, args.cols))
+    ]
+    for label, raw in cases:
+        t_row, (items_a, cols_a) = _timed(normalize_rowwise, raw, args.repeat)
+        t_col, (items_b, cols_b) = _timed(_normalize_raw_frame, raw, args.repeat)
+        same = cols_a == cols_b and items_a == items_b
+        print(
+            f"{label}: rows={len(items_b)} row-wise={t_row:.3f}s column-wise={t_col:.3f}s "
+            f"speedup={t_row / t_col:.1f}x identical={same}"
+        )
+        if not same:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
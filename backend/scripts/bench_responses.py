@@ -0,0 +1,191 @@
+# backend/scripts/bench_responses.py
+"""
+응답 인코더/압축 벤치마크: FastAPI 기본(jsonable_encoder + json) vs orjson vs msgpack, gzip vs brotli
+
+사용:
+    cd backend
+    python scripts/bench_responses.py                        # 합성 /items (20,000행 x 40열) + 트리 (5,000노드)
+    python scripts/bench_responses.py --rows 50000 --cols 60
+    python scripts/bench_responses.py --batch 12             # DATABASE_URL 의 실제 배치 행으로 /items 페이로드 구성
+
+msgpack / brotli 가 설치돼 있지 않으면 해당 항목은 건너뜀
+"""
+
+import argparse
+import gzip
+import json
+import pathlib
+import sys
+import time
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[1]))
+
+from fastapi.encoders import jsonable_encoder  # noqa: E402
+from pydantic import TypeAdapter  # noqa: E402
+
+from app.shared import responses as r  # noqa: E402
+from app.standards import schemas as ss  # noqa: E402
+
+
+def synthetic_items(rows: int, cols: int) -> list[dict]:
+    """/items 응답 형태 (row_id/source/code/name/unit/qty + _raw 원본 열)"""
+    names = [f"Attr {k} 속성명" for k in range(cols)]
+    out = []
+    for i in range(rows):
+        raw = {}
+        for k, c in enumerate(names):
+            kind = k % 4
+            raw[c] = (
+                f"item {i * 7 % 10_000}" if kind == 0
+                else (i * 31 + k) % 1000 if kind == 1
+                else round((i % 97) * 0.37, 2) if kind == 2
+                else None
+            )  # fmt: skip
+        out.append(
+            {
+                "row_id": i + 1,
+                "source": "AR",
+                "code": f"AR-{i % 5000:05d}",
+                "name": f"콘크리트 타설 {i % 300}",
+                "unit": "m3",
+                "qty": float(i % 1000),
+                "_raw": raw,
+            }
+        )
+    return out
+
+
+def batch_items(batch_id: int) -> list[dict]:
+    from sqlalchemy import select
+
+    from app.shared.db import SessionLocal
+    from app.wms import models as m
+    from app.wms.router import _item_out
+
+    db = SessionLocal()
+    try:
+        rows = db.execute(
+            select(
+                m.WmsRow.id, m.WmsBatch.source, m.WmsRow.code, m.WmsRow.name,
+                m.WmsRow.unit, m.WmsRow.qty, m.WmsRow.payload_json,
+            )  # fmt: skip
+            .join(m.WmsBatch, m.WmsBatch.id == m.WmsRow.batch_id)
+            .where(m.WmsRow.batch_id == batch_id)
+            .order_by(m.WmsRow.id)
+        ).all()
+        return [_item_out(x) for x in rows]
+    finally:
+        db.close()
+
+
+def synthetic_tree(nodes: int) -> dict:
+    """/std/releases/{rid}/tree 응답 형태 (pydantic 모델, 4단계 트리)"""
+    roots, stack = [], []
+    for i in range(nodes):
+        level = i % 4
+        node = ss.StdNodeTreeOut(
+            std_node_uid=f"uid-{i:06d}",
+            parent_uid=stack[level - 1].std_node_uid if level else None,
+            name=f"공종 {i}",
+            level=level,
+            order_index=i,
+            path=f"/{i}",
+            parent_path=None,
+            values_json={"unit": "m3", "note": f"노드 {i}", "weight": i * 0.5},
+            std_kind="GWM",
+        )
+        (stack[level - 1].children if level else roots).append(node)
+        del stack[level:]
+        stack.append(node)
+    return {"GWM": roots}
+
+
+def _timed(fn, repeat: int):
+    best, out = float("inf"), None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        out = fn()
+        best = min(best, time.perf_counter() - t0)
+    return best, out
+
+
+def _row(label: str, sec: float, body: bytes, base: float | None = None):
+    extra = f"  x{base / sec:.1f}" if base else ""
+    print(f"  {label:<34} {sec * 1000:9.1f} ms  {len(body) / 1e6:8.2f} MB{extra}")
+
+
+def bench_items(items: list[dict], repeat: int) -> bytes:
+    print(f"/items ({len(items)} rows)")
+
+    def stdlib():
+        return json.dumps(
+            jsonable_encoder(items), ensure_ascii=False, allow_nan=False, separators=(",", ":")
+        ).encode("utf-8")
+
+    t_base, body = _timed(stdlib, repeat)
+    _row("jsonable_encoder + json (기존)", t_base, body)
+    if r.orjson is not None:
+        t, body = _timed(lambda: r.dumps_json(items), repeat)
+        _row("orjson (직접 반환)", t, body, t_base)
+    if r.msgpack is not None:
+        t, packed = _timed(lambda: r.dumps_msgpack(items), repeat)
+        _row("msgpack (직접 반환)", t, packed, t_base)
+    return body
+
+
+def bench_tree(tree: dict, repeat: int) -> None:
+    n = sum(1 for _ in _walk(tree["GWM"]))
+    print(f"/std/releases/{{rid}}/tree ({n} nodes)")
+    ta = TypeAdapter(dict[str, list[ss.StdNodeTreeOut]])
+
+    t_base, body = _timed(lambda: ta.dump_json(ta.validate_python(tree)), repeat)
+    _row("pydantic dump_json (FastAPI 기본)", t_base, body)
+    t, body = _timed(
+        lambda: r.dumps_json(ta.dump_python(ta.validate_python(tree), mode="json")), repeat
+    )
+    _row("pydantic json 모드 + orjson", t, body, t_base)
+    if r.msgpack is not None:
+        t, packed = _timed(
+            lambda: r.dumps_msgpack(ta.dump_python(ta.validate_python(tree), mode="json")), repeat
+        )
+        _row("pydantic json 모드 + msgpack", t, packed, t_base)
+
+
+def _walk(nodes):
+    for x in nodes:
+        yield x
+        yield from _walk(x.children)
+
+
+def bench_compression(body: bytes, repeat: int) -> None:
+    print(f"압축 ({len(body) / 1e6:.2f} MB JSON)")
+    for level in (1, 6, 9):
+        t, out = _timed(lambda lv=level: gzip.compress(body, compresslevel=lv), repeat)
+        _row(f"gzip level {level}", t, out)
+    if r.brotli is not None:
+        for q in (4, 5, 6):  # 11 은 수십 초 → 응답 압축에 부적합
+            t, out = _timed(lambda q=q: r.brotli.compress(body, quality=q), repeat)
+            _row(f"brotli quality {q}", t, out)
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--rows", type=int, default=20_000)
+    ap.add_argument("--cols", type=int, default=40)
+    ap.add_argument("--nodes", type=int, default=5_000)
+    ap.add_argument("--batch", type=int, help="실제 배치 id (DATABASE_URL)")
+    ap.add_argument("--repeat", type=int, default=3)
+    args = ap.parse_args()
+
+    missing = [n for n in ("orjson", "msgpack", "brotli") if getattr(r, n) is None]
+    if missing:
+        print(f"(미설치: {', '.join(missing)} → 해당 항목 생략)")
+
+    items = batch_items(args.batch) if args.batch else synthetic_items(args.rows, args.cols)
+    body = bench_items(items, args.repeat)
+    bench_tree(synthetic_tree(args.nodes), args.repeat)
+    bench_compression(body, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+# backend/tests/conftest.py
+import os
+import tempfile
+import time
+from pathlib import Path
+
+import pytest
+
+# ✅ 앱(settings/engine)을 import 하기 전에 임시 SQLite DB 지정
+_TMP = Path(tempfile.mkdtemp(prefix="bnote-test-"))
+os.environ["DATABASE_URL"] = f"sqlite:///{_TMP / 'test.db'}"
+
+from fastapi.testclient import TestClient  # noqa: E402
+from sqlalchemy import text  # noqa: E402
+
+from app.auth import models as _auth_models  # noqa: E402,F401
+from app.main import app  # noqa: E402
+from app.shared.db import Base, SessionLocal, engine  # noqa: E402
+from app.standards.models import ReleaseStatus, StdNode, StdRelease  # noqa: E402
+from app.wms import archive, chunked, jobs, purge, search, staging  # noqa: E402
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+SAMPLES_DIR = BACKEND_DIR.parent / "samples"
+
+
+@pytest.fixture(scope="session", autouse=True)
+def _schema():
+    Base.metadata.create_all(engine)
+    search.create_index(engine)  # FTS5 가상 테이블은 모델에 없음
+    yield
+    engine.dispose()
+
+
+def _wait_idle(timeout: float = 30.0) -> None:
+    """백그라운드 purge / 보관 / 적재 잡이 끝날 때까지"""
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        busy = purge.status()["running"] or archive.status()["running"]
+        busy = busy or jobs.running() > 0
+        if not busy:
+            return
+        time.sleep(0.05)
+    raise AssertionError("background work did not finish")
+
+
+@pytest.fixture(autouse=True)
+def _clean(tmp_path, monkeypatch):
+    """테스트마다 빈 테이블 + 파일 저장소는 임시 디렉터리"""
+    monkeypatch.setattr(jobs, "SPOOL_DIR", tmp_path / "uploads")
+    monkeypatch.setattr(chunked, "CHUNK_ROOT", tmp_path / "chunked")
+    monkeypatch.setattr(archive, "ARCHIVE_DIR", tmp_path / "archive")
+    monkeypatch.setattr(staging, "STAGING_DIR", tmp_path / "staging")
+    yield
+    _wait_idle()
+    with engine.begin() as conn:
+        for t in reversed(Base.metadata.sorted_tables):
+            conn.execute(t.delete())
+        conn.exec_driver_sql("DELETE FROM wms_payload_fts")
+
+
+@pytest.fixture
+def client():
+    with TestClient(app) as c:
+        yield c
+
+
+@pytest.fixture
+def db():
+    s = SessionLocal()
+    try:
+        yield s
+    finally:
+        s.close()
+
+
+@pytest.fixture
+def wait_idle():
+    return _wait_idle
+
+
+def make_items(n: int, prefix: str = "C", **extra) -> list[dict]:
+    return [
+        {
+            "code": f"{prefix}{i}",
+            "name": f"name {i}",
+            "qty": i,
+            "unit": "m3",
+            "group_code": "G1" if i % 2 else "G2",
+            "_raw": {"Desc": f"desc {i}", "Qty": i},
+            **extra,
+        }
+        for i in range(n)
+    ]
+
+
+@pytest.fixture
+def ingest(client):
+    """items 적재 → batch_id"""
+
+    def _ingest(items: list[dict], source: str = "AR", **body) -> int:
+        r = client.post("/api/wms/ingest", json={"source": source, "items": items, **body})
+        assert r.status_code == 200, r.text
+        return r.json()["batch_id"]
+
+    return _ingest
+
+
+@pytest.fixture
+def release(db):
+    """DRAFT / ACTIVE / ARCHIVED 릴리즈 + 노드 'N1', 'N2' → {status: release_id}"""
+    out = {}
+    for i, st in enumerate(ReleaseStatus, start=1):
+        rel = StdRelease(version=f"v{i}", status=st)
+        db.add(rel)
+        db.flush()
+        for uid in ("N1", "N2"):
+            db.add(StdNode(std_release_id=rel.id, std_node_uid=uid, name=uid, path=uid))
+        out[st.value] = rel.id
+    db.commit()
+    return out
+
+
+@pytest.fixture
+def rows_of(client):
+    def _rows_of(batch_id: int) -> list[int]:
+        items = client.get("/api/wms/items", params={"batch_id": batch_id}).json()
+        return [x["row_id"] for x in items]
+
+    return _rows_of
+
+
+@pytest.fixture
+def count(db):
+    def _count(sql: str, **params) -> int:
+        db.rollback()
+        return db.execute(text(sql), params).scalar_one()
+
+    return _count
@@ -0,0 +1,159 @@
+# backend/tests/test_archive.py
+import pytest
+
+from conftest import make_items
+from app.wms import archive
+
+
+@pytest.fixture
+def superseded(client, ingest):
+    """보관 대상 배치 1건 (같은 source 의 더 새 배치가 현재 배치) → (old, new)"""
+    old = ingest(make_items(50))
+    new = ingest(make_items(5, prefix="N"))
+    client.post(f"/api/wms/batches/{new}/set-current")
+    return old, new
+
+
+def _snapshot(client, bid: int) -> dict:
+    return {
+        "preview": client.get(f"/api/wms/batches/{bid}/preview", params={"limit": 5}).json(),
+        "items": client.get("/api/wms/items", params={"batch_id": bid, "order": "desc"}).json(),
+        "code": client.get("/api/wms/items", params={"batch_id": bid, "code": "C7"}).json(),
+        "search": client.get("/api/wms/items", params={"batch_id": bid, "search": "desc 4"}).json(),
+        "errors": client.get(f"/api/wms/batches/{bid}/errors").json(),
+    }
+
+
+def test_archive_restore_round_trip(client, superseded, release, rows_of, count):
+    old, _ = superseded
+    client.post(f"/api/wms/batches/{old}/validate", json={"required_fields": ["code"]})
+    rows = rows_of(old)[:3]
+    link = {"std_release_id": release["ARCHIVED"], "std_node_uid": "N1", "row_ids": rows}
+    client.post("/api/wms/links/assign", json=link)
+    before = _snapshot(client, old)
+
+    assert client.get("/api/wms/batches/archive").json()["candidates"] == [old]
+    r = client.post(f"/api/wms/batches/{old}/archive")
+    assert r.status_code == 200
+    assert (r.json()["rows"], r.json()["links"]) == (50, 3)
+    assert count("SELECT count(*) FROM wms_row WHERE batch_id = :b", b=old) == 0
+    assert archive.path_for(old).exists()
+    assert _snapshot(client, old) == before  # 조회는 Parquet 에서 같은 결과
+
+    r = client.post(f"/api/wms/batches/{old}/restore")
+    assert r.status_code == 200
+    assert (r.json()["rows"], r.json()["links"], r.json()["remapped"]) == (50, 3, False)
+    assert not archive.path_for(old).exists()
+    assert _snapshot(client, old) == before
+    linked = client.get("/api/wms/links", params={"rid": release["ARCHIVED"], "uid": "N1"}).json()
+    assert [x["row_id"] for x in linked] == rows
+
+
+def test_restore_remaps_reused_row_ids(client, ingest, release, rows_of, db):
+    from sqlalchemy import text
+
+    old = ingest(make_items(5))
+    new = ingest(make_items(1, prefix="N"))
+    client.post(f"/api/wms/batches/{new}/set-current")
+    # 보관할 배치의 행이 가장 큰 id 를 갖게 → 보관 후 SQLite 가 그 id 를 다시 씀
+    db.execute(text("UPDATE wms_row SET id = id + 100 WHERE batch_id = :b"), {"b": old})
+    db.commit()
+    rows = rows_of(old)
+    client.post(
+        "/api/wms/links/assign",
+        json={"std_release_id": release["ARCHIVED"], "std_node_uid": "N2", "row_ids": rows[:2]},
+    )
+    assert client.post(f"/api/wms/batches/{old}/archive").status_code == 200
+    reused = rows_of(ingest(make_items(120, prefix="R")))
+    assert set(rows) & set(reused)
+
+    r = client.post(f"/api/wms/batches/{old}/restore")
+    assert r.status_code == 200 and r.json()["remapped"]
+    restored = client.get("/api/wms/items", params={"batch_id": old}).json()
+    assert [x["code"] for x in restored] == [f"C{i}" for i in range(5)]
+    linked = client.get("/api/wms/links", params={"rid": release["ARCHIVED"], "uid": "N2"}).json()
+    assert [x["code"] for x in linked] == ["C0", "C1"]
+    assert {x["row_id"] for x in linked} <= {x["row_id"] for x in restored}
+
+
+def test_archive_aborts_when_link_added_while_writing(
+    client, superseded, release, rows_of, monkeypatch
+):
+    from app.shared.db import SessionLocal
+    from app.wms import models as m
+
+    old, _ = superseded
+    rows = rows_of(old)
+    write_links = archive._write_links
+
+    def racing(db, batch_id, path):
+        out = write_links(db, batch_id, path)
+        s = SessionLocal()  # 파일 작성 도중 다른 요청이 링크 할당
+        link = m.StdWmsLink(
+            std_release_id=release["ARCHIVED"], std_node_uid="N1", wms_row_id=rows[0]
+        )
+        s.add(link)
+        s.commit()
+        s.close()
+        return out
+
+    monkeypatch.setattr(archive, "_write_links", racing)
+    assert client.post(f"/api/wms/batches/{old}/archive").status_code == 409
+    assert not archive.path_for(old).exists()
+    assert len(rows_of(old)) == 50
+
+
+def test_archived_rows_reject_links_and_writes(client, superseded, release, rows_of):
+    old, _ = superseded
+    rows = rows_of(old)
+    client.post(f"/api/wms/batches/{old}/archive")
+    body = {"std_release_id": release["DRAFT"], "std_node_uid": "N1", "row_ids": rows[:1]}
+    assert client.post("/api/wms/links/assign", json=body).status_code == 409
+    assert client.post(f"/api/wms/batches/{old}/validate", json={}).status_code == 409
+    assert client.post(f"/api/wms/batches/{old}/set-current").status_code == 409
+
+
+def test_archive_errors(client, superseded, release, rows_of):
+    old, new = superseded
+    assert client.post(f"/api/wms/batches/{new}/archive").status_code == 409  # 현재 배치
+    rows = rows_of(old)[:1]
+    active = {"std_release_id": release["ACTIVE"], "std_node_uid": "N1", "row_ids": rows}
+    client.post("/api/wms/links/assign", json=active)
+    assert client.post(f"/api/wms/batches/{old}/archive").status_code == 409  # ACTIVE 링크
+    assert client.post(f"/api/wms/batches/{old}/restore").status_code == 409  # 보관 안 됨
+    assert client.post("/api/wms/batches/999/restore").status_code == 404
+
+
+@pytest.mark.parametrize("status", ["DRAFT", "ACTIVE"])
+def test_batches_linked_from_live_releases_are_kept(client, superseded, release, rows_of, status):
+    old, _ = superseded
+    link = {"std_release_id": release[status], "std_node_uid": "N1", "row_ids": rows_of(old)[:1]}
+    client.post("/api/wms/links/assign", json=link)
+    assert client.get("/api/wms/batches/archive").json()["candidates"] == []
+    assert client.post(f"/api/wms/batches/{old}/archive").status_code == 409
+    assert client.get("/api/wms/links", params={"rid": release[status], "uid": "N1"}).json()
+
+
+def test_failed_or_queued_batch_does_not_supersede(client, ingest, db):
+    from app.wms import models as m
+
+    old = ingest(make_items(2))
+    failed = m.WmsBatch(source="AR", status="failed")
+    db.add_all([failed, m.WmsBatch(source="AR", status="queued")])
+    db.commit()
+    # 더 새 배치가 실패/적재 중이면 old 는 여전히 최신 데이터 → 보관 대상 아님
+    assert client.get("/api/wms/batches/archive").json()["candidates"] == []
+    assert client.post(f"/api/wms/batches/{old}/archive").status_code == 409
+    ingest(make_items(1, prefix="N"))
+    assert client.get("/api/wms/batches/archive").json()["candidates"] == [old, failed.id]
+
+
+def test_bulk_archive(client, superseded, wait_idle):
+    old, _ = superseded
+    assert client.post("/api/wms/batches/archive?dry_run=true").json() == {"candidates": [old]}
+    client.post("/api/wms/batches/archive")
+    wait_idle()
+    status = client.get("/api/wms/batches/archive").json()
+    assert status["archived_batches"] >= 1 and status["candidates"] == []
+    flags = {b["id"]: b["archived"] for b in client.get("/api/wms/batches").json()}
+    assert flags[old]
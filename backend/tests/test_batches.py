@@ -0,0 +1,276 @@
+# backend/tests/test_batches.py
+import json
+from datetime import datetime
+
+from conftest import make_items
+
+
+def test_preview_pages_rows(client, ingest):
+    bid = ingest(make_items(5))
+    r = client.get(f"/api/wms/batches/{bid}/preview", params={"limit": 2, "with_total": True})
+    assert r.status_code == 200
+    assert [x["row_index"] for x in r.json()] == [0, 1]
+    assert r.headers["x-total-count"] == "5"
+    r = client.get(
+        f"/api/wms/batches/{bid}/preview", params={"cursor": r.headers["x-next-cursor"]}
+    )
+    assert [x["row_index"] for x in r.json()] == [2, 3, 4]
+    assert r.json()[0]["payload_json"]["code"] == "C2"
+
+
+def test_preview_columnar_shape(client, ingest):
+    bid = ingest(make_items(2))
+    cols = client.get(f"/api/wms/batches/{bid}/preview", params={"shape": "columns"}).json()
+    assert "code" in cols["columns"] and cols["raw_columns"] == ["Desc", "Qty"]
+    assert len(cols["rows"]) == 2
+    assert client.get(f"/api/wms/batches/{bid}/preview?shape=grid").status_code == 400
+
+
+def test_preview_stream_ndjson(client, ingest):
+    bid = ingest(make_items(3))
+    r = client.get(f"/api/wms/batches/{bid}/preview", params={"stream": "ndjson"})
+    lines = [json.loads(x) for x in r.text.splitlines()]
+    assert [x["row_index"] for x in lines] == [0, 1, 2]
+    assert lines[2]["payload_json"]["_raw"] == {"Desc": "desc 2", "Qty": 2}
+
+
+def test_validate_required_fields(client, ingest):
+    items = make_items(4)
+    items[1]["name"] = "  "
+    items[2]["name"] = None
+    bid = ingest(items)
+    r = client.post(f"/api/wms/batches/{bid}/validate", json={"required_fields": ["code", "name"]})
+    assert r.status_code == 200
+    assert (r.json()["status"], r.json()["errors"], r.json()["total"]) == ("invalid", 2, 4)
+    errors = client.get(f"/api/wms/batches/{bid}/errors").json()
+    assert [e["row_index"] for e in errors] == [1, 2]
+    assert errors[0]["errors_json"] == {"messages": ["Missing/empty field: name"]}
+
+
+def test_validate_required_quoted_key(client, ingest):
+    items = make_items(2)
+    items[0]['a"b'] = "x"
+    bid = ingest(items)
+    r = client.post(f"/api/wms/batches/{bid}/validate", json={"required_fields": ['a"b']})
+    assert r.json()["errors"] == 1
+    assert [e["row_index"] for e in client.get(f"/api/wms/batches/{bid}/errors").json()] == [1]
+
+
+def test_validate_blank_matches_str_strip(client, ingest):
+    import pandas as pd
+
+    from app.wms.rules import compile_rules
+    from app.wms.rules_pandas import evaluate
+
+    notes = ["\u3000", "\xa0 ", " \u2003\t", "x"]
+    items = make_items(4)
+    for it, note in zip(items, notes):
+        it["note"] = note
+    bid = ingest(items)
+    rules = {"required_fields": ["note"]}
+    # SQL trim 도 str.strip() 처럼 유니코드 공백(전각, NBSP 등)을 빈값으로 → 드라이런(pandas)과 같은 결과
+    assert client.post(f"/api/wms/batches/{bid}/validate", json=rules).json()["errors"] == 3
+    errors = client.get(f"/api/wms/batches/{bid}/errors").json()
+    assert [e["row_index"] for e in errors] == [0, 1, 2]
+    groups = evaluate(compile_rules(rules), pd.DataFrame({"note": notes}))
+    assert [rows.tolist() for _, rows in groups] == [[0, 1, 2]]
+
+
+def test_validate_errors(client):
+    assert client.post("/api/wms/batches/999/validate", json={}).status_code == 404
+
+
+def test_validate_rules_engine(client, ingest):
+    items = make_items(6)
+    items[5]["code"] = "C4"
+    items[3]["unit"] = "EA"
+    bid = ingest(items)
+    rules = {
+        "fields": {"qty": {"type": "number", "min": 2}, "code": {"pattern": r"C\d"}},
+        "allowed_units": ["m3"],
+        "unique_code": True,
+    }
+    r = client.post(f"/api/wms/batches/{bid}/validate", json=rules)
+    assert r.status_code == 200
+    assert (r.json()["status"], r.json()["errors"]) == ("invalid", 5)
+    errors = client.get(f"/api/wms/batches/{bid}/errors").json()
+    assert {e["row_index"]: e["errors_json"]["messages"] for e in errors} == {
+        0: ["qty below minimum 2"],
+        1: ["qty below minimum 2"],
+        3: ["Unit not allowed"],
+        4: ["Duplicate code in batch"],
+        5: ["Duplicate code in batch"],
+    }
+
+
+def test_rules_on_mixed_type_column():
+    import pandas as pd
+
+    from app.wms.rules import compile_rules
+    from app.wms.rules_pandas import evaluate
+
+    qty = pd.Series([1, True, " 3 ", None, datetime(2024, 1, 1)], dtype=object)
+    rules = {"required_fields": ["qty"], "fields": {"qty": {"type": "string", "pattern": "3"}}}
+    groups = evaluate(compile_rules(rules), pd.DataFrame({"qty": qty}))
+    bad = ["Invalid type for qty: expected string", "Pattern mismatch for qty"]
+    assert {tuple(msgs): rows.tolist() for msgs, rows in groups} == {
+        tuple(bad): [0, 1, 4],
+        ("Missing/empty field: qty",): [3],
+    }
+
+
+def test_validate_rejects_bad_rules(client, ingest):
+    bid = ingest(make_items(1))
+    bad = {"fields": {"code": {"pattern": "("}}}
+    assert client.post(f"/api/wms/batches/{bid}/validate", json=bad).status_code == 400
+    bad = {"fields": {"qty": {"min": 3, "max": 1}}}
+    assert client.post(f"/api/wms/batches/{bid}/validate", json=bad).status_code == 400
+
+
+def test_validate_many(client, ingest):
+    b1, b2 = ingest(make_items(3)), ingest(make_items(2))
+    r = client.post(
+        "/api/wms/batches/validate",
+        json={"batch_ids": [b1, b2, 999], "required_fields": ["code"], "unique_code": True},
+    )
+    assert r.status_code == 200
+    res = {x["batch_id"]: x for x in r.json()["results"]}
+    assert res[b1]["status"] == res[b2]["status"] == "validated"
+    assert res[999]["error"] == "batch not found or archived"
+    assert client.post("/api/wms/batches/validate", json={"batch_ids": []}).status_code == 422
+
+
+def test_validate_incremental(client, ingest, db):
+    from sqlalchemy import text
+
+    bid = ingest(make_items(6))
+    url = f"/api/wms/batches/{bid}/validate"
+    rules = {"fields": {"qty": {"type": "number", "min": 2}}}
+    assert client.post(url, json=rules).json()["checked"] == 6
+    again = client.post(url, json=rules).json()
+    assert (again["checked"], again["errors"], again["total"]) == (0, 2, 6)  # 바뀐 행/규칙 없음
+
+    # 검증 이후 payload 가 바뀐 행만 다시 검사
+    db.execute(
+        text("UPDATE wms_row SET validated_hash = 'stale' WHERE batch_id = :b AND row_index = 1"),
+        {"b": bid},
+    )
+    db.commit()
+    assert client.post(url, json=rules).json()["checked"] == 1
+
+    required = {"required_fields": ["code"]}
+    r = client.post(url, json=required).json()  # 규칙이 바뀌면 전체
+    assert (r["checked"], r["errors"], r["status"]) == (6, 0, "validated")
+    assert client.post(url, json=required).json()["checked"] == 0
+    assert client.post(url, json={**required, "force": True}).json()["checked"] == 6
+
+
+def _counters(client, bid: int) -> tuple[int, int, int]:
+    b = next(b for b in client.get("/api/wms/batches").json() if b["id"] == bid)
+    return b["total_rows"], b["ok_rows"], b["error_rows"]
+
+
+def test_batch_counters_follow_validation(client, ingest, count):
+    bid = ingest(make_items(5))
+    assert _counters(client, bid) == (5, 0, 0)
+    url = f"/api/wms/batches/{bid}/validate"
+    client.post(url, json={"fields": {"qty": {"min": 1}}})
+    assert _counters(client, bid) == (5, 4, 1)
+    client.post(url, json={"required_fields": ["code"]})
+    assert _counters(client, bid) == (5, 5, 0)
+    assert count("SELECT count(*) FROM wms_row WHERE batch_id = :b AND status = 'ok'", b=bid) == 5
+
+
+def _current(client, source: str = "AR", **params):
+    return client.get("/api/wms/batches/current", params={"source": source, **params})
+
+
+def test_set_and_get_current(client, ingest, wait_idle):
+    b1, b2 = ingest(make_items(1)), ingest(make_items(1))
+    assert _current(client).json()["id"] == b2  # 포인터 없음 → 최신
+    r = client.post(f"/api/wms/batches/{b1}/set-current")
+    assert r.json()["current_batch_id"] == b1
+    assert _current(client).json()["id"] == b1
+    flags = {b["id"]: b["is_current"] for b in client.get("/api/wms/batches").json()}
+    assert flags == {b1: True, b2: False}
+
+    client.delete(f"/api/wms/batches/{b1}")  # 포인터도 제거 → 최신 배치로 대체
+    wait_idle()
+    assert _current(client).json()["id"] == b2
+
+
+def test_current_falls_back_to_latest_validated(client, ingest):
+    b1, b2 = ingest(make_items(1)), ingest(make_items(1))
+    client.post(f"/api/wms/batches/{b1}/validate", json={"required_fields": ["code"]})
+    assert _current(client).json()["id"] == b1  # b2 가 더 최신이지만 검증 전
+
+
+def test_current_fallback_skips_unusable_batches(client, ingest, db):
+    from app.wms import models as m
+
+    ok = ingest(make_items(1))
+    for status in ("failed", "queued", "ingesting"):
+        db.add(m.WmsBatch(source="AR", status=status))  # 더 최신이지만 적재 실패/진행 중
+    db.add(m.WmsBatch(source="FP", status="failed"))
+    db.commit()
+    assert _current(client).json()["id"] == ok
+    assert _current(client, "FP").status_code == 404  # 쓸 수 있는 배치가 없음
+
+
+def test_current_per_project(client, ingest):
+    p7 = ingest(make_items(1), project_id=7)
+    latest = ingest(make_items(1))
+    client.post(f"/api/wms/batches/{p7}/set-current", params={"per_project": True})
+    cur = _current(client, project_id=7).json()
+    assert (cur["id"], cur["is_current"]) == (p7, True)
+    cur = _current(client).json()  # source 전체 포인터는 없음 → 최신
+    assert (cur["id"], cur["is_current"]) == (latest, False)
+
+
+def test_current_errors(client):
+    assert client.post("/api/wms/batches/999/set-current").status_code == 404
+    assert _current(client, "XX").status_code == 404
+
+
+def test_delete_batch_purges_rows(client, ingest, release, rows_of, count, wait_idle):
+    bid = ingest(make_items(3))
+    client.post(
+        "/api/wms/links/assign",
+        json={"std_release_id": release["DRAFT"], "std_node_uid": "N1", "row_ids": rows_of(bid)},
+    )
+    r = client.delete(f"/api/wms/batches/{bid}")
+    assert r.json() == {"deleted": True, "batch_id": bid, "purge": "scheduled"}
+    # 소프트 삭제 즉시 모든 조회에서 제외
+    assert client.get("/api/wms/batches").json() == []
+    assert client.get("/api/wms/items").json() == []
+    assert client.get(f"/api/wms/batches/{bid}/preview").json() == []
+    assert client.post(f"/api/wms/batches/{bid}/validate", json={}).status_code == 404
+    wait_idle()
+    assert count("SELECT count(*) FROM wms_row") == 0
+    assert count("SELECT count(*) FROM std_wms_link") == 0
+    assert count("SELECT count(*) FROM wms_batch") == 0
+    assert client.get("/api/wms/batches/purge").json()["purged_batches"] >= 1
+    assert client.delete(f"/api/wms/batches/{bid}").status_code == 404
+
+
+def test_purge_stuck_deleted_batch(client, db, ingest, count, wait_idle):
+    from app.wms import jobs
+    from app.wms import models as m
+
+    live, dead = ingest(make_items(2)), ingest(make_items(3))
+    for bid, worker in ((live, jobs.worker_tag()), (dead, {**jobs.worker_tag(), "pid": 2**22 + 1})):
+        batch = db.get(m.WmsBatch, bid)
+        batch.status, batch.meta_json = "ingesting", {"worker": worker}
+        batch.deleted_at = datetime.now()
+    db.commit()
+    client.post("/api/wms/batches/purge")
+    wait_idle()
+    # 담당 프로세스가 없는 배치만 failed → purge, 살아 있는 잡의 배치는 잡 종료까지 대기
+    assert count("SELECT count(*) FROM wms_row") == 2
+    assert count("SELECT count(*) FROM wms_batch") == 1
+    assert count("SELECT count(*) FROM wms_batch WHERE id = :b", b=live) == 1
+
+
+def test_run_purge(client):
+    r = client.post("/api/wms/batches/purge")
+    assert r.status_code == 200 and "running" in r.json()
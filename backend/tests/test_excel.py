@@ -0,0 +1,81 @@
+# backend/tests/test_excel.py
+import io
+from datetime import datetime
+
+import pandas as pd
+import pytest
+
+from conftest import SAMPLES_DIR
+from app.wms.excel import open_work_master_excel
+from app.wms.excel_pandas import _clean_column, _clean_scalar, normalize_work_master_excel
+from app.wms.values import to_number
+
+
+@pytest.mark.parametrize("name", ["AR.xlsx", "FP.xlsx", "SS.xlsx"])
+def test_stream_parser_matches_pandas(name):
+    data = (SAMPLES_DIR / name).read_bytes()
+    items, cols = normalize_work_master_excel(data)
+    s_cols, _, s_items = open_work_master_excel(io.BytesIO(data))
+    assert s_cols == cols
+    assert list(s_items) == items
+
+
+def _workbook(*rows, styled_col: int | None = None) -> bytes:
+    from openpyxl import Workbook
+    from openpyxl.styles import Font
+
+    wb = Workbook()
+    for row in rows:
+        wb.active.append(row)
+    if styled_col:  # 값 없는 서식 셀 → 시트 dimension 이 실제 데이터보다 넓음
+        wb.active.cell(row=1, column=styled_col).font = Font(bold=True)
+    buf = io.BytesIO()
+    wb.save(buf)
+    return buf.getvalue()
+
+
+@pytest.mark.parametrize("styled_col", [None, 9])
+def test_stream_parser_keeps_columns_beyond_header(styled_col):
+    data = _workbook(
+        ["Discipline", "Work Master", "Qty"],
+        ["", "Code", ""],
+        ["A", "C1", 1, None, "x"],
+        [None, None, None, None, "only"],  # 헤더 범위 밖에만 값이 있는 행
+        ["B", "C2", "inf", None, None, "N/A"],
+        styled_col=styled_col,
+    )
+    items, cols = normalize_work_master_excel(data)
+    s_cols, _, s_items = open_work_master_excel(io.BytesIO(data))
+    assert (s_cols, list(s_items)) == (cols, items)
+    assert cols[3:] == ["unnamed", "unnamed__2", "unnamed__3"]
+    assert [x["_raw"]["unnamed__2"] for x in items] == ["x", "only", None]
+    assert [x["qty"] for x in items] == [1.0, None, None]
+
+
+_NUMBERS = [(" 2.5 ", 2.5), (3, 3.0), ("x", None), (datetime(2024, 1, 1), None)]
+_NON_FINITE = ["nan", "inf", "-Infinity", float("inf"), float("nan")]
+
+
+@pytest.mark.parametrize("v, expected", _NUMBERS + [(v, None) for v in _NON_FINITE])
+def test_to_number(v, expected):
+    assert to_number(v) == expected
+
+
+_COLUMNS = {
+    "strings": [" a ", "", "nan", None, "NaN ", "b"],
+    "numbers": [1, 2.5, None, 3, 4, 5],
+    "str_and_numbers": ["x", 1, None, " y ", 2.0, ""],
+    "dates": pd.to_datetime(["2024-01-01", None, "2024-02-03", None, None, "2025-12-31"]),
+    "all_missing": [None] * 6,
+    # str 이 없거나 일부만 있는 object 열 (infer_dtype: mixed / mixed-integer)
+    "numbers_and_bools": [1, True, 2, None, False, 3.5],
+    "numbers_and_dates": [1, datetime(2024, 1, 1), None, 2, 3, 4],
+    "missing_number_date": [None, 2, datetime(2024, 5, 6), None, None, None],
+    "str_number_date_bool": [" a ", 1, datetime(2024, 1, 1), True, "  ", None],
+}
+
+
+@pytest.mark.parametrize("name", list(_COLUMNS))
+def test_clean_column_matches_scalar_cleaner(name):
+    col = pd.Series(_COLUMNS[name], dtype=None if name == "dates" else object)
+    assert _clean_column(col).tolist() == [_clean_scalar(v) for v in col]
@@ -0,0 +1,77 @@
+# backend/tests/test_ingest.py
+import json
+
+from conftest import make_items
+
+from app.wms.ingest import insert_rows
+
+
+def test_healthz(client):
+    assert client.get("/api/healthz").json()["status"] == "ok"
+
+
+def test_ingest_creates_batch_and_rows(client, count):
+    r = client.post("/api/wms/ingest", json={"source": "AR", "items": make_items(5)})
+    assert r.status_code == 200
+    body = r.json()
+    assert body["count"] == 5 and body["new_payloads"] == 5
+    assert count("SELECT count(*) FROM wms_row WHERE batch_id = :b", b=body["batch_id"]) == 5
+    batch = client.get("/api/wms/batches").json()[0]
+    assert (batch["id"], batch["total_rows"], batch["status"]) == (body["batch_id"], 5, "received")
+
+
+def test_ingest_rejects_invalid_body(client):
+    assert client.post("/api/wms/ingest", json={"items": "nope"}).status_code == 422
+
+
+def test_insert_rows_chunks_keep_order(db, count):
+    from app.wms import models as m
+
+    batch = m.WmsBatch(source="AR", status="received")
+    db.add(batch)
+    db.flush()
+    stats = insert_rows(db, batch.id, iter(make_items(7)), chunk_size=3, start_index=10)
+    db.commit()
+    assert stats["count"] == 7
+    rows = db.execute(
+        m.WmsRow.__table__.select()
+        .where(m.WmsRow.batch_id == batch.id)
+        .order_by(m.WmsRow.row_index)
+    ).all()
+    assert [r.row_index for r in rows] == list(range(10, 17))
+    assert {r.status for r in rows} == {"received"}
+    assert count("SELECT count(*) FROM wms_row") == 7
+
+
+def test_ingest_ndjson_streams_rows(client):
+    body = "\n".join(json.dumps(it) for it in make_items(7)) + "\n"
+    r = client.post("/api/wms/ingest/ndjson?source=FP&chunk_size=3&commit_every=1", content=body)
+    assert r.status_code == 200
+    assert r.json()["count"] == 7
+    batch = client.get("/api/wms/batches", params={"source": "FP"}).json()[0]
+    assert (batch["status"], batch["total_rows"]) == ("received", 7)
+
+
+def test_ingest_ndjson_bad_meta(client):
+    r = client.post("/api/wms/ingest/ndjson?meta=not-json", content=b"{}\n")
+    assert r.status_code == 400
+
+
+def test_ingest_ndjson_bad_line_fails_batch(client):
+    body = json.dumps(make_items(1)[0]) + "\n{broken\n"
+    r = client.post("/api/wms/ingest/ndjson?source=AR&chunk_size=1&commit_every=1", content=body)
+    assert r.status_code == 400
+    detail = r.json()["detail"]
+    assert detail["rows_committed"] == 1
+    batch = client.get("/api/wms/batches").json()[0]
+    assert (batch["id"], batch["status"]) == (detail["batch_id"], "failed")
+
+
+def test_list_batches_keyset_pages(client, ingest):
+    ids = [ingest(make_items(1)) for _ in range(3)]
+    r = client.get("/api/wms/batches", params={"limit": 2})
+    assert [b["id"] for b in r.json()] == ids[::-1][:2]
+    nxt = r.headers["x-next-cursor"]
+    r = client.get("/api/wms/batches", params={"limit": 2, "cursor": nxt})
+    assert [b["id"] for b in r.json()] == ids[:1]
+    assert "x-next-cursor" not in r.headers
@@ -0,0 +1,250 @@
+# backend/tests/test_items.py
+import json
+
+from conftest import make_items
+
+
+def test_items_return_payload_values(client, ingest):
+    long_code = "L" * 400
+    items = [
+        {"code": " A1 ", "name": "n", "qty": "3", "unit": " m3", "group_code": "G", "_raw": {}},
+        {"code": long_code, "name": "x", "qty": 1, "unit": "u" * 100, "_raw": {}},
+    ]
+    bid = ingest(items)
+    r = client.get("/api/wms/items", params={"batch_id": bid, "code": "A1"}).json()
+    expected = {"source": "AR", "code": " A1 ", "name": "n", "unit": " m3", "qty": "3", "_raw": {}}
+    assert {k: v for k, v in r[0].items() if k != "row_id"} == expected
+    proj = client.get(
+        "/api/wms/items", params={"batch_id": bid, "code": "A1", "fields": "code,qty,group_code"}
+    ).json()
+    assert proj[0]["code"] == " A1 " and proj[0]["qty"] == "3"
+    full = client.get("/api/wms/items", params={"code": long_code}).json()
+    assert len(full) == 1 and full[0]["code"] == long_code and len(full[0]["unit"]) == 100
+
+
+def test_items_search(client, ingest):
+    ingest(make_items(20))
+    r = client.get("/api/wms/items", params={"search": "desc 17"}).json()
+    assert [x["code"] for x in r] == ["C17"]
+    assert len(client.get("/api/wms/items", params={"search": "7"}).json()) == 2  # 7, 17
+    assert client.get("/api/wms/items", params={"search": "DESC 3"}).json()[0]["code"] == "C3"
+
+
+def test_items_search_korean_and_raw_values(client, ingest):
+    items = make_items(2)
+    items[1]["_raw"] = {"비고": "철근 콘크리트 타설", "Empty": None}
+    ingest(items)
+    assert [x["code"] for x in client.get("/api/wms/items?search=콘크리트").json()] == ["C1"]
+    assert client.get("/api/wms/items?search=None").json() == []
+
+
+def test_items_search_limit_offset(client, ingest):
+    ingest(make_items(30))
+    r = client.get("/api/wms/items", params={"search": "desc 1", "limit": 3, "offset": 2}).json()
+    assert [x["code"] for x in r] == ["C11", "C12", "C13"]
+
+
+def test_items_code_filters(client, ingest):
+    bid = ingest(make_items(10))
+    r = client.get("/api/wms/items", params={"code": " C3"}).json()
+    assert [x["code"] for x in r] == ["C3"]
+    g1 = client.get("/api/wms/items", params={"batch_id": bid, "group_code": "G1"}).json()
+    assert [x["code"] for x in g1] == ["C1", "C3", "C5", "C7", "C9"]
+
+
+def test_field_columns_extracted_at_ingest(ingest, count):
+    items = [
+        {"code": " A1 ", "name": "  ", "qty": "3.5", "unit": " m3", "group_code": "", "_raw": {}},
+        {"code": "A2", "qty": "N/A", "_raw": {}},
+    ]
+    bid = ingest(items)
+    rows = count(
+        "SELECT group_concat(coalesce(code, '-') || '|' || coalesce(name, '-') || '|' || "
+        "coalesce(qty, '-') || '|' || coalesce(unit, '-') || '|' || coalesce(group_code, '-'), "
+        "';') FROM (SELECT * FROM wms_row WHERE batch_id = :b ORDER BY row_index)",
+        b=bid,
+    )
+    assert rows == "A1|-|3.5|m3|-;A2|-|-|-|-"
+
+
+def test_items_fields_projection(client, ingest):
+    items = make_items(3)
+    items[2]["_raw"]['Say "hi"'] = "q"
+    bid = ingest(items)
+    r = client.get("/api/wms/items", params={"batch_id": bid, "fields": "code,_raw.Qty"}).json()
+    assert r[1] == {"row_id": r[1]["row_id"], "source": "AR", "code": "C1", "_raw": {"Qty": 1}}
+    r = client.get("/api/wms/items", params={"batch_id": bid, "fields": "qty,_raw"}).json()
+    assert r[2]["qty"] == 2 and r[2]["_raw"]["Desc"] == "desc 2" and "code" not in r[2]
+    quoted = client.get(
+        "/api/wms/items", params={"batch_id": bid, "fields": '_raw.Say "hi",_raw.Desc'}
+    ).json()
+    assert quoted[2]["_raw"] == {'Say "hi"': "q", "Desc": "desc 2"}
+    assert quoted[0]["_raw"] == {'Say "hi"': None, "Desc": "desc 0"}
+
+
+def test_items_projection_reads_payload_once(client, ingest):
+    from sqlalchemy import event
+
+    from app.shared.db import engine
+
+    bid = ingest(make_items(3))
+    sql: list[str] = []
+
+    def capture(conn, cursor, statement, *args):
+        if "FROM wms_row" in statement:
+            sql.append(statement)
+
+    event.listen(engine, "before_cursor_execute", capture)
+    try:
+        params = {"batch_id": bid, "fields": "code,name,qty,group_code,_raw.Qty,_raw.Desc"}
+        r = client.get("/api/wms/items", params=params).json()
+        client.get("/api/wms/items", params={"batch_id": bid, "fields": "batch_id"})
+    finally:
+        event.remove(engine, "before_cursor_execute", capture)
+    assert r[1]["code"] == "C1" and r[1]["_raw"] == {"Qty": 1, "Desc": "desc 1"}
+    # 필드/_raw 키 수와 무관하게 payload 조회 1회, batch_id 만이면 조회 없음
+    assert [q.count("FROM wms_payload") for q in sql] == [1, 0]
+
+
+def test_links_fields_projection(client, ingest, release, rows_of):
+    rid = release["DRAFT"]
+    rows = rows_of(ingest(make_items(2)))
+    client.post(
+        "/api/wms/links/assign",
+        json={"std_release_id": rid, "std_node_uid": "N1", "row_ids": rows},
+    )
+    r = client.get("/api/wms/links", params={"rid": rid, "uid": "N1", "fields": "code"}).json()
+    assert r == [
+        {"row_id": rows[0], "source": "AR", "code": "C0"},
+        {"row_id": rows[1], "source": "AR", "code": "C1"},
+    ]
+
+
+def test_items_columnar_shape(client, ingest):
+    bid = ingest(make_items(3))
+    cols = client.get("/api/wms/items", params={"batch_id": bid, "shape": "columns"}).json()
+    assert cols["raw_columns"] == ["Desc", "Qty"]
+    rows = [dict(zip(cols["columns"] + cols["raw_columns"], r)) for r in cols["rows"]]
+    assert [(r["code"], r["Desc"], r["Qty"]) for r in rows] == [
+        ("C0", "desc 0", 0),
+        ("C1", "desc 1", 1),
+        ("C2", "desc 2", 2),
+    ]
+    proj = client.get(
+        "/api/wms/items", params={"batch_id": bid, "shape": "columns", "fields": "code"}
+    ).json()
+    assert proj["columns"] == ["row_id", "source", "code"] and proj["raw_columns"] == []
+
+
+def test_items_stream_ndjson(client, ingest):
+    bid = ingest(make_items(3))
+    nd = client.get("/api/wms/items", params={"batch_id": bid, "stream": "ndjson"})
+    assert nd.headers["content-type"].startswith("application/x-ndjson")
+    assert [json.loads(x)["code"] for x in nd.text.splitlines()] == ["C0", "C1", "C2"]
+    nd = client.get(
+        "/api/wms/items", params={"batch_id": bid, "stream": "ndjson", "fields": "code", "limit": 2}
+    )
+    lines = [json.loads(x) for x in nd.text.splitlines()]
+    assert [(x["source"], x["code"]) for x in lines] == [("AR", "C0"), ("AR", "C1")]
+    assert set(lines[0]) == {"row_id", "source", "code"}
+
+
+def test_items_stream_arrow(client, ingest):
+    import pyarrow as pa
+
+    bid = ingest(make_items(3))
+    r = client.get("/api/wms/items", params={"batch_id": bid, "stream": "arrow"})
+    table = pa.ipc.open_stream(r.content).read_all()
+    assert table.column("code").to_pylist() == ["C0", "C1", "C2"]
+    assert json.loads(table.column("_raw")[1].as_py()) == {"Desc": "desc 1", "Qty": 1}
+
+
+def test_items_keyset_pages(client, ingest):
+    bid = ingest(make_items(10))
+    ingest(make_items(3, prefix="F"), source="FP")
+    r = client.get("/api/wms/items", params={"sources": "AR", "limit": 4, "with_total": True})
+    assert r.status_code == 200
+    assert len(r.json()) == 4 and r.headers["x-total-count"] == "10"
+    r = client.get(
+        "/api/wms/items", params={"batch_id": bid, "cursor": r.headers["x-next-cursor"]}
+    )
+    assert [x["code"] for x in r.json()] == [f"C{i}" for i in range(4, 10)]
+    assert "x-next-cursor" not in r.headers
+
+    desc = client.get("/api/wms/items", params={"batch_id": bid, "order": "desc", "limit": 3})
+    nxt = client.get(
+        "/api/wms/items",
+        params={"batch_id": bid, "order": "desc", "cursor": desc.headers["x-next-cursor"]},
+    )
+    assert [x["code"] for x in desc.json() + nxt.json()] == [f"C{i}" for i in range(9, -1, -1)]
+
+
+def test_items_errors(client):
+    assert client.get("/api/wms/items?order=up").status_code == 400
+    assert client.get("/api/wms/items?batch_ids=1,x").status_code == 400
+    assert client.get("/api/wms/items?fields=bogus").status_code == 400
+    assert client.get("/api/wms/items?shape=grid").status_code == 400
+    assert client.get("/api/wms/items?stream=csv").status_code == 400
+
+
+def test_assign_list_unassign_links(client, ingest, release, rows_of):
+    rid = release["DRAFT"]
+    rows = rows_of(ingest(make_items(4)))
+    body = {"std_release_id": rid, "std_node_uid": "N1", "row_ids": rows[:3]}
+    assert client.post("/api/wms/links/assign", json=body).json() == {"added": 3, "skipped": 0}
+    assert client.post("/api/wms/links/assign", json=body).json() == {"added": 0, "skipped": 3}
+
+    linked = client.get("/api/wms/links", params={"rid": rid, "uid": "N1"}).json()
+    assert [x["code"] for x in linked] == ["C0", "C1", "C2"]
+    page = client.get("/api/wms/links", params={"rid": rid, "uid": "N1", "limit": 2})
+    rest = client.get(
+        "/api/wms/links", params={"rid": rid, "uid": "N1", "cursor": page.headers["x-next-cursor"]}
+    )
+    assert [x["code"] for x in page.json() + rest.json()] == ["C0", "C1", "C2"]
+
+    body["row_ids"] = rows[:1]
+    assert client.post("/api/wms/links/unassign", json=body).json() == {"removed": 1}
+    assert len(client.get("/api/wms/links", params={"rid": rid, "uid": "N1"}).json()) == 2
+
+
+def test_link_errors(client, release):
+    rid = release["DRAFT"]
+    bad = {"std_release_id": rid, "std_node_uid": "N1", "row_ids": []}
+    assert client.post("/api/wms/links/assign", json=bad).status_code == 400
+    assert client.post("/api/wms/links/unassign", json=bad).status_code == 400
+    r = client.get("/api/wms/links", params={"rid": rid, "uid": "N1", "order": "x"})
+    assert r.status_code == 400
+
+
+def test_rebase_links_by_code(client, ingest, release, rows_of):
+    rid = release["DRAFT"]
+    old = ingest(make_items(4), source="FP")
+    client.post(
+        "/api/wms/links/assign",
+        json={"std_release_id": rid, "std_node_uid": "N1", "row_ids": rows_of(old)},
+    )
+    new = ingest(make_items(2), source="FP")  # C0, C1 만 있음
+    r = client.post(
+        "/api/wms/links/rebase",
+        json={"std_release_id": rid, "source": "FP", "to_batch_id": new, "delete_old": True},
+    )
+    assert r.status_code == 200
+    out = r.json()
+    assert out["from_batch_id"] == old
+    assert (out["inserted_new_links"], out["skipped_unmatched"]) == (2, 2)
+    linked = client.get("/api/wms/links", params={"rid": rid, "uid": "N1"}).json()
+    assert sorted(x["code"] for x in linked) == ["C0", "C1", "C2", "C3"]
+    assert set(rows_of(new)) <= {x["row_id"] for x in linked}
+
+
+def test_rebase_errors(client, ingest):
+    assert client.post("/api/wms/links/rebase", json={"source": "FP"}).status_code == 400
+    bid = ingest(make_items(1), source="AR")
+    r = client.post(
+        "/api/wms/links/rebase", json={"std_release_id": 1, "source": "FP", "to_batch_id": bid}
+    )
+    assert r.status_code == 400  # 다른 source 의 배치
+    r = client.post(
+        "/api/wms/links/rebase", json={"std_release_id": 1, "source": "AR", "to_batch_id": bid}
+    )
+    assert r.status_code == 404  # 옮길 링크 없음
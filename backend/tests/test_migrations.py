@@ -0,0 +1,52 @@
+# backend/tests/test_migrations.py
+import importlib.util
+
+from alembic.migration import MigrationContext
+from alembic.operations import Operations
+from sqlalchemy import text
+
+from conftest import BACKEND_DIR, make_items
+from app.shared.db import engine
+
+
+def _migration(name: str):
+    path = next((BACKEND_DIR / "alembic" / "versions").glob(f"{name}_*.py"))
+    spec = importlib.util.spec_from_file_location(f"_migration_{name}", path)
+    mod = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(mod)
+    return mod
+
+
+def _upgrade(mod, *before: str) -> None:
+    with engine.begin() as conn:
+        for sql in before:
+            conn.exec_driver_sql(sql)
+        with Operations.context(MigrationContext.configure(conn)):
+            mod.upgrade()
+
+
+def test_row_counters_backfill_then_revalidate(client, ingest, db):
+    bid = ingest(make_items(4))
+    # 카운터/rules_fp 이전 시점: ok 3 / error 1, 검증 이력(rules_fp) 없음
+    db.execute(
+        text(
+            "UPDATE wms_row SET status = CASE WHEN row_index = 0 THEN 'error' ELSE 'ok' END, "
+            "rules_fp = NULL, validated_hash = NULL WHERE batch_id = :b"
+        ),
+        {"b": bid},
+    )
+    db.commit()
+    _upgrade(
+        _migration("c3d8e0a4f915"),
+        "DROP INDEX ix_wms_batch_source_id",
+        "ALTER TABLE wms_batch DROP COLUMN total_rows",
+        "ALTER TABLE wms_batch DROP COLUMN ok_rows",
+        "ALTER TABLE wms_batch DROP COLUMN error_rows",
+    )
+    batch = client.get("/api/wms/batches").json()[0]
+    assert (batch["total_rows"], batch["ok_rows"], batch["error_rows"]) == (4, 3, 1)
+
+    r = client.post(f"/api/wms/batches/{bid}/validate", json={"required_fields": ["code"]})
+    assert r.json()["checked"] == 4  # 이전 검증 규칙을 알 수 없음 → 전부 재검증
+    batch = client.get("/api/wms/batches").json()[0]
+    assert (batch["total_rows"], batch["ok_rows"], batch["error_rows"]) == (4, 4, 0)
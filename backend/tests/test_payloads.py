@@ -0,0 +1,34 @@
+# backend/tests/test_payloads.py
+from conftest import make_items
+
+
+def _values(client, bid: int) -> list[dict]:
+    items = client.get("/api/wms/items", params={"batch_id": bid}).json()
+    return [{k: v for k, v in x.items() if k != "row_id"} for x in items]
+
+
+def test_payload_dedup_round_trip(client, count, wait_idle):
+    first = client.post("/api/wms/ingest", json={"source": "AR", "items": make_items(8)}).json()
+    assert first["new_payloads"] == 8
+    second = client.post("/api/wms/ingest", json={"source": "AR", "items": make_items(8)}).json()
+    assert second["new_payloads"] == 0  # 같은 내용 → 기존 payload 재사용
+    assert count("SELECT count(*) FROM wms_payload") == 8
+    assert count("SELECT count(*) FROM wms_row") == 16
+    assert _values(client, first["batch_id"]) == _values(client, second["batch_id"])
+
+    client.delete(f"/api/wms/batches/{first['batch_id']}")
+    wait_idle()
+    assert count("SELECT count(*) FROM wms_payload") == 8  # 남은 배치가 아직 참조
+    assert len(_values(client, second["batch_id"])) == 8
+
+    client.delete(f"/api/wms/batches/{second['batch_id']}")
+    wait_idle()
+    assert count("SELECT count(*) FROM wms_payload") == 0
+
+
+def test_payload_dedup_within_batch(client, count):
+    items = make_items(3) + make_items(3)
+    r = client.post("/api/wms/ingest", json={"source": "AR", "items": items}).json()
+    assert (r["count"], r["new_payloads"]) == (6, 3)
+    assert count("SELECT count(*) FROM wms_payload") == 3
+    assert client.get("/api/wms/items", params={"search": "desc 2"}).json()[0]["code"] == "C2"
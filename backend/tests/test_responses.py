@@ -0,0 +1,50 @@
+# backend/tests/test_responses.py
+import gzip
+
+import pytest
+
+from conftest import make_items
+
+
+def test_large_json_is_gzipped(client, ingest):
+    bid = ingest(make_items(50))
+    r = client.get("/api/wms/items", params={"batch_id": bid}, headers={"Accept-Encoding": "gzip"})
+    assert r.headers["content-encoding"] == "gzip"
+    assert len(r.json()) == 50  # httpx 가 해제
+    small = client.get("/api/healthz", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in small.headers
+
+
+def test_brotli_preferred_when_available(client, ingest):
+    pytest.importorskip("brotli")
+    bid = ingest(make_items(50))
+    r = client.get(
+        "/api/wms/items", params={"batch_id": bid}, headers={"Accept-Encoding": "gzip, br"}
+    )
+    assert r.headers["content-encoding"] == "br"
+
+
+def test_msgpack_negotiation(client, ingest):
+    msgpack = pytest.importorskip("msgpack")
+    bid = ingest(make_items(2))
+    headers = {"Accept": "application/msgpack"}
+    r = client.get("/api/wms/items", params={"batch_id": bid}, headers=headers)
+    assert r.headers["content-type"].startswith("application/msgpack")
+    assert [x["code"] for x in msgpack.unpackb(r.content)] == ["C0", "C1"]
+    # response_model 엔드포인트도 미들웨어가 변환
+    r = client.get(f"/api/wms/batches/{bid}/errors", headers=headers)
+    assert r.headers["content-type"].startswith("application/msgpack")
+    assert msgpack.unpackb(r.content) == []
+
+
+def test_streamed_body_is_compressed(client, ingest):
+    bid = ingest(make_items(50))
+    with client.stream(
+        "GET",
+        "/api/wms/items",
+        params={"batch_id": bid, "stream": "ndjson"},
+        headers={"Accept-Encoding": "gzip"},
+    ) as r:
+        assert r.headers["content-encoding"] == "gzip"
+        body = gzip.decompress(b"".join(r.iter_raw()))
+    assert len(body.splitlines()) == 50
@@ -0,0 +1,424 @@
+# backend/tests/test_uploads.py
+import hashlib
+import os
+import time
+from datetime import UTC, datetime, timedelta
+
+import pytest
+
+from conftest import BACKEND_DIR, SAMPLES_DIR
+from app.wms import jobs, staging
+from app.wms import models as m
+
+XLSX = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+CSV_BODY = b"Work Master Code,name,Qty,UoM\nC1,first,1,m3\nC2, second ,N/A,EA\n"
+
+
+@pytest.fixture(scope="module")
+def ar_xlsx() -> bytes:
+    return (SAMPLES_DIR / "AR.xlsx").read_bytes()
+
+
+def _wait_job(client, job_id: str) -> dict:
+    for _ in range(400):
+        job = client.get(f"/api/wms/jobs/{job_id}").json()
+        if job["stage"] in ("done", "failed"):
+            return job
+        time.sleep(0.05)
+    raise AssertionError("job did not finish")
+
+
+def test_upload_excel(client, ar_xlsx, count):
+    files = {"file": ("AR.xlsx", ar_xlsx, XLSX)}
+    dry = client.post("/api/wms/upload-excel", files=files, data={"dry_run": "true"}).json()
+    assert dry["dry_run"] and dry["detected_items"] > 0
+
+    r = client.post("/api/wms/upload-excel", files=files, data={"source": "AR"})
+    assert r.status_code == 200, r.text
+    assert r.json()["count"] == dry["detected_items"] and r.json()["source"] == "AR"
+    rows = count("SELECT count(*) FROM wms_row WHERE batch_id = :b", b=r.json()["batch_id"])
+    assert rows == dry["detected_items"]
+
+
+def test_upload_excel_rejects_broken_file(client):
+    r = client.post("/api/wms/upload-excel", files={"file": ("x.xlsx", b"not a workbook", XLSX)})
+    assert r.status_code == 500
+
+
+@pytest.mark.parametrize("parser", ["stream", "pandas"])
+def test_upload_excel_parsers(client, ar_xlsx, parser):
+    r = client.post(
+        "/api/wms/upload-excel",
+        files={"file": ("AR.xlsx", ar_xlsx, XLSX)},
+        data={"source": "AR", "parser": parser},
+    )
+    assert r.status_code == 200, r.text
+    assert r.json()["count"] > 0 and r.json()["source"] == "AR"
+
+
+def test_upload_excel_rejects_unknown_parser(client, ar_xlsx):
+    r = client.post(
+        "/api/wms/upload-excel", files={"file": ("AR.xlsx", ar_xlsx, XLSX)}, data={"parser": "x"}
+    )
+    assert r.status_code == 400
+
+
+def test_upload_background_job(client, ar_xlsx):
+    r = client.post(
+        "/api/wms/upload-excel",
+        files={"file": ("AR.xlsx", ar_xlsx, XLSX)},
+        data={"source": "AR", "background": "true"},
+    )
+    assert r.status_code == 200
+    job = _wait_job(client, r.json()["job_id"])
+    assert job["stage"] == "done" and job["batch_status"] == "received"
+    assert job["rows_inserted"] > 0
+    with jobs._lock:
+        jobs._live.clear()  # 다른 워커에서 조회해도 같은 결과 (DB 기록)
+    assert client.get(f"/api/wms/jobs/{job['job_id']}").json() == job
+    assert any(j["job_id"] == job["job_id"] for j in client.get("/api/wms/jobs").json())
+
+
+def test_background_job_failure_fails_batch(client):
+    r = client.post(
+        "/api/wms/upload-excel",
+        files={"file": ("bad.xlsx", b"not a workbook", XLSX)},
+        data={"background": "true"},
+    )
+    job = _wait_job(client, r.json()["job_id"])
+    assert job["stage"] == "failed" and job["error"]
+    for _ in range(100):  # 잡 실패 기록 직후 배치 상태 커밋
+        batch = client.get("/api/wms/batches").json()[0]
+        if batch["status"] == "failed":
+            break
+        time.sleep(0.05)
+    assert (batch["id"], batch["status"]) == (job["batch_id"], "failed")
+
+
+def test_get_job_not_found(client):
+    assert client.get("/api/wms/jobs/nope").status_code == 404
+
+
+def test_jobs_are_shared_across_workers(client, db):
+    batch = m.WmsBatch(source="AR", status="ingesting")
+    db.add(batch)
+    db.commit()
+    now = time.time()
+    # 다른 API 워커(프로세스)가 실행 중인 잡: 이 프로세스 메모리에는 없음
+    job = m.WmsJob(
+        id="other",
+        kind="excel_ingest",
+        batch_id=batch.id,
+        stage="ingesting",
+        rows_parsed=10,
+        rows_inserted=5,
+        created_at=now,
+        updated_at=now,
+    )
+    db.add(job)
+    db.commit()
+    out = client.get("/api/wms/jobs/other").json()
+    assert (out["stage"], out["rows_inserted"]) == ("ingesting", 5)
+    assert out["batch_status"] == "ingesting"
+    assert [j["job_id"] for j in client.get("/api/wms/jobs").json()] == ["other"]
+
+
+def test_is_orphan_accepts_naive_timestamps():
+    tag = jobs.worker_tag()
+    naive = datetime.now(UTC).replace(tzinfo=None)  # 이전 버전이 기록한 형식
+    batch = m.WmsBatch(status="ingesting", meta_json={"worker": {**tag, "at": naive.isoformat()}})
+    assert not jobs.is_orphan(batch)
+    stale = naive - timedelta(minutes=jobs.settings.WMS_STALE_JOB_MINUTES + 1)
+    batch.meta_json = {"worker": {**tag, "at": stale.isoformat()}}
+    assert jobs.is_orphan(batch)
+
+
+def test_recover_orphans(db):
+    dead = {**jobs.worker_tag(), "pid": 2**22 + 1, "boot": "old"}
+    batches = {
+        "legacy": m.WmsBatch(source="AR", status="parsing", meta_json={"spool": "a.xlsx"}),
+        "dead": m.WmsBatch(source="AR", status="queued", meta_json={"worker": dead}),
+        "live": m.WmsBatch(source="AR", status="ingesting", meta_json={"spool": "b.xlsx"}),
+        "done": m.WmsBatch(source="AR", status="received", meta_json={}),
+    }
+    jobs.mark(batches["live"], "ingesting")
+    db.add_all(batches.values())
+    db.commit()
+    now = time.time()
+    job = m.WmsJob(
+        id="dead", kind="excel_ingest", batch_id=batches["dead"].id, created_at=now, updated_at=now
+    )
+    db.add(job)
+    db.commit()
+    jobs.SPOOL_DIR.mkdir(parents=True)
+    for name in ("a.xlsx", "b.xlsx", "stray.xlsx", "recent.xlsx"):
+        (jobs.SPOOL_DIR / name).write_bytes(b"x")
+    old = time.time() - jobs.settings.WMS_STALE_JOB_MINUTES * 60 - 60
+    for name in ("b.xlsx", "stray.xlsx"):
+        os.utime(jobs.SPOOL_DIR / name, (old, old))
+
+    res = jobs.recover_orphans()
+    assert sorted(res["failed_batches"]) == sorted([batches["legacy"].id, batches["dead"].id])
+    db.expire_all()
+    status = {k: b.status for k, b in batches.items()}
+    assert status == {"legacy": "failed", "dead": "failed", "live": "ingesting", "done": "received"}
+    assert "interrupted" in batches["dead"].meta_json["error"]
+    assert job.stage == "failed" and "interrupted" in job.error
+    # 실패 배치 스풀 + 오래된 떠돌이 파일만 삭제 (진행 중 배치 것, 최근 것은 유지)
+    assert res["spool_removed"] == 1
+    assert sorted(p.name for p in jobs.SPOOL_DIR.iterdir()) == ["b.xlsx", "recent.xlsx"]
+
+
+def test_pandas_parser_busy_returns_503(client, ar_xlsx, monkeypatch):
+    import threading
+
+    from app.wms import parse_pool
+
+    monkeypatch.setattr(parse_pool, "_slots", threading.BoundedSemaphore(1))
+    parse_pool._slots.acquire()  # 워커+대기 슬롯이 모두 사용 중
+    r = client.post(
+        "/api/wms/upload-excel",
+        files={"file": ("AR.xlsx", ar_xlsx, XLSX)},
+        data={"parser": "pandas"},
+    )
+    assert r.status_code == 503
+
+
+def test_parse_reservation_is_bounded(monkeypatch):
+    import threading
+
+    from fastapi import HTTPException
+
+    from app.wms import parse_pool
+
+    monkeypatch.setattr(parse_pool.settings, "WMS_PARSE_WORKERS", 2)
+    monkeypatch.setattr(parse_pool, "_slots", threading.BoundedSemaphore(3))
+    with parse_pool.reserve(10) as r:
+        assert r.n == 2  # 시트가 많아도 워커 수만큼만 → 단일 업로드 몫이 남음
+        with parse_pool.reserve(1) as single:
+            assert single.n == 1
+            with pytest.raises(HTTPException) as e:
+                with parse_pool.reserve(5):
+                    pass
+            assert e.value.status_code == 503
+    with parse_pool.reserve(5) as r:
+        assert r.n == 2  # 블록을 나가면 슬롯 반환
+
+
+def test_api_process_does_not_import_pandas():
+    import subprocess
+    import sys
+
+    code = "import sys, app.main; print('pandas' in sys.modules, 'openpyxl' in sys.modules)"
+    out = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True, cwd=BACKEND_DIR
+    )
+    assert out.stdout.split() == ["False", "False"]
+
+
+def test_dry_run_then_commit(client, ar_xlsx):
+    files = {"file": ("AR.xlsx", ar_xlsx, XLSX)}
+    dry = client.post("/api/wms/upload-excel", files=files, data={"dry_run": "true"}).json()
+    assert dry["dry_run"] and dry["detected_items"] > 0 and dry["staging_token"]
+    assert not dry["cached"]
+    again = client.post("/api/wms/upload-excel", files=files, data={"dry_run": "true"}).json()
+    assert again["cached"] and again["staging_token"] == dry["staging_token"]
+
+    token = {"staging_token": dry["staging_token"], "source": "AR"}
+    r = client.post("/api/wms/upload-excel/commit", data=token)
+    assert r.status_code == 200
+    assert r.json()["count"] == dry["detected_items"]
+    assert client.post("/api/wms/upload-excel/commit", data=token).status_code == 404
+
+
+def test_cached_dry_run_kept_until_commit(client, ar_xlsx, monkeypatch):
+    from app.wms import router
+
+    files = {"file": ("AR.xlsx", ar_xlsx, XLSX)}
+    dry = client.post("/api/wms/upload-excel", files=files, data={"dry_run": "true"}).json()
+
+    def broken(*args, **kwargs):
+        raise RuntimeError("db down")
+
+    with monkeypatch.context() as mp:
+        mp.setattr(router, "insert_rows", broken)
+        assert client.post("/api/wms/upload-excel", files=files).status_code == 500
+    assert staging.get(dry["staging_token"]) is not None  # 적재 실패 → 보관 결과 유지
+    r = client.post("/api/wms/upload-excel", files=files)
+    assert r.status_code == 200 and r.json()["count"] == dry["detected_items"]
+    assert staging.get(dry["staging_token"]) is None
+
+
+def test_staging_on_disk(monkeypatch):
+    put = dict(raw_columns=["Code"], sheet=None, filename="a.xlsx")
+    first = staging.put([{"code": "A"}] * 3, content_sha256="a", **put)
+    # 다른 워커 프로세스도 같은 디렉터리에서 읽음
+    assert (staging.STAGING_DIR / first["token"] / "items.json").exists()
+    assert staging.find("a", None)["token"] == first["token"]
+    assert staging.get(first["token"])["items"] == [{"code": "A"}] * 3
+    assert staging.get("../" + first["token"]) is None
+
+    monkeypatch.setattr(staging.settings, "WMS_STAGING_MAX_ROWS", 5)
+    second = staging.put([{"code": "B"}] * 3, content_sha256="b", **put)
+    assert staging.get(first["token"]) is None  # 상한 초과 → 오래 안 쓴 것부터 축출
+    assert staging.put([{"code": "C"}] * 6, content_sha256="c", **put) is None
+    assert staging.pop(second["token"])["rows"] == 3
+    assert staging.pop(second["token"]) is None
+
+
+def test_upload_multi_reports_errors_per_file(client, ar_xlsx):
+    files = [
+        ("files", ("AR.xlsx", ar_xlsx, XLSX)),
+        ("files", ("bad.xlsx", b"not a workbook", XLSX)),
+    ]
+    r = client.post("/api/wms/upload-excel/multi", files=files, data={"sources": "AR,FP"})
+    assert r.status_code == 200
+    body = r.json()
+    assert len(body["batches"]) == 1 and body["errors"] == 1
+    assert body["results"][1]["source"] == "FP" and body["results"][1]["error"]
+
+
+def test_upload_multi_all_sheets_dry_run(client, ar_xlsx):
+    files = [("files", ("AR.xlsx", ar_xlsx, XLSX))]
+    data = {"sheets": "*", "dry_run": "true"}
+    r = client.post("/api/wms/upload-excel/multi", files=files, data=data)
+    assert r.status_code == 200
+    results = r.json()["results"]
+    assert results and all(x["staging_token"] and not x.get("error") for x in results)
+    assert r.json()["batches"] == []
+
+
+# === 분할 업로드 ===
+def _start(client, data: bytes, size: int):
+    parts = [data[i : i + size] for i in range(0, len(data), size)]
+    s = client.post("/api/wms/uploads", json={"filename": "AR.xlsx", "total_chunks": len(parts)})
+    return s.json()["upload_id"], parts
+
+
+def _put(client, uid: str, i: int, part: bytes, sha: str | None = None):
+    headers = {"X-Chunk-Sha256": sha or hashlib.sha256(part).hexdigest()}
+    return client.put(f"/api/wms/uploads/{uid}/chunks/{i}", content=part, headers=headers)
+
+
+def test_chunked_upload_resume(client, ar_xlsx):
+    uid, parts = _start(client, ar_xlsx, 20_000)
+    for i, p in enumerate(parts[1:], start=1):
+        assert _put(client, uid, i, p).status_code == 200
+    assert _put(client, uid, 0, parts[0], sha="00").status_code == 400  # 체크섬 불일치
+
+    r = client.post(f"/api/wms/uploads/{uid}/finalize", data={"source": "AR"})
+    assert r.status_code == 409 and r.json()["detail"]["missing"] == [0]
+    assert 0 not in client.get(f"/api/wms/uploads/{uid}").json()["received"]
+
+    _put(client, uid, 0, parts[0])
+    r = client.post(f"/api/wms/uploads/{uid}/finalize", data={"source": "AR"})
+    assert r.status_code == 200 and r.json()["count"] > 0
+    assert client.get(f"/api/wms/uploads/{uid}").status_code == 404
+
+
+def test_chunked_finalize_failure_can_retry(client, ar_xlsx, monkeypatch):
+    from fastapi import HTTPException
+
+    from app.wms import router
+
+    uid, parts = _start(client, ar_xlsx, 50_000)
+    for i, p in enumerate(parts):
+        _put(client, uid, i, p)
+
+    def busy(*args, **kwargs):
+        raise HTTPException(503, "busy")
+
+    with monkeypatch.context() as mp:
+        mp.setattr(router, "_handle_upload", busy)
+        assert client.post(f"/api/wms/uploads/{uid}/finalize").status_code == 503
+    session = client.get(f"/api/wms/uploads/{uid}").json()
+    assert session["assembled"]
+    assert _put(client, uid, 0, parts[0]).status_code == 409  # 이미 이어붙임
+
+    r = client.post(f"/api/wms/uploads/{uid}/finalize", data={"source": "AR"})
+    assert r.status_code == 200 and r.json()["count"] > 0
+
+
+def _open_paths() -> set[str]:
+    fds = "/proc/self/fd"
+    return {os.path.realpath(os.path.join(fds, fd)) for fd in os.listdir(fds)}
+
+
+@pytest.mark.skipif(not os.path.isdir("/proc/self/fd"), reason="needs /proc")
+def test_chunked_finalize_background_spools_closed_file(client, ar_xlsx, monkeypatch):
+    uid, parts = _start(client, ar_xlsx, 50_000)
+    for i, p in enumerate(parts):
+        _put(client, uid, i, p)
+    spool_file, moved = jobs.spool_file, []
+
+    def check_closed(path):
+        # Windows 는 열린 파일을 옮길 수 없음 → 이동 시점에 아무도 열고 있지 않아야 함
+        assert os.path.realpath(path) not in _open_paths()
+        moved.append(path)
+        return spool_file(path)
+
+    monkeypatch.setattr(jobs, "spool_file", check_closed)
+    r = client.post(f"/api/wms/uploads/{uid}/finalize", data={"background": "true"})
+    assert r.status_code == 200 and moved
+    assert _wait_job(client, r.json()["job_id"])["stage"] == "done"
+
+
+def test_chunked_session_errors(client):
+    assert client.get("/api/wms/uploads/" + "0" * 32).status_code == 404
+    uid = client.post("/api/wms/uploads", json={"total_chunks": 1}).json()["upload_id"]
+    assert _put(client, uid, 5, b"x").status_code == 400  # index 범위 밖
+    assert client.delete(f"/api/wms/uploads/{uid}").json()["deleted"]
+    assert client.delete(f"/api/wms/uploads/{uid}").status_code == 404
+
+
+# === CSV / Parquet / Arrow IPC ===
+def _columnar_bytes(fmt: str) -> bytes:
+    import io
+
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    table = pa.table(
+        {
+            "Work Master Code": ["C1", "C2"],
+            "name": ["first", " second "],
+            "Qty": [1.0, float("inf")],  # ±inf → None (CSV 의 'N/A' 와 같은 결과)
+            "UoM": ["m3", "EA"],
+        }
+    )
+    buf = io.BytesIO()
+    if fmt == "parquet":
+        pq.write_table(table, buf)
+    else:
+        with pa.ipc.new_file(buf, table.schema) as w:
+            w.write_table(table)
+    return buf.getvalue()
+
+
+@pytest.mark.parametrize("fmt", ["csv", "parquet", "arrow"])
+def test_upload_columnar_formats(client, fmt):
+    body = CSV_BODY if fmt == "csv" else _columnar_bytes(fmt)
+    r = client.post(
+        "/api/wms/upload", files={"file": (f"wm.{fmt}", body, "application/octet-stream")}
+    )
+    assert r.status_code == 200, r.text
+    items = client.get("/api/wms/items", params={"batch_id": r.json()["batch_id"]}).json()
+    rows = [(x["code"], x["name"], x["qty"], x["unit"]) for x in items]
+    assert rows == [("C1", "first", 1.0, "m3"), ("C2", "second", None, "EA")]
+
+
+def test_upload_csv_reads_columns_as_text(client):
+    body = b"Work Master Code,Qty\n" + b"".join(b"%d,%d\n" % (i, i) for i in range(1, 3000))
+    body += b"00123,N/A\n"  # 첫 블록 이후 형태가 다른 값 → 타입 추론 실패 / 앞자리 0 손실이 없어야 함
+    r = client.post("/api/wms/upload", files={"file": ("wm.csv", body, "text/csv")})
+    assert r.status_code == 200, r.text
+    assert r.json()["count"] == 3000
+    items = client.get("/api/wms/items", params={"code": "00123"}).json()
+    assert [(x["code"], x["qty"]) for x in items] == [("00123", None)]
+
+
+def test_upload_rejects_unknown_format(client):
+    r = client.post(
+        "/api/wms/upload", files={"file": ("wm.csv", CSV_BODY, "text/csv")}, data={"format": "xls"}
+    )
+    assert r.status_code == 400
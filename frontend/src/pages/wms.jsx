@@ -1,7 +1,7 @@
 import { useState, useMemo } from "react";
 import { useQuery, useMutation, useQueryClient } from "@tanstack/react-query";
 // import { listBatches, previewBatch, ingestWms, validateBatch } from "../shared/api/wms";
-import { uploadExcel, listBatches, previewBatch, ingestWms, validateBatch, deleteBatch } from "../shared/api/wms";
+import { uploadExcel, commitStagedUpload, listBatches, previewBatch, ingestWms, validateBatch, deleteBatch } from "../shared/api/wms";
 import { useRef } from "react";
 import { FixedSizeList as List } from "react-window";
 
@@ -19,6 +19,13 @@ function UploadBox({ onUploaded }) {
     if (!dryRun && data.batch_id) onUploaded?.(data.batch_id);
   };
 
+  // ✅ dry-run 결과를 서버 보관본으로 커밋 (파일 재업로드 없음)
+  const onCommit = async () => {
+    const data = await commitStagedUpload({ staging_token: result.staging_token, source: src });
+    setResult(data);
+    if (data.batch_id) onUploaded?.(data.batch_id);
+  };
+
   return (
     <div className="flex items-center gap-2">
       <select className="border rounded px-2 py-1" value={src} onChange={e=>setSrc(e.target.value)}>
@@ -37,6 +44,11 @@ function UploadBox({ onUploaded }) {
           {result.dry_run ? `detected: ${result.detected_items}` : `batch #${result.batch_id}, count: ${result.count}`}
         </span>
       ) : null}
+      {result?.dry_run && result.staging_token ? (
+        <button className="px-2 py-1 rounded border text-xs" onClick={onCommit}>
+          Commit
+        </button>
+      ) : null}
     </div>
   );
 }
@@ -15,17 +15,52 @@ export const listBatches = async (params={}) =>
 //   return data;
 // };
 
-export const previewBatch = async (batchId, { limit, offset = 0 } = {}) => {
+// shape=columns 응답 { columns, raw_columns, rows } → 기존 행 객체 배열로 복원
+//   (_raw 키 이름이 행마다 반복되지 않아 응답이 작고 JSON.parse 가 빠름)
+export const fromColumnar = ({ columns, raw_columns, rows }, { rawKey = "_raw" } = {}) => {
+  const n = columns.length;
+  return rows.map((r) => {
+    const o = {};
+    for (let i = 0; i < n; i++) o[columns[i]] = r[i];
+    if (raw_columns.length) {
+      const raw = {};
+      for (let j = 0; j < raw_columns.length; j++) raw[raw_columns[j]] = r[n + j];
+      o[rawKey] = raw;
+    }
+    return o;
+  });
+};
+
+export const previewBatch = async (batchId, { limit, offset = 0, columnar = false } = {}) => {
   const params = {};
   if (limit != null) params.limit = limit; // ✅ undefined/null 이면 안 보냄 → 전체 반환
   if (offset) params.offset = offset;
+  if (columnar) params.shape = "columns";
   const { data } = await api.get(`/wms/batches/${batchId}/preview`, { params });
-  return data;
+  if (!columnar) return data;
+  // 기존 형태 { id, row_index, status, errors_json, payload_json } 로 복원
+  return fromColumnar(data).map(({ id, row_index, status, errors_json, _raw, ...p }) => ({
+    id, row_index, status, errors_json,
+    payload_json: _raw ? { ...p, _raw } : p,
+  }));
 };
 
 
-export const validateBatch = async (batchId, required_fields) => {
-  const { data } = await api.post(`/wms/batches/${batchId}/validate`, { required_fields });
+// rules: { fields: { qty: { type, pattern, min, max } }, allowed_units, unique_code }
+export const validateBatch = async (batchId, required_fields, rules = {}) => {
+  const { data } = await api.post(`/wms/batches/${batchId}/validate`, {
+    required_fields,
+    ...rules,
+  });
+  return data;
+};
+
+export const validateBatches = async (batchIds, required_fields, rules = {}) => {
+  const { data } = await api.post(`/wms/batches/validate`, {
+    batch_ids: batchIds,
+    required_fields,
+    ...rules,
+  });
   return data;
 };
 
@@ -35,17 +70,63 @@ export const listErrors = async (batchId) => {
 };
 
 
-export const uploadExcel = async ({ file, source, project_id, sheet, dry_run=false }) => {
+export const uploadExcel = async ({ file, source, project_id, sheet, dry_run=false, background=false }) => {
   const form = new FormData();
   form.append("file", file);
   if (source) form.append("source", source);
   if (project_id != null) form.append("project_id", String(project_id));
   if (sheet) form.append("sheet", sheet);
   form.append("dry_run", String(dry_run));
+  if (background) form.append("background", "true"); // ✅ { job_id, batch_id } 즉시 반환
   const { data } = await api.post("/wms/upload-excel", form, { headers: { "Content-Type": "multipart/form-data" }});
   return data;
 };
 
+// 대용량 엑셀: 분할 업로드(재개 가능) → finalize
+//  - 실패 시 같은 uploadId로 다시 호출하면 이미 받은 청크는 건너뜀
+export const uploadExcelChunked = async ({
+  file, source, project_id, sheet, dry_run=false, background=false,
+  chunkSize = 8 * 1024 * 1024, uploadId, onProgress,
+}) => {
+  const total_chunks = Math.max(1, Math.ceil(file.size / chunkSize));
+  const session = uploadId
+    ? (await api.get(`/wms/uploads/${uploadId}`)).data
+    : (await api.post("/wms/uploads", { filename: file.name, total_chunks })).data;
+  const done = new Set(session.received || []);
+  for (let i = 0; i < total_chunks; i++) {
+    if (!done.has(i)) {
+      const blob = file.slice(i * chunkSize, (i + 1) * chunkSize);
+      await api.put(`/wms/uploads/${session.upload_id}/chunks/${i}`, blob, {
+        headers: { "Content-Type": "application/octet-stream" },
+      });
+    }
+    onProgress?.({ upload_id: session.upload_id, sent: i + 1, total: total_chunks });
+  }
+  const form = new FormData();
+  form.append("total_chunks", String(total_chunks));
+  if (source) form.append("source", source);
+  if (project_id != null) form.append("project_id", String(project_id));
+  if (sheet) form.append("sheet", sheet);
+  form.append("dry_run", String(dry_run));
+  if (background) form.append("background", "true");
+  const { data } = await api.post(`/wms/uploads/${session.upload_id}/finalize`, form, { headers: { "Content-Type": "multipart/form-data" }});
+  return data;
+};
+
+// dry-run 결과(staging_token)를 재업로드/재파싱 없이 인제스트
+export const commitStagedUpload = async ({ staging_token, source, project_id }) => {
+  const form = new FormData();
+  form.append("staging_token", staging_token);
+  if (source) form.append("source", source);
+  if (project_id != null) form.append("project_id", String(project_id));
+  const { data } = await api.post("/wms/upload-excel/commit", form, { headers: { "Content-Type": "multipart/form-data" }});
+  return data;
+};
+
+// 백그라운드 업로드 잡 진행률: { stage, rows_parsed, rows_inserted, batch_id, batch_status, error }
+export const getWmsJob = async (jobId) =>
+  (await api.get(`/wms/jobs/${jobId}`)).data;
+
 
 export const deleteBatch = async (batchId) => {
   const { data } = await api.delete(`/wms/batches/${batchId}`);
@@ -53,10 +134,14 @@ export const deleteBatch = async (batchId) => {
 };
 
 // --- StdGWM용 신규 함수들 ---
+// fields: ["code", "name", "_raw.Qty"] 처럼 필요한 필드만 (없으면 전체)
+// columnar: true 면 열 지향 응답으로 받아 같은 행 객체 배열로 복원
 export const listWmsItems = async ({
-  sources, search, limit, offset=0, order, batch_id, batch_ids
+  sources, search, limit, offset=0, order, batch_id, batch_ids, fields, columnar = false
 } = {}) => {
   const params = {};
+  if (fields?.length) params.fields = fields.join(",");
+  if (columnar) params.shape = "columns";
   if (sources?.length) params.sources = sources.join(",");
   if (search) params.search = search;
   if (limit != null) params.limit = limit;
@@ -64,9 +149,71 @@ export const listWmsItems = async ({
   if (order) params.order = order;
   if (batch_ids?.length) params.batch_ids = batch_ids.join(",");
   else if (batch_id != null) params.batch_id = batch_id;
-  return (await api.get("/wms/items", { params })).data;
+  const { data } = await api.get("/wms/items", { params });
+  return columnar ? fromColumnar(data) : data;
+};
+
+// keyset 페이지: cursor = 이전 응답의 nextCursor (없으면 첫 페이지)
+export const listWmsItemsPage = async ({
+  sources, search, limit = 500, cursor, order, batch_id, batch_ids, withTotal = false, fields,
+  columnar = false,
+} = {}) => {
+  const params = { limit };
+  if (fields?.length) params.fields = fields.join(",");
+  if (columnar) params.shape = "columns";
+  if (sources?.length) params.sources = sources.join(",");
+  if (search) params.search = search;
+  if (cursor != null) params.cursor = cursor;
+  if (order) params.order = order;
+  if (withTotal) params.with_total = true;
+  if (batch_ids?.length) params.batch_ids = batch_ids.join(",");
+  else if (batch_id != null) params.batch_id = batch_id;
+  const res = await api.get("/wms/items", { params });
+  const next = res.headers["x-next-cursor"];
+  const total = res.headers["x-total-count"];
+  return {
+    items: columnar ? fromColumnar(res.data) : res.data,
+    nextCursor: next != null ? Number(next) : null,
+    total: total != null ? Number(total) : null,
+  };
+};
+
+// 전체 조회 스트리밍 (stream=ndjson): 청크가 도착할 때마다 onRows(rows) 호출, 끝나면 총 행 수 반환
+//   axios 는 브라우저에서 응답 본문을 스트리밍하지 못하므로 fetch + ReadableStream 사용
+export const streamNdjson = async (path, params, onRows, { signal } = {}) => {
+  const qs = new URLSearchParams({ ...params, stream: "ndjson" });
+  const res = await fetch(`${api.defaults.baseURL}${path}?${qs}`, { signal });
+  if (!res.ok) throw new Error(`${res.status} ${await res.text()}`);
+  const reader = res.body.pipeThrough(new TextDecoderStream()).getReader();
+  let rest = "";
+  let n = 0;
+  for (;;) {
+    const { value, done } = await reader.read();
+    if (done) break;
+    const lines = (rest + value).split("\n");
+    rest = lines.pop();
+    const rows = lines.filter(Boolean).map((l) => JSON.parse(l));
+    n += rows.length;
+    if (rows.length) onRows(rows);
+  }
+  if (rest.trim()) { onRows([JSON.parse(rest)]); n += 1; }
+  return n;
 };
 
+export const streamWmsItems = ({ sources, search, order, batch_id, batch_ids, fields } = {}, onRows, opts) => {
+  const params = {};
+  if (fields?.length) params.fields = fields.join(",");
+  if (sources?.length) params.sources = sources.join(",");
+  if (search) params.search = search;
+  if (order) params.order = order;
+  if (batch_ids?.length) params.batch_ids = batch_ids.join(",");
+  else if (batch_id != null) params.batch_id = batch_id;
+  return streamNdjson("/wms/items", params, onRows, opts);
+};
+
+export const streamPreviewBatch = (batchId, onRows, opts) =>
+  streamNdjson(`/wms/batches/${batchId}/preview`, {}, onRows, opts);
+
 // export const listWmsItems = async ({ sources, search, limit, offset=0, order, batch_id } = {}) => {
 //   const params = {};
 //   if (sources?.length) params.sources = sources.join(",");
@@ -78,15 +225,21 @@ export const listWmsItems = async ({
 //   return (await api.get("/wms/items", { params })).data;
 // };
 
-export const listLinks = async ({ rid, uid, order, source, batch_id, batch_ids }) =>
-  (await api.get("/wms/links", {
+export const listLinks = async ({
+  rid, uid, order, source, batch_id, batch_ids, fields, columnar = false
+}) => {
+  const { data } = await api.get("/wms/links", {
     params: {
       rid, uid, order,
       source,
+      ...(fields?.length ? { fields: fields.join(",") } : {}),
+      ...(columnar ? { shape: "columns" } : {}),
       ...(batch_ids?.length ? { batch_ids: batch_ids.join(",") } : {}),
       ...(batch_id != null ? { batch_id } : {}),
     }
-  })).data;
+  });
+  return columnar ? fromColumnar(data) : data;
+};
   
 // export const listLinks = async ({ rid, uid, order, source, batch_id }) =>
 //   (await api.get("/wms/links", { params: {